@@ -18,18 +18,47 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    from app.utils import json_provider
+    json_provider.init_app(app)
+    
+    from app.utils import uploads
+    uploads.init_app(app)
+    
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     CORS(app, resources={r"/*": {"origins": app.config['FRONTEND_URL']}})
     
+    from app.services.report_cache import report_cache
+    report_cache.init_app(app)
+    
+    from app.services.fx_service import fx_rates
+    fx_rates.init_app(app)
+    
+    from app.services.report_engine import report_engine
+    report_engine.init_app(app)
+    
+    from app.services.report_jobs import report_jobs
+    report_jobs.init_app(app)
+    
+    from app.utils.compression import compression
+    compression.init_app(app)
+    
     # Register blueprints
-    from app.routes import auth, transactions, invoices, reports
+    from app.routes import auth, transactions, invoices, clients, reports, imports, periods, sync
     app.register_blueprint(auth.bp)
     app.register_blueprint(transactions.bp, url_prefix='/api/transactions')
     app.register_blueprint(invoices.bp, url_prefix='/api/invoices')
+    app.register_blueprint(clients.bp, url_prefix='/api/clients')
     app.register_blueprint(reports.bp, url_prefix='/api/reports')
+    app.register_blueprint(imports.bp, url_prefix='/api/imports')
+    app.register_blueprint(periods.bp, url_prefix='/api/periods')
+    app.register_blueprint(sync.bp, url_prefix='/api/sync')
+    
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
     
     # Create database tables
     with app.app_context():
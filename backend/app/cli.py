@@ -0,0 +1,162 @@
+"""
+Flask CLI commands for maintenance tasks.
+"""
+import click
+from flask.cli import AppGroup
+
+rollups_cli = AppGroup('rollups', help='Manage the transaction report rollups.')
+
+@rollups_cli.command('rebuild')
+@click.option('--user-id', type=int, default=None, help='Only rebuild rollups for this user.')
+def rebuild_rollups(user_id):
+    """Rebuild daily and per-project transaction rollups and balance checkpoints from the transactions table"""
+    from app.services.rollup_service import RollupService
+    
+    rows = RollupService().rebuild(user_id=user_id)
+    click.echo(f'Rebuilt {rows} rollup rows')
+
+invoices_cli = AppGroup('invoices', help='Manage invoices.')
+
+@invoices_cli.command('seed-sequences')
+def seed_invoice_sequences():
+    """Initialize invoice number sequences from existing invoice numbers"""
+    from flask import current_app
+    from app.services.invoice_number_service import InvoiceNumberService
+    
+    service = InvoiceNumberService(
+        number_format=current_app.config['INVOICE_NUMBER_FORMAT'],
+        reset=current_app.config['INVOICE_NUMBER_RESET']
+    )
+    click.echo(f'Seeded {service.seed_from_invoices()} invoice sequences')
+
+search_cli = AppGroup('search', help='Manage the full-text search index.')
+
+@search_cli.command('rebuild')
+def rebuild_search_index():
+    """Create missing search tables and reindex transactions and invoices"""
+    from app.services.search_service import SearchService
+    
+    SearchService().rebuild()
+    click.echo('Rebuilt search index')
+
+reports_cli = AppGroup('reports', help='Run report jobs.')
+
+@reports_cli.command('worker')
+@click.option('--processes', type=int, default=None, help='Worker processes (default: REPORT_JOBS_WORKERS).')
+def run_report_worker(processes):
+    """Compute queued report jobs from Redis in a process pool"""
+    from flask import current_app
+    from app.services.report_jobs import run_worker
+    
+    processes = processes or current_app.config.get('REPORT_JOBS_WORKERS', 2)
+    click.echo(f'Report worker started with {processes} processes')
+    run_worker(processes)
+
+fx_cli = AppGroup('fx', help='Manage exchange rates.')
+
+@fx_cli.command('load')
+@click.argument('path', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--base', default=None, help='Currency the file is quoted against (default: FX_BASE_CURRENCY).')
+def load_fx_rates(path, base):
+    """Load daily exchange rates from a CSV file (date,currency,rate or one column per currency)"""
+    from app.services.fx_service import FxService
+    
+    try:
+        count = FxService().load_csv(path, base=base)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f'Loaded {count} exchange rates')
+
+indexes_cli = AppGroup('indexes', help='Manage database indexes.')
+
+@indexes_cli.command('sync')
+@click.option('--prune', is_flag=True, help='Also drop ix_* indexes that the models no longer declare.')
+def sync_indexes(prune):
+    """Create indexes declared on the models that an existing database is missing"""
+    from sqlalchemy import inspect
+    from sqlalchemy.schema import DropIndex
+    from app import db
+    
+    dialect = db.engine.dialect.name
+    inspector = inspect(db.engine)
+    created, dropped = [], []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        declared = {index.name for index in table.indexes}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            # Skip indexes limited to another database, like the PostgreSQL search indexes
+            ddl_if = getattr(index, '_ddl_if', None)
+            if ddl_if is not None and ddl_if.dialect not in (None, dialect):
+                continue
+            if index.name not in existing:
+                index.create(db.engine)
+                created.append(index.name)
+        for name in sorted(existing - declared):
+            if not name.startswith('ix_'):
+                continue
+            if prune:
+                with db.engine.begin() as connection:
+                    connection.execute(DropIndex(db.Index(name)))
+                dropped.append(name)
+            else:
+                click.echo(f'Unused index {name} (drop it with --prune)')
+    
+    for name in created:
+        click.echo(f'Created {name}')
+    for name in dropped:
+        click.echo(f'Dropped {name}')
+    click.echo(f'Created {len(created)} and dropped {len(dropped)} indexes')
+
+sync_cli = AppGroup('sync', help='Manage delta sync.')
+
+@sync_cli.command('prune')
+@click.option('--days', type=int, default=None, help='Keep tombstones this many days (default: SYNC_TOMBSTONE_RETENTION_DAYS).')
+def prune_tombstones(days):
+    """Delete tombstones of deleted rows past the retention period"""
+    from flask import current_app
+    from app.services.sync_service import SyncService
+    
+    days = days or current_app.config.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90)
+    click.echo(f'Pruned {SyncService(retention_days=days).prune_tombstones()} tombstones')
+
+@click.command('seed')
+@click.option('--users', type=int, default=1, show_default=True, help='Number of users to create.')
+@click.option('--transactions', type=int, default=10000, show_default=True,
+              help='Transactions per user, excluding invoice payments.')
+@click.option('--invoices', type=int, default=500, show_default=True, help='Invoices per user.')
+@click.option('--years', type=int, default=3, show_default=True, help='Years of history to generate.')
+@click.option('--seed', 'random_seed', type=int, default=42, show_default=True, help='Random seed.')
+@click.option('--chunk-size', type=int, default=5000, show_default=True, help='Rows per INSERT batch.')
+def seed_command(users, transactions, invoices, years, random_seed, chunk_size):
+    """Generate a synthetic ledger for load testing and benchmarks"""
+    import time
+    from app.services.seed_service import SeedService
+    
+    started = time.perf_counter()
+    
+    def progress(index, stats):
+        click.echo(f'[{index + 1}/{users}] {stats["email"]}: '
+                   f'{stats["transactions"]} transactions, {stats["invoices"]} invoices')
+    
+    totals = SeedService(seed=random_seed, chunk_size=chunk_size).seed(
+        users=users, transactions=transactions, invoices=invoices, years=years, progress=progress
+    )
+    click.echo(
+        f'Seeded {totals["users"]} users, {totals["clients"]} clients, {totals["projects"]} projects, '
+        f'{totals["invoices"]} invoices, {totals["invoice_items"]} items and '
+        f'{totals["transactions"]} transactions in {time.perf_counter() - started:.1f}s '
+        f'(password: "password")'
+    )
+
+def register_commands(app):
+    """Register all CLI command groups on the app"""
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(invoices_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(reports_cli)
+    app.cli.add_command(fx_cli)
+    app.cli.add_command(indexes_cli)
+    app.cli.add_command(sync_cli)
+    app.cli.add_command(seed_command)
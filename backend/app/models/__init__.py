@@ -4,3 +4,12 @@ from .client import Client
 from .project import Project
 from .transaction import Transaction, TransactionCategory, TransactionType
 from .invoice import Invoice, InvoiceStatus, InvoiceItem
+from .transaction_rollup import TransactionRollup
+from .statement_import import StatementImport, ImportStatus
+from .invoice_sequence import InvoiceSequence
+from .search_index import search_vector, fts_table_name
+from .fiscal_period import FiscalPeriod, PeriodBalance
+from .balance_checkpoint import BalanceCheckpoint
+from .fx_rate import FxRate
+from .project_rollup import ProjectRollup
+from .tombstone import Tombstone, SyncEntity
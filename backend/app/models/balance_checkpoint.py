@@ -0,0 +1,26 @@
+from datetime import datetime
+from app import db
+
+class BalanceCheckpoint(db.Model):
+    """Cumulative net of a user's ledger in one currency through the end of a month
+
+    Rows only exist for months with activity in their currency; the balance
+    before any month is the cumulative net of the latest checkpoint before
+    it, per currency.
+    """
+    __tablename__ = 'balance_checkpoints'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'currency', 'month', name='uq_balance_checkpoints_user_currency_month'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Date, nullable=False)  # first day of the month
+    currency = db.Column(db.String(3), nullable=False, default='USD')
+    cumulative_net = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Foreign Keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    def __repr__(self):
+        return f'<BalanceCheckpoint {self.user_id} {self.month}: {self.cumulative_net} {self.currency}>'
@@ -3,6 +3,12 @@ from app import db
 
 class Client(db.Model):
     __tablename__ = 'clients'
+    __table_args__ = (
+        # A user's clients by name
+        db.Index('ix_clients_user_name', 'user_id', 'name'),
+        # Delta sync: a user's changes in order
+        db.Index('ix_clients_user_updated_id', 'user_id', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
@@ -32,8 +38,8 @@ class Client(db.Model):
             'tax_id': self.tax_id,
             'notes': self.notes,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'user_id': self.user_id
         }
     
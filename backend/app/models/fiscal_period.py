@@ -0,0 +1,78 @@
+from datetime import datetime
+from sqlalchemy import event
+from app import db
+from app.utils.money import money_json
+from app.models.transaction import TransactionType, TransactionCategory
+
+class FiscalPeriod(db.Model):
+    """A closed range of whole months whose ledger can no longer change"""
+    __tablename__ = 'fiscal_periods'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'start_date', name='uq_fiscal_periods_user_start'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    closed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Foreign Keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+
+    # Relationships
+    balances = db.relationship('PeriodBalance', backref='period', lazy=True, cascade='all, delete-orphan')
+
+    def to_dict(self, include_balances=False):
+        data = {
+            'id': self.id,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'closed_at': self.closed_at,
+            'user_id': self.user_id
+        }
+        if include_balances:
+            data['balances'] = [balance.to_dict() for balance in self.balances]
+        return data
+
+    def __repr__(self):
+        return f'<FiscalPeriod {self.user_id} {self.start_date}..{self.end_date}>'
+
+class PeriodBalance(db.Model):
+    """Frozen monthly total of one type, category and currency inside a closed period"""
+    __tablename__ = 'period_balances'
+    __table_args__ = (
+        db.UniqueConstraint('period_id', 'month', 'type', 'category', 'currency', name='uq_period_balances_bucket'),
+        db.Index('ix_period_balances_user_month', 'user_id', 'month'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Date, nullable=False)  # first day of the month
+    currency = db.Column(db.String(3), nullable=False, default='USD')
+    total_amount = db.Column(db.Numeric(14, 2), nullable=False)
+    transaction_count = db.Column(db.Integer, nullable=False)
+
+    # Enums
+    type = db.Column(db.Enum(TransactionType), nullable=False)
+    category = db.Column(db.Enum(TransactionCategory), nullable=False)
+
+    # Foreign Keys
+    period_id = db.Column(db.Integer, db.ForeignKey('fiscal_periods.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    def to_dict(self):
+        return {
+            'month': self.month.strftime('%Y-%m'),
+            'type': self.type.value,
+            'category': self.category.value,
+            'currency': self.currency,
+            'total_amount': money_json(self.total_amount),
+            'transaction_count': self.transaction_count
+        }
+
+    def __repr__(self):
+        return f'<PeriodBalance {self.user_id} {self.month} {self.type} {self.category}: {self.total_amount}>'
+
+@event.listens_for(PeriodBalance, 'before_update')
+def _balances_are_immutable(mapper, connection, target):
+    # Snapshots are only ever written when a period closes and dropped when it reopens
+    raise ValueError('Period balances are immutable')
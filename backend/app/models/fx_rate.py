@@ -0,0 +1,28 @@
+from datetime import datetime
+from app import db
+
+class FxRate(db.Model):
+    """Daily exchange rate: units of a currency per one unit of the base currency"""
+    __tablename__ = 'fx_rates'
+    __table_args__ = (
+        db.UniqueConstraint('base', 'currency', 'day', name='uq_fx_rates_base_currency_day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    base = db.Column(db.String(3), nullable=False)
+    currency = db.Column(db.String(3), nullable=False)
+    rate = db.Column(db.Numeric(20, 10), nullable=False)
+    # Max loaded_at versions the in-memory rate cache
+    loaded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def to_dict(self):
+        return {
+            'day': self.day,
+            'base': self.base,
+            'currency': self.currency,
+            'rate': float(self.rate)
+        }
+
+    def __repr__(self):
+        return f'<FxRate {self.day} 1 {self.base} = {self.rate} {self.currency}>'
@@ -2,6 +2,7 @@ from datetime import datetime
 from enum import Enum
 from decimal import Decimal
 from app import db
+from app.utils.money import Money, money_json
 
 class InvoiceStatus(str, Enum):
     DRAFT = 'draft'
@@ -15,6 +16,10 @@ class InvoiceStatus(str, Enum):
 
 class InvoiceItem(db.Model):
     __tablename__ = 'invoice_items'
+    __table_args__ = (
+        # Items are always loaded per invoice
+        db.Index('ix_invoice_items_invoice_id_id', 'invoice_id', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(255), nullable=False)
@@ -31,20 +36,39 @@ class InvoiceItem(db.Model):
             'id': self.id,
             'description': self.description,
             'quantity': float(self.quantity) if self.quantity is not None else None,
-            'unit_price': float(self.unit_price) if self.unit_price is not None else None,
+            'unit_price': money_json(self.unit_price),
             'tax_rate': float(self.tax_rate) if self.tax_rate is not None else None,
-            'amount': float(self.amount) if self.amount is not None else None,
+            'amount': money_json(self.amount),
             'invoice_id': self.invoice_id
         }
     
     def calculate_amount(self):
-        return Decimal(str(self.quantity)) * self.unit_price * (1 + self.tax_rate / 100)
+        """Line amount including the item tax, rounded to whole cents"""
+        tax_rate = Decimal(self.tax_rate or 0)
+        return (Money.of(self.unit_price) * (Decimal(self.quantity) * (1 + tax_rate / 100))).to_decimal()
 
 class Invoice(db.Model):
     __tablename__ = 'invoices'
+    __table_args__ = (
+        # Numbers are allocated from per-user sequences, so they are unique per user
+        db.UniqueConstraint('user_id', 'invoice_number', name='uq_invoices_user_invoice_number'),
+        # Keyset pagination of a user's invoices
+        db.Index('ix_invoices_user_issue_date_created_id', 'user_id', 'issue_date', 'created_at', 'id'),
+        # Receivables aging: a user's open invoices by due date, covering the grouped totals
+        db.Index(
+            'ix_invoices_user_status_due_date',
+            'user_id', 'status', 'due_date', 'amount_due', 'client_id', 'currency'
+        ),
+        # Invoice lists filtered by status or client, in list order
+        db.Index('ix_invoices_user_status_issue_date_created_id', 'user_id', 'status', 'issue_date', 'created_at', 'id'),
+        db.Index('ix_invoices_user_client_issue_date_created_id', 'user_id', 'client_id', 'issue_date', 'created_at', 'id'),
+        db.Index('ix_invoices_user_project', 'user_id', 'project_id'),
+        # Delta sync: a user's changes in order
+        db.Index('ix_invoices_user_updated_id', 'user_id', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    invoice_number = db.Column(db.String(50), unique=True, nullable=False, index=True)
+    invoice_number = db.Column(db.String(50), nullable=False, index=True)
     issue_date = db.Column(db.Date, nullable=False)
     due_date = db.Column(db.Date, nullable=False)
     status = db.Column(db.Enum(InvoiceStatus), default=InvoiceStatus.DRAFT, nullable=False)
@@ -70,10 +94,14 @@ class Invoice(db.Model):
     transactions = db.relationship('Transaction', backref='invoice', lazy=True)
     
     def calculate_totals(self):
-        self.subtotal = sum(item.amount for item in self.items)
-        self.tax_amount = self.subtotal * (self.tax_rate / 100)
-        self.total = self.subtotal + self.tax_amount
-        self.amount_due = self.total - self.amount_paid
+        subtotal = Money.sum((item.amount for item in self.items), self.currency)
+        tax_amount = subtotal * (Decimal(self.tax_rate or 0) / 100)
+        total = subtotal + tax_amount
+        
+        self.subtotal = subtotal.to_decimal()
+        self.tax_amount = tax_amount.to_decimal()
+        self.total = total.to_decimal()
+        self.amount_due = (total - Money.of(self.amount_paid or 0, self.currency)).to_decimal()
         
         # Update status based on payments
         if self.amount_due <= 0:
@@ -87,23 +115,23 @@ class Invoice(db.Model):
         return {
             'id': self.id,
             'invoice_number': self.invoice_number,
-            'issue_date': self.issue_date.isoformat() if self.issue_date else None,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
+            'issue_date': self.issue_date,
+            'due_date': self.due_date,
             'status': self.status.value,
             'notes': self.notes,
             'terms': self.terms,
             'tax_rate': float(self.tax_rate) if self.tax_rate is not None else None,
-            'subtotal': float(self.subtotal) if self.subtotal is not None else None,
-            'tax_amount': float(self.tax_amount) if self.tax_amount is not None else None,
-            'total': float(self.total) if self.total is not None else None,
-            'amount_paid': float(self.amount_paid) if self.amount_paid is not None else None,
-            'amount_due': float(self.amount_due) if self.amount_due is not None else None,
+            'subtotal': money_json(self.subtotal),
+            'tax_amount': money_json(self.tax_amount),
+            'total': money_json(self.total),
+            'amount_paid': money_json(self.amount_paid),
+            'amount_due': money_json(self.amount_due),
             'currency': self.currency,
             'user_id': self.user_id,
             'client_id': self.client_id,
             'project_id': self.project_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'items': [item.to_dict() for item in self.items]
         }
     
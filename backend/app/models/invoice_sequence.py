@@ -0,0 +1,20 @@
+from datetime import datetime
+from app import db
+
+class InvoiceSequence(db.Model):
+    """Last allocated invoice number per user and numbering period"""
+    __tablename__ = 'invoice_sequences'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'period', name='uq_invoice_sequences_user_period'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(8), nullable=False)  # 'YYYYMM', 'YYYY' or '' depending on the reset policy
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Foreign Keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    def __repr__(self):
+        return f'<InvoiceSequence {self.user_id} {self.period}: {self.last_value}>'
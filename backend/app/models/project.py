@@ -1,8 +1,13 @@
 from datetime import datetime
 from app import db
+from app.utils.money import money_json
 
 class Project(db.Model):
     __tablename__ = 'projects'
+    __table_args__ = (
+        # A user's projects by name
+        db.Index('ix_projects_user_name', 'user_id', 'name'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
@@ -28,15 +33,15 @@ class Project(db.Model):
             'id': self.id,
             'name': self.name,
             'description': self.description,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'end_date': self.end_date.isoformat() if self.end_date else None,
-            'hourly_rate': float(self.hourly_rate) if self.hourly_rate is not None else None,
-            'budget': float(self.budget) if self.budget is not None else None,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'hourly_rate': money_json(self.hourly_rate),
+            'budget': money_json(self.budget),
             'is_active': self.is_active,
             'client_id': self.client_id,
             'user_id': self.user_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
     
     def __repr__(self):
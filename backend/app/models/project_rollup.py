@@ -0,0 +1,45 @@
+from datetime import datetime
+from app import db
+from app.utils.money import money_json
+from app.models.transaction import TransactionType
+
+class ProjectRollup(db.Model):
+    """Monthly transaction totals of one project, bucketed by type and currency
+
+    Maintained by RollupService together with the daily rollups; only
+    transactions with a project_id contribute.
+    """
+    __tablename__ = 'project_rollups'
+    __table_args__ = (
+        db.UniqueConstraint(
+            'user_id', 'project_id', 'month', 'type', 'currency', name='uq_project_rollups_bucket'
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Date, nullable=False)  # first day of the month
+    currency = db.Column(db.String(3), nullable=False, default='USD')
+    total_amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Enums
+    type = db.Column(db.Enum(TransactionType), nullable=False)
+
+    # Foreign Keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+
+    def to_dict(self):
+        return {
+            'month': self.month,
+            'type': self.type.value,
+            'currency': self.currency,
+            'total_amount': money_json(self.total_amount),
+            'transaction_count': self.transaction_count,
+            'project_id': self.project_id,
+            'user_id': self.user_id
+        }
+
+    def __repr__(self):
+        return f'<ProjectRollup {self.project_id} {self.month} {self.type}: {self.total_amount} {self.currency}>'
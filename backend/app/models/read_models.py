@@ -0,0 +1,303 @@
+"""
+Read models for list endpoints.
+
+Listing a page of ORM instances pays for identity-map bookkeeping, change
+tracking state and Decimal conversion of every amount, only to call
+to_dict() on each instance and drop it. A read model selects just the
+columns its to_dict() needs as plain row tuples into a ``__slots__`` object:
+amounts come back from SQL as integer cents (see ``cents()``) and rates as
+floats, so no Decimal is built either.
+
+Each read model serializes exactly like the to_dict() of its ORM model.
+"""
+from sqlalchemy import Float, cast
+
+from app import db
+from app.models.client import Client
+from app.models.invoice import Invoice, InvoiceItem
+from app.models.transaction import Transaction
+from app.utils.money import cents
+
+def _money(value):
+    return value / 100 if value is not None else None
+
+class ReadModel:
+    """Base class of the read models: a ``__slots__`` object per selected row"""
+    
+    __slots__ = ()
+    
+    @classmethod
+    def columns(cls):
+        """SQL expressions to select, one per __init__ argument"""
+        raise NotImplementedError
+    
+    @classmethod
+    def select(cls, query):
+        """
+        Narrow a filtered ORM query to the columns of the read model
+        
+        The result keeps the query's filters and can still be ordered and
+        paginated; its rows are labelled with the attribute names.
+        
+        Args:
+            query (Query): Query over the model's entity
+        
+        Returns:
+            Query: Query of plain row tuples
+        """
+        return query.with_entities(*cls.columns())
+    
+    @classmethod
+    def from_rows(cls, rows):
+        """Build read models from rows selected with select()"""
+        return [cls(*row) for row in rows]
+
+class TransactionRow(ReadModel):
+    """A transaction as listed by the API"""
+    
+    __slots__ = (
+        'id', 'date', 'amount', 'currency', 'description', 'reference', 'type', 'category',
+        'is_reconciled', 'receipt_url', 'user_id', 'project_id', 'invoice_id', 'created_at', 'updated_at'
+    )
+    
+    def __init__(self, id, date, amount, currency, description, reference, type, category,
+                 is_reconciled, receipt_url, user_id, project_id, invoice_id, created_at, updated_at):
+        self.id = id
+        self.date = date
+        self.amount = amount        # int cents
+        self.currency = currency
+        self.description = description
+        self.reference = reference
+        self.type = type            # TransactionType
+        self.category = category    # TransactionCategory
+        self.is_reconciled = is_reconciled
+        self.receipt_url = receipt_url
+        self.user_id = user_id
+        self.project_id = project_id
+        self.invoice_id = invoice_id
+        self.created_at = created_at
+        self.updated_at = updated_at
+    
+    @classmethod
+    def columns(cls):
+        return [
+            Transaction.id,
+            Transaction.date,
+            cents(Transaction.amount).label('amount'),
+            Transaction.currency,
+            Transaction.description,
+            Transaction.reference,
+            Transaction.type,
+            Transaction.category,
+            Transaction.is_reconciled,
+            Transaction.receipt_url,
+            Transaction.user_id,
+            Transaction.project_id,
+            Transaction.invoice_id,
+            Transaction.created_at,
+            Transaction.updated_at
+        ]
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'date': self.date,
+            'amount': _money(self.amount),
+            'currency': self.currency,
+            'description': self.description,
+            'reference': self.reference,
+            'type': self.type.value,
+            'category': self.category.value,
+            'is_reconciled': self.is_reconciled,
+            'receipt_url': self.receipt_url,
+            'user_id': self.user_id,
+            'project_id': self.project_id,
+            'invoice_id': self.invoice_id,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+class InvoiceItemRow(ReadModel):
+    """An invoice line item as listed with its invoice"""
+    
+    __slots__ = ('id', 'description', 'quantity', 'unit_price', 'tax_rate', 'amount', 'invoice_id')
+    
+    def __init__(self, id, description, quantity, unit_price, tax_rate, amount, invoice_id):
+        self.id = id
+        self.description = description
+        self.quantity = quantity      # float
+        self.unit_price = unit_price  # int cents
+        self.tax_rate = tax_rate      # float percent
+        self.amount = amount          # int cents
+        self.invoice_id = invoice_id
+    
+    @classmethod
+    def columns(cls):
+        return [
+            InvoiceItem.id,
+            InvoiceItem.description,
+            cast(InvoiceItem.quantity, Float).label('quantity'),
+            cents(InvoiceItem.unit_price).label('unit_price'),
+            cast(InvoiceItem.tax_rate, Float).label('tax_rate'),
+            cents(InvoiceItem.amount).label('amount'),
+            InvoiceItem.invoice_id
+        ]
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'description': self.description,
+            'quantity': self.quantity,
+            'unit_price': _money(self.unit_price),
+            'tax_rate': self.tax_rate,
+            'amount': _money(self.amount),
+            'invoice_id': self.invoice_id
+        }
+
+class InvoiceRow(ReadModel):
+    """An invoice with its line items, as listed by the API"""
+    
+    __slots__ = (
+        'id', 'invoice_number', 'issue_date', 'due_date', 'status', 'notes', 'terms', 'tax_rate',
+        'subtotal', 'tax_amount', 'total', 'amount_paid', 'amount_due', 'currency', 'user_id',
+        'client_id', 'project_id', 'created_at', 'updated_at', 'items'
+    )
+    
+    def __init__(self, id, invoice_number, issue_date, due_date, status, notes, terms, tax_rate,
+                 subtotal, tax_amount, total, amount_paid, amount_due, currency, user_id,
+                 client_id, project_id, created_at, updated_at, items=None):
+        self.id = id
+        self.invoice_number = invoice_number
+        self.issue_date = issue_date
+        self.due_date = due_date
+        self.status = status        # InvoiceStatus
+        self.notes = notes
+        self.terms = terms
+        self.tax_rate = tax_rate    # float percent
+        self.subtotal = subtotal    # int cents, like the other amounts
+        self.tax_amount = tax_amount
+        self.total = total
+        self.amount_paid = amount_paid
+        self.amount_due = amount_due
+        self.currency = currency
+        self.user_id = user_id
+        self.client_id = client_id
+        self.project_id = project_id
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.items = items if items is not None else []  # InvoiceItemRow list
+    
+    @classmethod
+    def columns(cls):
+        return [
+            Invoice.id,
+            Invoice.invoice_number,
+            Invoice.issue_date,
+            Invoice.due_date,
+            Invoice.status,
+            Invoice.notes,
+            Invoice.terms,
+            cast(Invoice.tax_rate, Float).label('tax_rate'),
+            cents(Invoice.subtotal).label('subtotal'),
+            cents(Invoice.tax_amount).label('tax_amount'),
+            cents(Invoice.total).label('total'),
+            cents(Invoice.amount_paid).label('amount_paid'),
+            cents(Invoice.amount_due).label('amount_due'),
+            Invoice.currency,
+            Invoice.user_id,
+            Invoice.client_id,
+            Invoice.project_id,
+            Invoice.created_at,
+            Invoice.updated_at
+        ]
+    
+    @classmethod
+    def from_rows(cls, rows):
+        """Build read models and load the items of all of them with one SELECT ... IN"""
+        invoices = super().from_rows(rows)
+        by_id = {invoice.id: invoice for invoice in invoices}
+        
+        if by_id:
+            items = db.session.query(*InvoiceItemRow.columns())\
+                              .filter(InvoiceItem.invoice_id.in_(list(by_id)))\
+                              .order_by(InvoiceItem.invoice_id, InvoiceItem.id)
+            for item in InvoiceItemRow.from_rows(items):
+                by_id[item.invoice_id].items.append(item)
+        return invoices
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'invoice_number': self.invoice_number,
+            'issue_date': self.issue_date,
+            'due_date': self.due_date,
+            'status': self.status.value,
+            'notes': self.notes,
+            'terms': self.terms,
+            'tax_rate': self.tax_rate,
+            'subtotal': _money(self.subtotal),
+            'tax_amount': _money(self.tax_amount),
+            'total': _money(self.total),
+            'amount_paid': _money(self.amount_paid),
+            'amount_due': _money(self.amount_due),
+            'currency': self.currency,
+            'user_id': self.user_id,
+            'client_id': self.client_id,
+            'project_id': self.project_id,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'items': [item.to_dict() for item in self.items]
+        }
+
+class ClientRow(ReadModel):
+    """A client as listed by the API"""
+    
+    __slots__ = (
+        'id', 'name', 'email', 'phone', 'address', 'tax_id', 'notes', 'is_active',
+        'created_at', 'updated_at', 'user_id'
+    )
+    
+    def __init__(self, id, name, email, phone, address, tax_id, notes, is_active,
+                 created_at, updated_at, user_id):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.phone = phone
+        self.address = address
+        self.tax_id = tax_id
+        self.notes = notes
+        self.is_active = is_active
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.user_id = user_id
+    
+    @classmethod
+    def columns(cls):
+        return [
+            Client.id,
+            Client.name,
+            Client.email,
+            Client.phone,
+            Client.address,
+            Client.tax_id,
+            Client.notes,
+            Client.is_active,
+            Client.created_at,
+            Client.updated_at,
+            Client.user_id
+        ]
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'phone': self.phone,
+            'address': self.address,
+            'tax_id': self.tax_id,
+            'notes': self.notes,
+            'is_active': self.is_active,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'user_id': self.user_id
+        }
@@ -0,0 +1,101 @@
+"""
+Full-text search indexes for transactions and invoices.
+
+PostgreSQL gets a GIN index on a tsvector expression (maintained by the
+database on every write) plus trigram indexes for partial matches inside
+references and invoice numbers. SQLite gets an external-content FTS5 table
+per model, kept in sync by triggers, so bulk Core inserts are indexed too.
+The DDL is attached to the model tables and runs with create_all/drop_all.
+"""
+from sqlalchemy import DDL, cast, event, func, literal
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from app import db
+from app.models.invoice import Invoice
+from app.models.transaction import Transaction
+
+# Searchable text columns per model
+SEARCH_COLUMNS = {
+    Transaction: ('description', 'reference'),
+    Invoice: ('invoice_number', 'notes', 'terms'),
+}
+
+# Columns that get a trigram index for substring matches on PostgreSQL
+TRIGRAM_COLUMNS = {
+    Transaction: 'reference',
+    Invoice: 'invoice_number',
+}
+
+def fts_table_name(model):
+    """Name of the SQLite FTS5 table of a model"""
+    return f'{model.__tablename__}_fts'
+
+def search_vector(model):
+    """
+    tsvector expression of a model's searchable columns
+
+    Queries must use this exact expression for PostgreSQL to pick the
+    expression index.
+    """
+    document = None
+    for name in SEARCH_COLUMNS[model]:
+        part = func.coalesce(getattr(model, name), '')
+        document = part if document is None else document.op('||')(' ').op('||')(part)
+    return func.to_tsvector(cast(literal('simple'), REGCONFIG), document)
+
+def fts_ddl(model):
+    """
+    DDL creating a model's FTS5 table and the triggers that maintain it
+
+    Every statement is idempotent, so it can also be run against an
+    existing database (see SearchService.rebuild).
+    """
+    table = model.__tablename__
+    fts = fts_table_name(model)
+    columns = SEARCH_COLUMNS[model]
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{name}' for name in columns)
+    old_values = ', '.join(f'old.{name}' for name in columns)
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{names}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+    ]
+
+for _model in SEARCH_COLUMNS:
+    _table = _model.__table__
+
+    # PostgreSQL: tsvector expression index and trigram index
+    db.Index(
+        f'ix_{_model.__tablename__}_search',
+        search_vector(_model),
+        postgresql_using='gin'
+    ).ddl_if(dialect='postgresql')
+
+    _trigram = TRIGRAM_COLUMNS[_model]
+    db.Index(
+        f'ix_{_model.__tablename__}_{_trigram}_trgm',
+        getattr(_model, _trigram),
+        postgresql_using='gin',
+        postgresql_ops={_trigram: 'gin_trgm_ops'}
+    ).ddl_if(dialect='postgresql')
+
+    event.listen(
+        _table, 'before_create',
+        DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+    )
+
+    # SQLite: FTS5 table plus triggers
+    for _statement in fts_ddl(_model):
+        event.listen(_table, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+    event.listen(
+        _table, 'after_drop',
+        DDL(f'DROP TABLE IF EXISTS {fts_table_name(_model)}').execute_if(dialect='sqlite')
+    )
@@ -0,0 +1,66 @@
+from datetime import datetime
+from enum import Enum
+from app import db
+
+class ImportStatus(str, Enum):
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+class StatementImport(db.Model):
+    """A bank statement upload and the progress of importing it"""
+    __tablename__ = 'statement_imports'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    stored_path = db.Column(db.String(512), nullable=False)
+    format = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.Enum(ImportStatus), default=ImportStatus.PENDING, nullable=False)
+    bytes_total = db.Column(db.BigInteger, default=0)
+    bytes_processed = db.Column(db.BigInteger, default=0)
+    rows_read = db.Column(db.Integer, default=0)
+    rows_imported = db.Column(db.Integer, default=0)
+    rows_duplicate = db.Column(db.Integer, default=0)
+    rows_failed = db.Column(db.Integer, default=0)
+    options = db.Column(db.JSON, default=dict)
+    errors = db.Column(db.JSON, default=list)
+    error_message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+    
+    # Foreign Keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    
+    @property
+    def progress(self):
+        if self.status == ImportStatus.COMPLETED:
+            return 1.0
+        if not self.bytes_total:
+            return 0.0
+        return min(self.bytes_processed / self.bytes_total, 1.0)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'format': self.format,
+            'status': self.status.value,
+            'progress': round(self.progress, 4),
+            'bytes_total': self.bytes_total,
+            'bytes_processed': self.bytes_processed,
+            'rows_read': self.rows_read,
+            'rows_imported': self.rows_imported,
+            'rows_duplicate': self.rows_duplicate,
+            'rows_failed': self.rows_failed,
+            'errors': self.errors or [],
+            'error_message': self.error_message,
+            'user_id': self.user_id,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'completed_at': self.completed_at
+        }
+    
+    def __repr__(self):
+        return f'<StatementImport {self.id}: {self.filename} {self.status}>'
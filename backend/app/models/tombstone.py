@@ -0,0 +1,31 @@
+from datetime import datetime
+from enum import Enum
+from app import db
+
+class SyncEntity(str, Enum):
+    TRANSACTION = 'transactions'
+    INVOICE = 'invoices'
+    CLIENT = 'clients'
+
+class Tombstone(db.Model):
+    """Record of a deleted row, so delta syncs can tell clients to drop it
+
+    Tombstones are kept for SYNC_TOMBSTONE_RETENTION_DAYS; sync tokens older
+    than that are refused and the client starts over with a full sync.
+    """
+    __tablename__ = 'tombstones'
+    __table_args__ = (
+        # Delta sync: a user's deletions in order
+        db.Index('ix_tombstones_user_deleted_id', 'user_id', 'deleted_at', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.Enum(SyncEntity), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    # Foreign Keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    def __repr__(self):
+        return f'<Tombstone {self.entity.value} {self.entity_id}>'
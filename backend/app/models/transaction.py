@@ -1,6 +1,7 @@
 from datetime import datetime
 from enum import Enum
 from app import db
+from app.utils.money import money_json
 
 class TransactionType(str, Enum):
     INCOME = 'income'
@@ -33,14 +34,33 @@ class TransactionCategory(str, Enum):
 
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        # Keyset pagination of a user's ledger
+        db.Index('ix_transactions_user_date_created_id', 'user_id', 'date', 'created_at', 'id'),
+        # Ledger lists filtered by type, category or project, in ledger order
+        db.Index('ix_transactions_user_type_date_created_id', 'user_id', 'type', 'date', 'created_at', 'id'),
+        db.Index('ix_transactions_user_category_date_created_id', 'user_id', 'category', 'date', 'created_at', 'id'),
+        db.Index('ix_transactions_user_project_date', 'user_id', 'project_id', 'date'),
+        # Covers summaries and report engine loads, which read no other columns
+        db.Index(
+            'ix_transactions_user_date_totals',
+            'user_id', 'date', 'type', 'category', 'currency', 'amount', 'project_id'
+        ),
+        # Makes statement re-imports idempotent
+        db.Index('uq_transactions_user_import_hash', 'user_id', 'import_hash', unique=True),
+        # Delta sync: a user's changes in order
+        db.Index('ix_transactions_user_updated_id', 'user_id', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    date = db.Column(db.Date, nullable=False, index=True)
+    date = db.Column(db.Date, nullable=False)
     amount = db.Column(db.Numeric(12, 2), nullable=False)
+    currency = db.Column(db.String(3), default='USD', server_default='USD', nullable=False)
     description = db.Column(db.Text)
     reference = db.Column(db.String(100))
     is_reconciled = db.Column(db.Boolean, default=False)
     receipt_url = db.Column(db.String(255))
+    import_hash = db.Column(db.String(64))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -51,13 +71,14 @@ class Transaction(db.Model):
     # Foreign Keys
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'))
-    invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'))
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'), index=True)
     
     def to_dict(self):
         return {
             'id': self.id,
-            'date': self.date.isoformat() if self.date else None,
-            'amount': float(self.amount) if self.amount is not None else None,
+            'date': self.date,
+            'amount': money_json(self.amount),
+            'currency': self.currency,
             'description': self.description,
             'reference': self.reference,
             'type': self.type.value,
@@ -67,8 +88,8 @@ class Transaction(db.Model):
             'user_id': self.user_id,
             'project_id': self.project_id,
             'invoice_id': self.invoice_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
     
     def __repr__(self):
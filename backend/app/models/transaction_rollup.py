@@ -0,0 +1,39 @@
+from datetime import datetime
+from app import db
+from app.utils.money import money_json
+from app.models.transaction import TransactionType, TransactionCategory
+
+class TransactionRollup(db.Model):
+    """Per-user daily transaction totals, bucketed by type, category and currency"""
+    __tablename__ = 'transaction_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', 'type', 'category', 'currency', name='uq_transaction_rollups_bucket'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    currency = db.Column(db.String(3), nullable=False, default='USD')
+    total_amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Enums
+    type = db.Column(db.Enum(TransactionType), nullable=False)
+    category = db.Column(db.Enum(TransactionCategory), nullable=False)
+
+    # Foreign Keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    def to_dict(self):
+        return {
+            'day': self.day,
+            'type': self.type.value,
+            'category': self.category.value,
+            'currency': self.currency,
+            'total_amount': money_json(self.total_amount),
+            'transaction_count': self.transaction_count,
+            'user_id': self.user_id
+        }
+
+    def __repr__(self):
+        return f'<TransactionRollup {self.user_id} {self.day} {self.type} {self.category}: {self.total_amount}>'
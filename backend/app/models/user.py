@@ -23,6 +23,7 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = db.Column(db.DateTime)
+    ledger_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     
     # Relationships
     transactions = db.relationship('Transaction', backref='user', lazy=True)
@@ -58,8 +59,8 @@ class User(db.Model):
             'last_name': self.last_name,
             'role': self.role.value,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None
+            'created_at': self.created_at,
+            'last_login': self.last_login
         }
     
     def has_role(self, role_name):
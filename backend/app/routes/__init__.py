@@ -1,3 +1,3 @@
 # This file makes the routes directory a Python package
 # Import all route blueprints here
-from . import auth, transactions, invoices, reports, clients, projects, health
+from . import auth, transactions, invoices, reports, clients, projects, health, imports, periods
@@ -0,0 +1,38 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.models import Client
+from app.models.read_models import ClientRow
+
+bp = Blueprint('clients', __name__, url_prefix='/api/clients')
+
+@bp.route('', methods=['GET'])
+@jwt_required()
+def get_clients():
+    """
+    Get the current user's clients by name, with pagination
+    
+    ``active=true`` or ``active=false`` filters on is_active. Rows are read
+    into ClientRow read models rather than ORM instances.
+    """
+    current_user_id = get_jwt_identity()
+    
+    # Pagination
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+    
+    query = Client.query.filter_by(user_id=current_user_id)
+    
+    active = request.args.get('active')
+    if active is not None:
+        query = query.filter(Client.is_active == (active.lower() == 'true'))
+    
+    clients = ClientRow.select(query).order_by(Client.name, Client.id)\
+                       .paginate(page=page, per_page=per_page, error_out=False)
+    
+    return jsonify({
+        'items': [c.to_dict() for c in ClientRow.from_rows(clients.items)],
+        'total': clients.total,
+        'pages': clients.pages,
+        'current_page': clients.page
+    })
@@ -0,0 +1,97 @@
+from flask import Blueprint, request, jsonify, current_app, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app import db
+from app.models import StatementImport
+from app.services.import_service import ImportService
+
+bp = Blueprint('imports', __name__, url_prefix='/api/imports')
+import_service = ImportService()
+
+@bp.route('', methods=['POST'])
+@jwt_required()
+def create_import():
+    """
+    Upload a bank statement (CSV, OFX or CAMT.053) for import
+    
+    Expects a multipart ``file`` field. Optional form fields: ``format``,
+    ``date_format``, ``delimiter``, ``encoding``, the CSV column names
+    (``date_column``, ``amount_column``, ``description_column``,
+    ``reference_column``, ``currency_column``), ``income_category`` and
+    ``expense_category``.
+    The import runs in the background; poll the returned status URL.
+    """
+    current_user_id = get_jwt_identity()
+    
+    file = request.files.get('file')
+    if not file or not file.filename:
+        return jsonify({'message': 'Missing statement file'}), 400
+    
+    options = {
+        key: request.form.get(key)
+        for key in ImportService.PARSER_OPTIONS + ('income_category', 'expense_category')
+    }
+    
+    try:
+        statement_import = import_service.create_import(
+            user_id=current_user_id,
+            file=file,
+            upload_folder=current_app.config['UPLOAD_FOLDER'],
+            format=request.form.get('format'),
+            **options
+        )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f'Statement upload error: {str(e)}')
+        return jsonify({'message': 'Failed to upload statement'}), 500
+    
+    import_service.start_import(
+        current_app._get_current_object(),
+        statement_import.id,
+        run_async=current_app.config.get('IMPORTS_RUN_ASYNC', True),
+        chunk_size=current_app.config.get('BULK_INSERT_CHUNK_SIZE', 500)
+    )
+    db.session.refresh(statement_import)
+    
+    return jsonify({
+        'message': 'Statement import started',
+        'import': statement_import.to_dict(),
+        'status_url': url_for('imports.get_import', import_id=statement_import.id)
+    }), 202
+
+@bp.route('', methods=['GET'])
+@jwt_required()
+def get_imports():
+    """Get the current user's statement imports, newest first"""
+    current_user_id = get_jwt_identity()
+    
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    
+    imports = StatementImport.query.filter_by(user_id=current_user_id)\
+                                   .order_by(StatementImport.id.desc())\
+                                   .paginate(page=page, per_page=per_page, error_out=False)
+    
+    return jsonify({
+        'items': [i.to_dict() for i in imports.items],
+        'total': imports.total,
+        'pages': imports.pages,
+        'current_page': imports.page
+    })
+
+@bp.route('/<int:import_id>', methods=['GET'])
+@jwt_required()
+def get_import(import_id):
+    """Get the status and progress of a statement import"""
+    current_user_id = get_jwt_identity()
+    
+    statement_import = StatementImport.query.filter_by(
+        id=import_id,
+        user_id=current_user_id
+    ).first()
+    
+    if not statement_import:
+        return jsonify({'message': 'Import not found'}), 404
+    
+    return jsonify(statement_import.to_dict())
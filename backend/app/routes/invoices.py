@@ -1,27 +1,39 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-from sqlalchemy import desc, or_
+from sqlalchemy import desc
 
 from app import db
-from app.models import Invoice, InvoiceStatus, InvoiceItem
+from app.models import Invoice, InvoiceStatus, InvoiceItem, Client
+from app.models.read_models import InvoiceRow
+from app.services.etags import ledger_etag
 from app.services.invoice_service import InvoiceService
+from app.services.ledger_service import LedgerService
+from app.services.search_service import SearchService
+from app.utils.export import export_format, stream_export
+from app.utils.pagination import keyset_paginate
 
 bp = Blueprint('invoices', __name__, url_prefix='/api/invoices')
 invoice_service = InvoiceService()
+ledger_service = LedgerService()
+search_service = SearchService()
 
-@bp.route('', methods=['GET'])
-@jwt_required()
-def get_invoices():
-    """
-    Get all invoices with optional filtering and pagination
+def _filtered_query(user_id, rank=False):
     """
-    current_user_id = get_jwt_identity()
+    Build the invoice query for the filters in the request arguments
     
-    # Pagination
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
+    Shared by the list and export endpoints.
     
+    Args:
+        user_id (int): ID of the current user
+        rank (bool): Order search results by relevance
+        
+    Returns:
+        Query: Filtered query over the user's invoices
+        
+    Raises:
+        ValueError: If a date filter is malformed
+    """
     # Filters
     status_filter = request.args.get('status')
     client_id = request.args.get('client_id')
@@ -31,7 +43,7 @@ def get_invoices():
     search = request.args.get('search')
     
     # Build query
-    query = Invoice.query.filter_by(user_id=current_user_id)
+    query = Invoice.query.filter_by(user_id=user_id)
     
     if status_filter:
         query = query.filter(Invoice.status == status_filter)
@@ -47,43 +59,136 @@ def get_invoices():
             start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
             query = query.filter(Invoice.issue_date >= start_date)
         except ValueError:
-            return jsonify({'message': 'Invalid start_date format. Use YYYY-MM-DD'}), 400
+            raise ValueError('Invalid start_date format. Use YYYY-MM-DD')
     
     if end_date:
         try:
             end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
             query = query.filter(Invoice.issue_date <= end_date)
         except ValueError:
-            return jsonify({'message': 'Invalid end_date format. Use YYYY-MM-DD'}), 400
+            raise ValueError('Invalid end_date format. Use YYYY-MM-DD')
     
     if search:
-        search = f"%{search}%"
-        query = query.filter(
-            or_(
-                Invoice.invoice_number.ilike(search),
-                Invoice.notes.ilike(search),
-                Invoice.terms.ilike(search)
+        query = search_service.apply(query, Invoice, search, rank=rank)
+    
+    return query
+
+@bp.route('', methods=['GET'])
+@jwt_required()
+@ledger_etag
+def get_invoices():
+    """
+    Get all invoices with optional filtering and pagination
+    
+    Passing ``cursor`` (empty for the first page) switches to keyset
+    pagination on (issue_date, created_at, id); ``include_total=true`` adds
+    an exact count in that mode. ``search`` matches words by prefix using
+    the full-text index; add ``sort=relevance`` to order page-based results
+    by rank. Rows are read into InvoiceRow read models rather than ORM
+    instances, with the items of the whole page loaded by one extra query.
+    """
+    current_user_id = get_jwt_identity()
+    
+    # Pagination
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    
+    # Relevance ordering only applies to page-based pagination
+    rank = request.args.get('sort') == 'relevance' and 'cursor' not in request.args
+    
+    try:
+        query = InvoiceRow.select(_filtered_query(current_user_id, rank=rank))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    # Keyset pagination
+    if 'cursor' in request.args:
+        try:
+            page = keyset_paginate(
+                query,
+                [Invoice.issue_date, Invoice.created_at, Invoice.id],
+                cursor=request.args.get('cursor'),
+                per_page=max(per_page, 1),
+                include_total=request.args.get('include_total', '').lower() == 'true'
             )
-        )
+        except ValueError:
+            return jsonify({'message': 'Invalid cursor'}), 400
+        
+        return jsonify({
+            'items': [i.to_dict() for i in InvoiceRow.from_rows(page.items)],
+            'next_cursor': page.next_cursor,
+            'has_more': page.has_more,
+            'total': page.total
+        })
     
     # Order and paginate
     invoices = query.order_by(desc(Invoice.issue_date), desc(Invoice.created_at))\
                    .paginate(page=page, per_page=per_page, error_out=False)
     
     return jsonify({
-        'items': [i.to_dict() for i in invoices.items],
+        'items': [i.to_dict() for i in InvoiceRow.from_rows(invoices.items)],
         'total': invoices.total,
         'pages': invoices.pages,
         'current_page': invoices.page
     })
 
+@bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_invoices():
+    """
+    Export invoices with their items flattened, as CSV or NDJSON
+    
+    Takes the filters of the list endpoint plus ``format`` (csv or ndjson,
+    default csv). Each row is one line item with its invoice's fields
+    repeated; an invoice without items gives one row with empty item
+    fields. Rows are streamed oldest invoice first straight from a
+    database cursor, so the export size is not limited by memory.
+    """
+    current_user_id = get_jwt_identity()
+    
+    try:
+        fmt = export_format(request.args.get('format'))
+        query = _filtered_query(current_user_id)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    fields = [
+        ('invoice_id', Invoice.id),
+        ('invoice_number', Invoice.invoice_number),
+        ('issue_date', Invoice.issue_date),
+        ('due_date', Invoice.due_date),
+        ('status', Invoice.status),
+        ('client_id', Invoice.client_id),
+        ('client_name', Client.name),
+        ('project_id', Invoice.project_id),
+        ('currency', Invoice.currency),
+        ('subtotal', Invoice.subtotal),
+        ('tax_amount', Invoice.tax_amount),
+        ('total', Invoice.total),
+        ('amount_paid', Invoice.amount_paid),
+        ('amount_due', Invoice.amount_due),
+        ('item_id', InvoiceItem.id),
+        ('item_description', InvoiceItem.description),
+        ('item_quantity', InvoiceItem.quantity),
+        ('item_unit_price', InvoiceItem.unit_price),
+        ('item_tax_rate', InvoiceItem.tax_rate),
+        ('item_amount', InvoiceItem.amount)
+    ]
+    query = query.join(Client, Client.id == Invoice.client_id)\
+                 .outerjoin(InvoiceItem, InvoiceItem.invoice_id == Invoice.id)\
+                 .with_entities(*[column for _, column in fields])\
+                 .order_by(Invoice.issue_date, Invoice.id, InvoiceItem.id)
+    
+    return stream_export(query, [name for name, _ in fields], fmt, 'invoices')
+
 @bp.route('/<int:invoice_id>', methods=['GET'])
 @jwt_required()
+@ledger_etag
 def get_invoice(invoice_id):
     """Get a single invoice by ID"""
     current_user_id = get_jwt_identity()
     
-    invoice = Invoice.query.filter_by(
+    invoice = Invoice.query.options(*InvoiceService.load_options(detail=True)).filter_by(
         id=invoice_id,
         user_id=current_user_id
     ).first()
@@ -135,7 +240,7 @@ def update_invoice(invoice_id):
     current_user_id = get_jwt_identity()
     data = request.get_json()
     
-    invoice = Invoice.query.filter_by(
+    invoice = Invoice.query.options(*InvoiceService.load_options(detail=True)).filter_by(
         id=invoice_id,
         user_id=current_user_id
     ).first()
@@ -176,7 +281,7 @@ def delete_invoice(invoice_id):
     """Delete an invoice"""
     current_user_id = get_jwt_identity()
     
-    invoice = Invoice.query.filter_by(
+    invoice = Invoice.query.options(*InvoiceService.load_options(detail=True)).filter_by(
         id=invoice_id,
         user_id=current_user_id
     ).first()
@@ -184,14 +289,11 @@ def delete_invoice(invoice_id):
     if not invoice:
         return jsonify({'message': 'Invoice not found'}), 404
     
-    # Prevent deleting paid invoices
-    if invoice.status == InvoiceStatus.PAID:
-        return jsonify({'message': 'Cannot delete a paid invoice'}), 400
-    
     try:
-        db.session.delete(invoice)
-        db.session.commit()
+        invoice_service.delete_invoice(invoice)
         return jsonify({'message': 'Invoice deleted successfully'})
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f'Invoice deletion error: {str(e)}')
@@ -203,7 +305,7 @@ def send_invoice(invoice_id):
     """Send invoice to client via email"""
     current_user_id = get_jwt_identity()
     
-    invoice = Invoice.query.filter_by(
+    invoice = Invoice.query.options(*InvoiceService.load_options(detail=True)).filter_by(
         id=invoice_id,
         user_id=current_user_id
     ).first()
@@ -214,6 +316,7 @@ def send_invoice(invoice_id):
     try:
         # Update status to SENT
         invoice.status = InvoiceStatus.SENT
+        ledger_service.bump_version(current_user_id)
         db.session.commit()
         
         # TODO: Implement email sending logic here
@@ -247,7 +350,7 @@ def record_payment(invoice_id):
     except (ValueError, TypeError):
         return jsonify({'message': 'Invalid amount'}), 400
     
-    invoice = Invoice.query.filter_by(
+    invoice = Invoice.query.options(*InvoiceService.load_options(detail=True)).filter_by(
         id=invoice_id,
         user_id=current_user_id
     ).first()
@@ -264,32 +367,20 @@ def record_payment(invoice_id):
         return jsonify({'message': 'Invalid payment_date format. Use YYYY-MM-DD'}), 400
     
     try:
-        # Update invoice payment
-        invoice.amount_paid += payment_amount
-        invoice.calculate_totals()
-        
-        # Create a transaction for the payment
-        from app.models import Transaction, TransactionType
-        
-        transaction = Transaction(
-            date=payment_date,
+        # Update invoice payment and book the matching income transaction
+        invoice, _ = invoice_service.record_payment(
+            invoice=invoice,
             amount=payment_amount,
-            description=f'Payment for invoice {invoice.invoice_number}',
-            type=TransactionType.INCOME,
-            category='service',
-            invoice_id=invoice.id,
-            project_id=invoice.project_id,
-            user_id=current_user_id
+            payment_date=payment_date
         )
         
-        db.session.add(transaction)
-        db.session.commit()
-        
         return jsonify({
             'message': 'Payment recorded successfully',
             'invoice': invoice.to_dict()
         })
         
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f'Error recording payment: {str(e)}')
@@ -297,71 +388,54 @@ def record_payment(invoice_id):
 
 @bp.route('/summary', methods=['GET'])
 @jwt_required()
+@ledger_etag
 def get_invoice_summary():
-    """Get invoice summary (totals by status, etc.)"""
+    """
+    Get invoice summary (totals by status, by client and optionally aging)
+    
+    Amounts are exact decimals. Pass aging=true for the amount due of open
+    invoices bucketed by days past due as of the as_of date (default today).
+    Invoices in other currencies are converted to reporting_currency at the
+    rates of the as_of date.
+    """
     current_user_id = get_jwt_identity()
     
     # Get date range from query params
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    # Build base query
-    query = Invoice.query.filter(Invoice.user_id == current_user_id)
-    
-    # Apply date filters if provided
+    # Parse date filters if provided
     if start_date:
         try:
             start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-            query = query.filter(Invoice.issue_date >= start_date)
         except ValueError:
             return jsonify({'message': 'Invalid start_date format. Use YYYY-MM-DD'}), 400
     
     if end_date:
         try:
             end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-            query = query.filter(Invoice.issue_date <= end_date)
         except ValueError:
             return jsonify({'message': 'Invalid end_date format. Use YYYY-MM-DD'}), 400
     
-    # Get all invoices
-    invoices = query.all()
-    
-    # Calculate summary
-    summary = {
-        'total_invoices': len(invoices),
-        'total_amount': 0,
-        'total_paid': 0,
-        'total_due': 0,
-        'by_status': {},
-        'by_client': {}
-    }
-    
-    for invoice in invoices:
-        # Update status counts
-        status = invoice.status.value
-        if status not in summary['by_status']:
-            summary['by_status'][status] = {
-                'count': 0,
-                'amount': 0
-            }
-        
-        summary['by_status'][status]['count'] += 1
-        summary['by_status'][status]['amount'] += float(invoice.total or 0)
-        
-        # Update client totals
-        client_name = invoice.client.name if invoice.client else 'Unknown'
-        if client_name not in summary['by_client']:
-            summary['by_client'][client_name] = {
-                'count': 0,
-                'amount': 0
-            }
-        
-        summary['by_client'][client_name]['count'] += 1
-        summary['by_client'][client_name]['amount'] += float(invoice.total or 0)
-        
-        # Update totals
-        summary['total_amount'] += float(invoice.total or 0)
-        summary['total_paid'] += float(invoice.amount_paid or 0)
-        summary['total_due'] += float(invoice.amount_due or 0)
+    aging = request.args.get('aging', 'false').lower() == 'true'
+    
+    as_of = request.args.get('as_of')
+    if as_of:
+        try:
+            as_of = datetime.strptime(as_of, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'message': 'Invalid as_of format. Use YYYY-MM-DD'}), 400
+    
+    try:
+        summary = invoice_service.get_invoice_summary(
+            current_user_id,
+            start_date=start_date,
+            end_date=end_date,
+            aging=aging,
+            as_of=as_of,
+            currency=request.args.get('reporting_currency')
+        )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify(summary)
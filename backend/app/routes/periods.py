@@ -0,0 +1,92 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime
+
+from app import db
+from app.models import FiscalPeriod
+from app.services.period_service import PeriodService
+
+bp = Blueprint('periods', __name__, url_prefix='/api/periods')
+period_service = PeriodService()
+
+@bp.route('', methods=['GET'])
+@jwt_required()
+def get_periods():
+    """Get the current user's closed fiscal periods, oldest first"""
+    current_user_id = get_jwt_identity()
+    
+    return jsonify({
+        'items': [period.to_dict() for period in period_service.list_periods(current_user_id)]
+    })
+
+@bp.route('', methods=['POST'])
+@jwt_required()
+def close_period():
+    """
+    Close a fiscal period
+    
+    Expects ``start_date`` (first day of a month, right after the last closed
+    period) and ``end_date`` (last day of a month that has ended). Its
+    monthly balances are frozen and its dates are locked against edits.
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    
+    for field in ('start_date', 'end_date'):
+        if field not in data:
+            return jsonify({'message': f'Missing required field: {field}'}), 400
+    
+    try:
+        start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+        end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    try:
+        period = period_service.close_period(current_user_id, start_date, end_date)
+        
+        return jsonify({
+            'message': 'Fiscal period closed successfully',
+            'period': period.to_dict(include_balances=True)
+        }), 201
+        
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'Fiscal period close error: {str(e)}')
+        return jsonify({'message': 'Failed to close fiscal period'}), 500
+
+@bp.route('/<int:period_id>', methods=['GET'])
+@jwt_required()
+def get_period(period_id):
+    """Get a closed fiscal period with its frozen balances"""
+    current_user_id = get_jwt_identity()
+    
+    period = FiscalPeriod.query.filter_by(id=period_id, user_id=current_user_id).first()
+    
+    if not period:
+        return jsonify({'message': 'Fiscal period not found'}), 404
+    
+    return jsonify(period.to_dict(include_balances=True))
+
+@bp.route('/<int:period_id>', methods=['DELETE'])
+@jwt_required()
+def reopen_period(period_id):
+    """Reopen the most recent closed fiscal period"""
+    current_user_id = get_jwt_identity()
+    
+    period = FiscalPeriod.query.filter_by(id=period_id, user_id=current_user_id).first()
+    
+    if not period:
+        return jsonify({'message': 'Fiscal period not found'}), 404
+    
+    try:
+        period_service.reopen_period(period)
+        return jsonify({'message': 'Fiscal period reopened successfully'})
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'Fiscal period reopen error: {str(e)}')
+        return jsonify({'message': 'Failed to reopen fiscal period'}), 500
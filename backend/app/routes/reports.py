@@ -1,16 +1,21 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, timedelta
-from sqlalchemy import func, extract, desc
-from collections import defaultdict
+from datetime import datetime
 
-from app import db
-from app.models import Transaction, Invoice, TransactionType, InvoiceStatus
+from app.services.etags import ledger_etag
+from app.services.invoice_service import InvoiceService
+from app.services.report_cache import report_cache, cached_report
+from app.services.report_jobs import report_jobs
+from app.services.report_service import ReportService
 
 bp = Blueprint('reports', __name__, url_prefix='/api/reports')
+report_service = ReportService()
+invoice_service = InvoiceService()
 
 @bp.route('/income-expense', methods=['GET'])
 @jwt_required()
+@ledger_etag
+@cached_report
 def income_expense_report():
     """
     Generate income vs expense report for a given date range
@@ -23,7 +28,7 @@ def income_expense_report():
     group_by = request.args.get('group_by', 'month')  # month, week, day, year
     
     # Validate group_by parameter
-    if group_by not in ['day', 'week', 'month', 'year']:
+    if group_by not in ReportService.GROUP_BY_OPTIONS:
         return jsonify({'message': 'Invalid group_by parameter. Must be one of: day, week, month, year'}), 400
     
     # Set default date range if not provided
@@ -37,68 +42,15 @@ def income_expense_report():
         except ValueError:
             return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
     
-    # Build the date part expression based on grouping
-    if group_by == 'year':
-        date_part = extract('year', Transaction.date).label('period')
-    elif group_by == 'month':
-        date_part = func.to_char(Transaction.date, 'YYYY-MM').label('period')
-    elif group_by == 'week':
-        date_part = func.to_char(Transaction.date, 'IYYY-IW').label('period')
-    else:  # day
-        date_part = func.date(Transaction.date).label('period')
-    
-    # Query transactions grouped by period and type
-    transactions = db.session.query(
-        date_part,
-        Transaction.type,
-        func.sum(Transaction.amount).label('total_amount')
-    ).filter(
-        Transaction.user_id == current_user_id,
-        Transaction.date.between(start_date, end_date)
-    ).group_by(
-        'period', Transaction.type
-    ).order_by('period').all()
-    
-    # Process results into a structured format
-    result = defaultdict(lambda: {
-        'period': None,
-        'income': 0.0,
-        'expense': 0.0,
-        'net': 0.0
-    })
-    
-    for period, txn_type, amount in transactions:
-        if period not in result:
-            result[period]['period'] = period
-        
-        if txn_type == 'income':
-            result[period]['income'] += float(amount or 0)
-        else:
-            result[period]['expense'] += float(amount or 0)
-        
-        result[period]['net'] = result[period]['income'] - result[period]['expense']
-    
-    # Convert to list and sort by period
-    report_data = sorted(result.values(), key=lambda x: x['period'])
-    
-    # Calculate totals
-    totals = {
-        'total_income': sum(item['income'] for item in report_data),
-        'total_expense': sum(item['expense'] for item in report_data),
-        'net_income': 0
-    }
-    totals['net_income'] = totals['total_income'] - totals['total_expense']
-    
-    return jsonify({
-        'data': report_data,
-        'totals': totals,
-        'start_date': start_date.isoformat(),
-        'end_date': end_date.isoformat(),
-        'group_by': group_by
-    })
+    try:
+        return jsonify(report_service.income_expense(current_user_id, start_date, end_date, group_by, currency=request.args.get('reporting_currency')))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
 
 @bp.route('/profit-loss', methods=['GET'])
 @jwt_required()
+@ledger_etag
+@cached_report
 def profit_loss_report():
     """
     Generate profit and loss report for a given date range
@@ -120,52 +72,15 @@ def profit_loss_report():
         except ValueError:
             return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
     
-    # Query income transactions grouped by category
-    income = db.session.query(
-        Transaction.category,
-        func.sum(Transaction.amount).label('total_amount')
-    ).filter(
-        Transaction.user_id == current_user_id,
-        Transaction.type == 'income',
-        Transaction.date.between(start_date, end_date)
-    ).group_by(Transaction.category).all()
-    
-    # Query expense transactions grouped by category
-    expenses = db.session.query(
-        Transaction.category,
-        func.sum(Transaction.amount).label('total_amount')
-    ).filter(
-        Transaction.user_id == current_user_id,
-        Transaction.type == 'expense',
-        Transaction.date.between(start_date, end_date)
-    ).group_by(Transaction.category).all()
-    
-    # Calculate totals
-    total_income = sum(float(amount or 0) for _, amount in income)
-    total_expenses = sum(float(amount or 0) for _, amount in expenses)
-    net_profit = total_income - total_expenses
-    
-    # Format response
-    return jsonify({
-        'start_date': start_date.isoformat(),
-        'end_date': end_date.isoformat(),
-        'income': [
-            {'category': category, 'amount': float(amount or 0)}
-            for category, amount in income
-        ],
-        'expenses': [
-            {'category': category, 'amount': float(amount or 0)}
-            for category, amount in expenses
-        ],
-        'totals': {
-            'total_income': total_income,
-            'total_expenses': total_expenses,
-            'net_profit': net_profit
-        }
-    })
+    try:
+        return jsonify(report_service.profit_loss(current_user_id, start_date, end_date, currency=request.args.get('reporting_currency')))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
 
 @bp.route('/cash-flow', methods=['GET'])
 @jwt_required()
+@ledger_etag
+@cached_report
 def cash_flow_report():
     """
     Generate cash flow report for a given date range
@@ -174,7 +89,7 @@ def cash_flow_report():
     
     # Get date range from query params (default to last 12 months)
     end_date = request.args.get('end_date')
-    months = int(request.args.get('months', 12))
+    months = request.args.get('months', 12, type=int)
     
     # Set default end date if not provided
     if end_date:
@@ -185,83 +100,18 @@ def cash_flow_report():
     else:
         end_date = datetime.utcnow().date()
     
-    # Calculate start date based on months
     if months <= 0:
         return jsonify({'message': 'Months must be greater than 0'}), 400
     
-    start_date = (end_date - timedelta(days=30*months)).replace(day=1)
-    
-    # Generate all periods in the range
-    periods = []
-    current = start_date
-    while current <= end_date:
-        periods.append(current.strftime('%Y-%m'))
-        # Move to first day of next month
-        if current.month == 12:
-            current = current.replace(year=current.year + 1, month=1, day=1)
-        else:
-            current = current.replace(month=current.month + 1, day=1)
-    
-    # Query income and expenses by month
-    monthly_data = db.session.query(
-        func.to_char(Transaction.date, 'YYYY-MM').label('month'),
-        Transaction.type,
-        func.sum(Transaction.amount).label('total_amount')
-    ).filter(
-        Transaction.user_id == current_user_id,
-        Transaction.date.between(start_date, end_date)
-    ).group_by(
-        'month', Transaction.type
-    ).order_by('month').all()
-    
-    # Initialize data structure with all periods
-    cash_flow = []
-    for period in periods:
-        cash_flow.append({
-            'period': period,
-            'income': 0.0,
-            'expense': 0.0,
-            'net': 0.0,
-            'running_balance': 0.0
-        })
-    
-    # Fill in the data
-    for month, txn_type, amount in monthly_data:
-        # Find the index of this month in our periods list
-        try:
-            idx = periods.index(month)
-            if txn_type == 'income':
-                cash_flow[idx]['income'] = float(amount or 0)
-            else:
-                cash_flow[idx]['expense'] = float(amount or 0)
-            
-            cash_flow[idx]['net'] = cash_flow[idx]['income'] - cash_flow[idx]['expense']
-        except ValueError:
-            continue  # Skip if month not in our periods (shouldn't happen with our query)
-    
-    # Calculate running balance
-    running_balance = 0.0
-    for period in cash_flow:
-        running_balance += period['net']
-        period['running_balance'] = running_balance
-    
-    # Calculate totals
-    totals = {
-        'total_income': sum(period['income'] for period in cash_flow),
-        'total_expense': sum(period['expense'] for period in cash_flow),
-        'net_cash_flow': sum(period['net'] for period in cash_flow),
-        'ending_balance': running_balance
-    }
-    
-    return jsonify({
-        'start_date': start_date.isoformat(),
-        'end_date': end_date.isoformat(),
-        'data': cash_flow,
-        'totals': totals
-    })
+    try:
+        return jsonify(report_service.cash_flow(current_user_id, end_date, months, currency=request.args.get('reporting_currency')))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
 
 @bp.route('/tax-summary', methods=['GET'])
 @jwt_required()
+@ledger_etag
+@cached_report
 def tax_summary_report():
     """
     Generate tax summary report for a given fiscal year
@@ -271,74 +121,212 @@ def tax_summary_report():
     # Get fiscal year (default to current year)
     fiscal_year = request.args.get('year', datetime.utcnow().year, type=int)
     
-    # Define date range for the fiscal year (assuming calendar year for simplicity)
-    start_date = datetime(fiscal_year, 1, 1).date()
-    end_date = datetime(fiscal_year, 12, 31).date()
-    
-    # Query income and expenses for the year
-    transactions = db.session.query(
-        Transaction.type,
-        Transaction.category,
-        func.sum(Transaction.amount).label('total_amount')
-    ).filter(
-        Transaction.user_id == current_user_id,
-        Transaction.date.between(start_date, end_date)
-    ).group_by(
-        Transaction.type, Transaction.category
-    ).all()
-    
-    # Process transactions into tax categories
-    tax_categories = {
-        'income': {
-            'service': 0.0,
-            'product_sale': 0.0,
-            'other_income': 0.0,
-            'total': 0.0
-        },
-        'expenses': {
-            'office_supplies': 0.0,
-            'rent': 0.0,
-            'utilities': 0.0,
-            'salary': 0.0,
-            'contractor': 0.0,
-            'software': 0.0,
-            'hardware': 0.0,
-            'travel': 0.0,
-            'meals': 0.0,
-            'marketing': 0.0,
-            'professional_services': 0.0,
-            'insurance': 0.0,
-            'taxes': 0.0,
-            'other_expense': 0.0,
-            'total': 0.0
-        },
-        'net_profit': 0.0,
-        'estimated_tax': 0.0
-    }
-    
-    for txn_type, category, amount in transactions:
-        amount_float = float(amount or 0)
-        
-        if txn_type == 'income':
-            if category in tax_categories['income']:
-                tax_categories['income'][category] += amount_float
-            else:
-                tax_categories['income']['other_income'] += amount_float
-            tax_categories['income']['total'] += amount_float
-        else:  # expense
-            if category in tax_categories['expenses']:
-                tax_categories['expenses'][category] += amount_float
-            else:
-                tax_categories['expenses']['other_expense'] += amount_float
-            tax_categories['expenses']['total'] += amount_float
-    
-    # Calculate net profit and estimated tax (simplified)
-    tax_categories['net_profit'] = tax_categories['income']['total'] - tax_categories['expenses']['total']
-    tax_categories['estimated_tax'] = tax_categories['net_profit'] * 0.30  # 30% estimated tax rate (simplified)
+    try:
+        return jsonify(report_service.tax_summary(current_user_id, fiscal_year, currency=request.args.get('reporting_currency')))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+@bp.route('/ar-aging', methods=['GET'])
+@jwt_required()
+@ledger_etag
+@cached_report
+def ar_aging_report():
+    """
+    Accounts-receivable aging of open invoices per client
+    
+    Amount due is bucketed by days past due as of ``as_of`` (default today).
+    ``client_id`` drills down into one client and lists its open invoices.
+    """
+    current_user_id = get_jwt_identity()
+    
+    as_of = request.args.get('as_of')
+    if as_of:
+        try:
+            as_of = datetime.strptime(as_of, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'message': 'Invalid as_of format. Use YYYY-MM-DD'}), 400
+    else:
+        as_of = datetime.utcnow().date()
+    
+    client_id = request.args.get('client_id')
+    if client_id is not None and not client_id.isdigit():
+        return jsonify({'message': 'client_id must be an integer'}), 400
+    
+    try:
+        return jsonify(invoice_service.get_ar_aging(
+            current_user_id, as_of=as_of, client_id=int(client_id) if client_id else None,
+            currency=request.args.get('reporting_currency')
+        ))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+@bp.route('/projects', methods=['GET'])
+@jwt_required()
+def project_report():
+    """
+    Income, expense, margin and budget burn per project and month
+    
+    ``start_date``/``end_date`` are optional and widened to whole months;
+    ``project_id`` restricts the report to one project and ``active=true``
+    to active projects. Not cached: budgets can change without a ledger
+    write, and the report only reads the monthly project rollups.
+    """
+    current_user_id = get_jwt_identity()
+    
+    try:
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    project_id = request.args.get('project_id')
+    if project_id is not None and not project_id.isdigit():
+        return jsonify({'message': 'project_id must be an integer'}), 400
+    
+    try:
+        return jsonify(report_service.projects(
+            current_user_id, start_date, end_date,
+            project_id=int(project_id) if project_id else None,
+            active_only=request.args.get('active', '').lower() == 'true',
+            currency=request.args.get('reporting_currency')
+        ))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+@bp.route('/pivot', methods=['GET'])
+@jwt_required()
+@ledger_etag
+@cached_report
+def pivot_report():
+    """
+    Ad-hoc totals grouped by any combination of dimensions
+    
+    ``group_by`` is a comma-separated list of day, week, month, year, type,
+    category and project; ``type`` optionally restricts the transaction
+    types (comma-separated). ``start_date``/``end_date`` are optional.
+    Like every report, amounts are in ``reporting_currency`` (default
+    REPORTING_CURRENCY).
+    """
+    current_user_id = get_jwt_identity()
+    
+    group_by = [d.strip() for d in request.args.get('group_by', 'month,type').split(',') if d.strip()]
+    types = request.args.get('type')
+    types = [t.strip() for t in types.split(',')] if types else None
+    
+    try:
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    try:
+        return jsonify(report_service.pivot(
+            current_user_id, group_by, start_date, end_date, types,
+            currency=request.args.get('reporting_currency')
+        ))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+@bp.route('/bundle', methods=['GET'])
+@jwt_required()
+@ledger_etag
+@cached_report
+def report_bundle():
+    """
+    Several reports in one response, computed from one grouped scan
+    
+    ``reports`` is a comma-separated list of income_expense, profit_loss,
+    cash_flow, tax_summary and transaction_summary (default: all). The other
+    query parameters are shared and default like the individual endpoints:
+    ``start_date``/``end_date``, ``group_by``, ``months``, ``year`` and
+    ``reporting_currency``.
+    """
+    current_user_id = get_jwt_identity()
+    
+    names = request.args.get('reports')
+    if names:
+        names = [n.strip().replace('-', '_') for n in names.split(',') if n.strip()]
+    else:
+        names = ReportService.BUNDLE_REPORTS
+    
+    try:
+        plan = ReportService.plan(names, request.args, today=datetime.utcnow().date())
+        return jsonify(report_service.bundle(current_user_id, plan))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+@bp.route('/jobs', methods=['POST'])
+@jwt_required()
+def create_report_job():
+    """
+    Queue a report to be computed in the background
+    
+    Expects ``{"report": "income_expense", "params": {...}}`` where report is
+    one of the bundle reports and params are the query parameters of its
+    endpoint. Poll the returned status URL, or long-poll the wait URL.
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    
+    report = (data.get('report') or '').replace('-', '_')
+    if not report:
+        return jsonify({'message': 'Missing required field: report'}), 400
+    
+    params = data.get('params') or {}
+    if not isinstance(params, dict):
+        return jsonify({'message': 'params must be an object'}), 400
+    
+    try:
+        job = report_jobs.enqueue(current_user_id, report, params)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f'Report job enqueue error: {str(e)}')
+        return jsonify({'message': 'Failed to queue report job'}), 500
     
     return jsonify({
-        'fiscal_year': fiscal_year,
-        'start_date': start_date.isoformat(),
-        'end_date': end_date.isoformat(),
-        'tax_categories': tax_categories
-    })
+        'message': 'Report job queued',
+        'job': job,
+        'status_url': url_for('reports.get_report_job', job_id=job['id']),
+        'wait_url': url_for('reports.wait_report_job', job_id=job['id'])
+    }), 202
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_report_job(job_id):
+    """Get the status of a report job, with its result once completed"""
+    current_user_id = get_jwt_identity()
+    
+    job = report_jobs.get(job_id, user_id=current_user_id)
+    if not job:
+        return jsonify({'message': 'Report job not found'}), 404
+    
+    return jsonify(job)
+
+@bp.route('/jobs/<job_id>/wait', methods=['GET'])
+@jwt_required()
+def wait_report_job(job_id):
+    """
+    Long-poll a report job
+    
+    Returns as soon as the job has completed or failed, or after ``timeout``
+    seconds (capped at REPORT_JOBS_MAX_WAIT) with the job still pending.
+    """
+    current_user_id = get_jwt_identity()
+    timeout = request.args.get('timeout', type=float)
+    
+    job = report_jobs.wait(job_id, user_id=current_user_id, timeout=timeout)
+    if not job:
+        return jsonify({'message': 'Report job not found'}), 404
+    
+    return jsonify(job)
+
+@bp.route('/cache-stats', methods=['GET'])
+@jwt_required()
+def cache_stats():
+    """Get hit/miss counters of the report cache"""
+    return jsonify(report_cache.stats())
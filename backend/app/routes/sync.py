@@ -0,0 +1,36 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.services.sync_service import SyncService, SyncTokenExpiredError
+
+bp = Blueprint('sync', __name__, url_prefix='/api/sync')
+
+def _sync_service():
+    return SyncService(
+        overlap_seconds=current_app.config.get('SYNC_OVERLAP_SECONDS', 5),
+        retention_days=current_app.config.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90)
+    )
+
+@bp.route('', methods=['GET'])
+@jwt_required()
+def sync():
+    """
+    Get the transactions, invoices and clients changed since a sync token
+
+    Without ``since`` every record is returned (a full sync). Pass the
+    returned ``next_token`` as ``since`` to get only later changes; while
+    ``has_more`` is true, call again right away with the new token.
+    ``limit`` caps the rows per entity (default SYNC_PAGE_SIZE). Apply the
+    ``deleted`` ids before the changed rows; a change may be sent more than
+    once, so both are applied as idempotent deletes and upserts by id.
+    An expired token returns 410 and the client starts over with a full sync.
+    """
+    current_user_id = get_jwt_identity()
+    limit = request.args.get('limit', current_app.config.get('SYNC_PAGE_SIZE', 500), type=int)
+
+    try:
+        return jsonify(_sync_service().changes(current_user_id, token=request.args.get('since'), limit=limit))
+    except SyncTokenExpiredError as e:
+        return jsonify({'message': str(e)}), 410
+    except ValueError:
+        return jsonify({'message': 'Invalid sync token'}), 400
@@ -1,27 +1,38 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-from sqlalchemy import desc, or_
+from sqlalchemy import desc
 
 from app import db
 from app.models import Transaction, TransactionType, TransactionCategory
+from app.models.read_models import TransactionRow
 from app.services.transaction_service import TransactionService
+from app.services.etags import ledger_etag
+from app.services.period_service import PeriodClosedError
+from app.services.search_service import SearchService
+from app.utils.export import export_format, stream_export
+from app.utils.pagination import keyset_paginate
 
 bp = Blueprint('transactions', __name__, url_prefix='/api/transactions')
 transaction_service = TransactionService()
+search_service = SearchService()
 
-@bp.route('', methods=['GET'])
-@jwt_required()
-def get_transactions():
+def _filtered_query(user_id, rank=False):
     """
-    Get all transactions with optional filtering and pagination
-    """
-    current_user_id = get_jwt_identity()
+    Build the transaction query for the filters in the request arguments
     
-    # Pagination
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
+    Shared by the list and export endpoints.
     
+    Args:
+        user_id (int): ID of the current user
+        rank (bool): Order search results by relevance
+        
+    Returns:
+        Query: Filtered query over the user's transactions
+        
+    Raises:
+        ValueError: If a date filter is malformed
+    """
     # Filters
     type_filter = request.args.get('type')
     category_filter = request.args.get('category')
@@ -32,7 +43,7 @@ def get_transactions():
     search = request.args.get('search')
     
     # Build query
-    query = Transaction.query.filter_by(user_id=current_user_id)
+    query = Transaction.query.filter_by(user_id=user_id)
     
     if type_filter:
         query = query.filter(Transaction.type == type_filter)
@@ -45,14 +56,14 @@ def get_transactions():
             start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
             query = query.filter(Transaction.date >= start_date)
         except ValueError:
-            return jsonify({'message': 'Invalid start_date format. Use YYYY-MM-DD'}), 400
+            raise ValueError('Invalid start_date format. Use YYYY-MM-DD')
     
     if end_date:
         try:
             end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
             query = query.filter(Transaction.date <= end_date)
         except ValueError:
-            return jsonify({'message': 'Invalid end_date format. Use YYYY-MM-DD'}), 400
+            raise ValueError('Invalid end_date format. Use YYYY-MM-DD')
     
     if reconciled is not None:
         query = query.filter(Transaction.is_reconciled == (reconciled.lower() == 'true'))
@@ -61,27 +72,109 @@ def get_transactions():
         query = query.filter(Transaction.project_id == project_id)
     
     if search:
-        search = f"%{search}%"
-        query = query.filter(
-            or_(
-                Transaction.description.ilike(search),
-                Transaction.reference.ilike(search)
+        query = search_service.apply(query, Transaction, search, rank=rank)
+    
+    return query
+
+@bp.route('', methods=['GET'])
+@jwt_required()
+@ledger_etag
+def get_transactions():
+    """
+    Get all transactions with optional filtering and pagination
+    
+    Passing ``cursor`` (empty for the first page) switches to keyset
+    pagination on (date, created_at, id); ``include_total=true`` adds an
+    exact count in that mode. ``search`` matches words by prefix using the
+    full-text index; add ``sort=relevance`` to order page-based results by rank.
+    Rows are read into TransactionRow read models rather than ORM instances.
+    """
+    current_user_id = get_jwt_identity()
+    
+    # Pagination
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    
+    # Relevance ordering only applies to page-based pagination
+    rank = request.args.get('sort') == 'relevance' and 'cursor' not in request.args
+    
+    try:
+        query = TransactionRow.select(_filtered_query(current_user_id, rank=rank))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    # Keyset pagination
+    if 'cursor' in request.args:
+        try:
+            page = keyset_paginate(
+                query,
+                [Transaction.date, Transaction.created_at, Transaction.id],
+                cursor=request.args.get('cursor'),
+                per_page=max(per_page, 1),
+                include_total=request.args.get('include_total', '').lower() == 'true'
             )
-        )
+        except ValueError:
+            return jsonify({'message': 'Invalid cursor'}), 400
+        
+        return jsonify({
+            'items': [t.to_dict() for t in TransactionRow.from_rows(page.items)],
+            'next_cursor': page.next_cursor,
+            'has_more': page.has_more,
+            'total': page.total
+        })
     
     # Order and paginate
     transactions = query.order_by(desc(Transaction.date), desc(Transaction.created_at))\
                        .paginate(page=page, per_page=per_page, error_out=False)
     
     return jsonify({
-        'items': [t.to_dict() for t in transactions.items],
+        'items': [t.to_dict() for t in TransactionRow.from_rows(transactions.items)],
         'total': transactions.total,
         'pages': transactions.pages,
         'current_page': transactions.page
     })
 
+@bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_transactions():
+    """
+    Export transactions as CSV or NDJSON
+    
+    Takes the filters of the list endpoint plus ``format`` (csv or ndjson,
+    default csv). Rows are streamed oldest first straight from a database
+    cursor, so the export size is not limited by memory.
+    """
+    current_user_id = get_jwt_identity()
+    
+    try:
+        fmt = export_format(request.args.get('format'))
+        query = _filtered_query(current_user_id)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    columns = [
+        Transaction.id,
+        Transaction.date,
+        Transaction.amount,
+        Transaction.currency,
+        Transaction.type,
+        Transaction.category,
+        Transaction.description,
+        Transaction.reference,
+        Transaction.is_reconciled,
+        Transaction.project_id,
+        Transaction.invoice_id,
+        Transaction.created_at,
+        Transaction.updated_at
+    ]
+    query = query.with_entities(*columns)\
+                 .order_by(Transaction.date, Transaction.created_at, Transaction.id)
+    
+    return stream_export(query, [column.key for column in columns], fmt, 'transactions')
+
 @bp.route('/<int:transaction_id>', methods=['GET'])
 @jwt_required()
+@ledger_etag
 def get_transaction(transaction_id):
     """Get a single transaction by ID"""
     current_user_id = get_jwt_identity()
@@ -128,6 +221,44 @@ def create_transaction():
         current_app.logger.error(f'Transaction creation error: {str(e)}')
         return jsonify({'message': 'Failed to create transaction'}), 500
 
+@bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_transactions():
+    """
+    Create many transactions in one request
+    
+    Expects ``{"transactions": [...]}`` with up to BULK_TRANSACTION_LIMIT rows.
+    Invalid rows are reported per index and do not prevent the valid rows
+    from being created.
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    rows = data.get('transactions')
+    
+    if not isinstance(rows, list) or len(rows) == 0:
+        return jsonify({'message': 'At least one transaction is required'}), 400
+    
+    limit = current_app.config.get('BULK_TRANSACTION_LIMIT', 1000)
+    if len(rows) > limit:
+        return jsonify({'message': f'At most {limit} transactions can be created per request'}), 400
+    
+    try:
+        created, errors = transaction_service.bulk_create_transactions(
+            user_id=current_user_id,
+            rows=rows,
+            chunk_size=current_app.config.get('BULK_INSERT_CHUNK_SIZE', 500)
+        )
+    except Exception as e:
+        current_app.logger.error(f'Bulk transaction creation error: {str(e)}')
+        return jsonify({'message': 'Failed to create transactions'}), 500
+    
+    return jsonify({
+        'message': f'{created} transactions created',
+        'created': created,
+        'failed': len(errors),
+        'errors': errors
+    }), 201 if created else 400
+
 @bp.route('/<int:transaction_id>', methods=['PUT'])
 @jwt_required()
 def update_transaction(transaction_id):
@@ -167,18 +298,13 @@ def delete_transaction(transaction_id):
     """Delete a transaction"""
     current_user_id = get_jwt_identity()
     
-    transaction = Transaction.query.filter_by(
-        id=transaction_id,
-        user_id=current_user_id
-    ).first()
-    
-    if not transaction:
-        return jsonify({'message': 'Transaction not found'}), 404
-    
     try:
-        db.session.delete(transaction)
-        db.session.commit()
+        transaction_service.delete_transaction(transaction_id, current_user_id)
         return jsonify({'message': 'Transaction deleted successfully'})
+    except PeriodClosedError as e:
+        return jsonify({'message': str(e)}), 400
+    except ValueError:
+        return jsonify({'message': 'Transaction not found'}), 404
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f'Transaction deletion error: {str(e)}')
@@ -186,6 +312,7 @@ def delete_transaction(transaction_id):
 
 @bp.route('/summary', methods=['GET'])
 @jwt_required()
+@ledger_etag
 def get_transaction_summary():
     """Get transaction summary (totals by type/category)"""
     current_user_id = get_jwt_identity()
@@ -194,58 +321,24 @@ def get_transaction_summary():
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    # Build base query
-    query = db.session.query(
-        Transaction.type,
-        Transaction.category,
-        db.func.sum(Transaction.amount).label('total_amount')
-    ).filter(Transaction.user_id == current_user_id)
-    
-    # Apply date filters if provided
+    # Parse date filters if provided
     if start_date:
         try:
             start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-            query = query.filter(Transaction.date >= start_date)
         except ValueError:
             return jsonify({'message': 'Invalid start_date format. Use YYYY-MM-DD'}), 400
     
     if end_date:
         try:
             end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-            query = query.filter(Transaction.date <= end_date)
         except ValueError:
             return jsonify({'message': 'Invalid end_date format. Use YYYY-MM-DD'}), 400
     
-    # Group by type and category
-    results = query.group_by(Transaction.type, Transaction.category).all()
-    
-    # Format results
-    summary = {
-        'total_income': 0,
-        'total_expenses': 0,
-        'by_category': {},
-        'by_type': {}
-    }
-    
-    for type_, category, amount in results:
-        amount = float(amount) if amount else 0
-        
-        # Update type totals
-        if type_ not in summary['by_type']:
-            summary['by_type'][type_] = 0
-        summary['by_type'][type_] += amount
-        
-        # Update category totals
-        if category not in summary['by_category']:
-            summary['by_category'][category] = 0
-        summary['by_category'][category] += amount
-        
-        # Update overall totals
-        if type_ == 'income':
-            summary['total_income'] += amount
-        else:
-            summary['total_expenses'] += amount
-    
-    summary['net_income'] = summary['total_income'] - summary['total_expenses']
+    try:
+        summary = transaction_service.get_transaction_summary(
+            current_user_id, start_date, end_date, currency=request.args.get('reporting_currency')
+        )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify(summary)
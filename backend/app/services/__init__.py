@@ -2,6 +2,13 @@
 from .auth_service import AuthService
 from .transaction_service import TransactionService
 from .invoice_service import InvoiceService
+from .ledger_service import LedgerService
+from .checkpoint_service import CheckpointService
+from .rollup_service import RollupService
+from .report_service import ReportService
+from .import_service import ImportService
+from .search_service import SearchService
+from .period_service import PeriodService, PeriodClosedError
 
 # Initialize service instances
 auth_service = AuthService()
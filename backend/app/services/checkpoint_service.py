@@ -0,0 +1,137 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import select, func, insert, update, delete, and_
+
+from app import db
+from app.models import BalanceCheckpoint, Transaction, TransactionType, User
+
+class CheckpointService:
+    """Service for the per-user monthly balance checkpoints
+
+    A checkpoint holds the cumulative net (income minus every other type, as
+    in the reports) of all transactions in one currency up to the end of its
+    month, so the opening balances of any month are one indexed lookup.
+    Checkpoints are maintained incrementally by RollupService on every
+    transaction write and rebuilt together with the rollups.
+    """
+
+    @staticmethod
+    def month_of(day):
+        return date(day.year, day.month, 1)
+
+    @staticmethod
+    def signed(txn_type, amount):
+        """Contribution of a transaction to the balance"""
+        return amount if TransactionType(txn_type) == TransactionType.INCOME else -amount
+
+    def balance_before(self, user_id, month):
+        """
+        Get the balances carried into a month
+
+        Args:
+            user_id (int): ID of the user
+            month (date): First day of the month
+
+        Returns:
+            dict: Currency code to the cumulative net (Decimal) of every
+                transaction in that currency dated before the month
+        """
+        latest = select(
+            BalanceCheckpoint.currency, func.max(BalanceCheckpoint.month).label('month')
+        ).where(
+            BalanceCheckpoint.user_id == user_id, BalanceCheckpoint.month < month
+        ).group_by(BalanceCheckpoint.currency).subquery()
+
+        rows = db.session.execute(
+            select(BalanceCheckpoint.currency, BalanceCheckpoint.cumulative_net)
+            .join(latest, and_(
+                BalanceCheckpoint.currency == latest.c.currency,
+                BalanceCheckpoint.month == latest.c.month
+            ))
+            .where(BalanceCheckpoint.user_id == user_id)
+        )
+        return {currency: Decimal(balance) for currency, balance in rows}
+
+    def apply(self, deltas):
+        """
+        Add net changes to the checkpoints of their month and every later one, without committing
+
+        Args:
+            deltas (dict): (user_id, month, currency) -> Decimal net change
+        """
+        table = BalanceCheckpoint.__table__
+        locked = set()
+
+        for (user_id, month, currency), delta in sorted(deltas.items()):
+            if not delta:
+                continue
+
+            # Serialize checkpoint writers per user, so a new month's starting
+            # balance cannot miss a concurrent change to an earlier month
+            if user_id not in locked:
+                db.session.execute(select(User.id).where(User.id == user_id).with_for_update())
+                locked.add(user_id)
+
+            latest = db.session.execute(
+                select(table.c.month, table.c.cumulative_net)
+                .where(table.c.user_id == user_id, table.c.currency == currency, table.c.month <= month)
+                .order_by(table.c.month.desc())
+                .limit(1)
+            ).first()
+
+            if latest is None or latest.month != month:
+                previous = Decimal(latest.cumulative_net) if latest is not None else Decimal('0')
+                db.session.execute(insert(table).values(
+                    user_id=user_id, month=month, currency=currency, cumulative_net=previous + delta
+                ))
+                later = table.c.month > month
+            else:
+                later = table.c.month >= month
+
+            db.session.execute(
+                update(table)
+                .where(table.c.user_id == user_id, table.c.currency == currency, later)
+                .values(cumulative_net=table.c.cumulative_net + delta)
+            )
+
+    def rebuild(self, user_id=None):
+        """
+        Recompute the checkpoints from the transactions table, without committing
+
+        Args:
+            user_id (int, optional): Only rebuild this user's checkpoints
+
+        Returns:
+            int: Number of checkpoints written
+        """
+        table = BalanceCheckpoint.__table__
+
+        clear = delete(table)
+        source = select(
+            Transaction.user_id, Transaction.currency, Transaction.date, Transaction.type,
+            func.sum(Transaction.amount)
+        ).group_by(Transaction.user_id, Transaction.currency, Transaction.date, Transaction.type)
+
+        if user_id is not None:
+            clear = clear.where(table.c.user_id == user_id)
+            source = source.where(Transaction.user_id == user_id)
+
+        nets = {}
+        for owner, currency, day, txn_type, amount in db.session.execute(source):
+            key = (owner, currency, self.month_of(day))
+            nets[key] = nets.get(key, Decimal('0')) + self.signed(txn_type, Decimal(amount))
+
+        rows = []
+        running = {}
+        for (owner, currency, month), net in sorted(nets.items()):
+            running[owner, currency] = running.get((owner, currency), Decimal('0')) + net
+            rows.append({
+                'user_id': owner, 'currency': currency, 'month': month,
+                'cumulative_net': running[owner, currency]
+            })
+
+        db.session.execute(clear)
+        if rows:
+            db.session.execute(insert(table), rows)
+        return len(rows)
@@ -0,0 +1,101 @@
+"""
+Conditional GET for responses derived from a user's ledger.
+
+A response's ETag is a digest of the user, the endpoint and its URL
+arguments, the normalized query parameters, the day (views default their
+date ranges to "today") and the user's ledger version. Every ledger write
+bumps the version, so a tag only matches while nothing it was computed from
+has changed. A matching If-None-Match is therefore answered with 304 after
+a single primary-key lookup of the version, before the view runs any of its
+queries.
+
+Tags are strong. When the response is compressed, the compressor appends
+the content coding to the tag (``"<digest>-gzip"``), since the encoded body
+is a different sequence of bytes; any coding of a tag matches.
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from flask import request, make_response, current_app
+from flask_jwt_extended import get_jwt_identity
+
+from app.services.ledger_service import LedgerService
+
+ledger_service = LedgerService()
+
+def normalize_params(params):
+    """
+    Serialize query parameters independently of their order
+
+    Args:
+        params (MultiDict): Query parameters
+
+    Returns:
+        str: Parameters as sorted name=value pairs
+    """
+    return '&'.join(
+        f'{name}={value}'
+        for name in sorted(params.keys())
+        for value in sorted(params.getlist(name))
+    )
+
+def make_etag(user_id, endpoint, view_args, params, version):
+    """
+    Build the ETag of a ledger-derived response
+
+    Args:
+        user_id (int): ID of the user
+        endpoint (str): Flask endpoint name
+        view_args (dict): URL arguments of the endpoint
+        params (MultiDict): Query parameters
+        version (int): Ledger version of the user
+
+    Returns:
+        str: Unquoted strong entity tag
+    """
+    path_args = '&'.join(f'{name}={value}' for name, value in sorted((view_args or {}).items()))
+    today = datetime.utcnow().date().isoformat()
+    identity = f'{user_id}|{endpoint}|{path_args}|{normalize_params(params)}|{today}|v{version}'
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+def _client_has(etag):
+    """The If-None-Match tag naming this tag in any content coding, True for *, else None"""
+    candidates = request.if_none_match
+    if candidates.star_tag:
+        return True
+    # If-None-Match uses the weak comparison, so W/ tags match as well
+    for candidate in candidates.as_set(include_weak=True):
+        if candidate == etag or candidate.startswith(f'{etag}-'):
+            return candidate
+    return None
+
+def ledger_etag(view):
+    """
+    Tag a GET view's response with an ETag and answer If-None-Match with 304
+
+    Must be applied below @jwt_required() so the user identity is available,
+    and above @cached_report so a revalidation skips the cache lookup too.
+    Only successful responses are tagged.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user_id = get_jwt_identity()
+        version = ledger_service.get_version(user_id)
+        etag = make_etag(user_id, request.endpoint, request.view_args, request.args, version)
+
+        matched = _client_has(etag)
+        if matched:
+            response = current_app.response_class(status=304)
+            response.set_etag(etag if matched is True else matched)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            response.set_etag(etag)
+            # Per-user data: browsers may keep it, but must revalidate before reuse
+            response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return wrapper
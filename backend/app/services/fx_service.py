@@ -0,0 +1,301 @@
+"""
+Exchange rates.
+
+Daily rates are stored in fx_rates as units of a currency per one unit of
+FX_BASE_CURRENCY and loaded from CSV files with `flask fx load`. Lookups go
+through FxRateCache, which keeps each currency's rates in memory as sorted
+NumPy arrays of day numbers and rates, so converting a whole column of
+amounts is one binary search (searchsorted) per source currency rather than
+a lookup per row. A day without a rate (weekends, holidays) uses the latest
+earlier rate.
+
+The cache is revalidated against MAX(fx_rates.loaded_at) at most once per
+request, and only when a conversion is actually needed.
+"""
+import csv
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+from flask import g
+from sqlalchemy import delete, func, insert, select
+
+from app import db
+from app.models import FxRate
+from app.services.ledger_service import LedgerService
+from app.utils.money import DEFAULT_CURRENCY, normalize_currency
+
+# Day numbers count days since 1970-01-01, as in the report engine
+EPOCH = date(1970, 1, 1)
+
+class FxRateCache:
+    """Date-indexed in-memory rate series per currency"""
+
+    def __init__(self):
+        self.base = DEFAULT_CURRENCY
+        self.default_currency = DEFAULT_CURRENCY
+        self.version = None
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the cache from the app config
+
+        Config:
+            FX_BASE_CURRENCY: Currency the stored rates are quoted against
+            REPORTING_CURRENCY: Currency of reports that do not ask for one
+        """
+        self.base = normalize_currency(app.config.get('FX_BASE_CURRENCY', DEFAULT_CURRENCY))
+        self.default_currency = normalize_currency(app.config.get('REPORTING_CURRENCY', DEFAULT_CURRENCY))
+        self.clear()
+        app.extensions['fx_rates'] = self
+
+    def clear(self):
+        with self._lock:
+            self._series = {}
+            self.version = None
+
+    def reporting_currency(self, code=None):
+        """Validate a requested reporting currency; empty means REPORTING_CURRENCY"""
+        return normalize_currency(code, default=self.default_currency)
+
+    def refresh(self):
+        """Drop the cached series if rates were loaded since they were read"""
+        if g.get('fx_rates_checked'):
+            return
+        version = db.session.query(func.max(FxRate.loaded_at)).scalar()
+        with self._lock:
+            if version != self.version:
+                self._series = {}
+                self.version = version
+        g.fx_rates_checked = True
+
+    def series(self, currency):
+        """
+        Get the rates of a currency against the base
+
+        Returns:
+            tuple: (days, rates) arrays sorted by day number
+        """
+        with self._lock:
+            cached = self._series.get(currency)
+        if cached is not None:
+            return cached
+
+        rows = db.session.execute(
+            select(FxRate.day, FxRate.rate)
+            .where(FxRate.base == self.base, FxRate.currency == currency)
+            .order_by(FxRate.day)
+        ).all()
+        series = (
+            np.array([(day - EPOCH).days for day, _ in rows], dtype=np.int64),
+            np.array([float(rate) for _, rate in rows], dtype=np.float64)
+        )
+        with self._lock:
+            self._series[currency] = series
+        return series
+
+    def rates(self, currency, days):
+        """
+        Rates of a currency against the base, on or before each day
+
+        Args:
+            currency (str): Currency code
+            days (ndarray): Day numbers
+
+        Returns:
+            ndarray: float64 rate per day
+
+        Raises:
+            ValueError: If a day is before the first known rate
+        """
+        if currency == self.base:
+            return np.ones(len(days), dtype=np.float64)
+
+        series_days, series_rates = self.series(currency)
+        index = np.searchsorted(series_days, days, side='right') - 1
+        if len(index) and index.min() < 0:
+            missing = EPOCH + timedelta(days=int(days[index < 0].min()))
+            raise ValueError(f'No {self.base}/{currency} exchange rate on or before {missing.isoformat()}')
+        return series_rates[index]
+
+    def convert(self, amounts, currencies, codes, days, target):
+        """
+        Convert a column of amounts to one currency
+
+        Args:
+            amounts (ndarray): int64 cents
+            currencies (ndarray): Index into codes for each amount
+            codes (sequence): Currency codes
+            days (ndarray): Day number of each amount
+            target (str): Currency to convert to
+
+        Returns:
+            ndarray: int64 cents in the target currency, rounded to the
+                nearest cent; the input array itself if nothing needs converting
+
+        Raises:
+            ValueError: If a rate is missing
+        """
+        foreign = [index for index, code in enumerate(codes) if code != target]
+        if not foreign:
+            return amounts
+
+        self.refresh()
+        converted = amounts.copy()
+        for index in foreign:
+            mask = currencies == index
+            if not mask.any():
+                continue
+            row_days = days[mask]
+            factors = self.rates(target, row_days) / self.rates(codes[index], row_days)
+            converted[mask] = np.rint(amounts[mask] * factors).astype(np.int64)
+        return converted
+
+    def convert_cents(self, cents, source, target, day):
+        """Convert one amount of cents at the rate of a day"""
+        if source == target:
+            return cents
+        return int(self.convert(
+            np.array([cents], dtype=np.int64),
+            np.zeros(1, dtype=np.int64),
+            (source,),
+            np.array([(day - EPOCH).days], dtype=np.int64),
+            target
+        )[0])
+
+fx_rates = FxRateCache()
+
+class FxService:
+    """Service for loading exchange rates"""
+
+    def __init__(self, cache=None):
+        self.cache = cache or fx_rates
+        self.ledger_service = LedgerService()
+
+    def load_csv(self, stream, base=None):
+        """
+        Load daily rates from a CSV file, replacing stored rates of the same days
+
+        Two layouts are accepted:
+            long: ``date,currency,rate`` columns, one rate per line
+            wide: a date column followed by one column per currency, as in
+                the ECB reference rate history; empty and N/A cells are skipped
+
+        Rates are units of each currency per one unit of ``base``. Files
+        quoted against another base than FX_BASE_CURRENCY are rebased on
+        load, which needs a FX_BASE_CURRENCY rate on every day of the file.
+        Every user's ledger version is bumped, since converted reports change.
+
+        Args:
+            stream (file): Text stream of the CSV file
+            base (str, optional): Base currency of the file, default FX_BASE_CURRENCY
+
+        Returns:
+            int: Number of rates stored
+
+        Raises:
+            ValueError: If the file is malformed
+        """
+        base = normalize_currency(base, default=self.cache.base)
+        rates = self._rebase(self._parse(stream), base)
+        if not rates:
+            raise ValueError('No exchange rates found in the file')
+
+        loaded_at = datetime.utcnow()
+        rows = [
+            {
+                'day': day, 'base': self.cache.base, 'currency': currency,
+                'rate': rate, 'loaded_at': loaded_at
+            }
+            for day, day_rates in sorted(rates.items())
+            for currency, rate in sorted(day_rates.items())
+        ]
+
+        days_by_currency = {}
+        for row in rows:
+            days_by_currency.setdefault(row['currency'], []).append(row['day'])
+
+        try:
+            table = FxRate.__table__
+            for currency, days in days_by_currency.items():
+                for start in range(0, len(days), 500):
+                    db.session.execute(delete(table).where(
+                        table.c.base == self.cache.base,
+                        table.c.currency == currency,
+                        table.c.day.in_(days[start:start + 500])
+                    ))
+            db.session.execute(insert(table), rows)
+            self.ledger_service.bump_all_versions()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f'Failed to load exchange rates: {str(e)}')
+
+        self.cache.clear()
+        return len(rows)
+
+    @staticmethod
+    def _parse(stream):
+        """Read a long or wide CSV file into {day: {currency: Decimal rate}}"""
+        reader = csv.reader(stream)
+        header = [column.strip() for column in next(reader, [])]
+        names = [column.lower() for column in header]
+        if not header:
+            raise ValueError('The file is empty')
+
+        long_layout = {'date', 'currency', 'rate'} <= set(names)
+        if long_layout:
+            date_index, currency_index, rate_index = (names.index(n) for n in ('date', 'currency', 'rate'))
+        else:
+            currencies = {
+                index: normalize_currency(column)
+                for index, column in enumerate(header) if index > 0 and column
+            }
+
+        rates = {}
+        for line, row in enumerate(reader, start=2):
+            if not any(cell.strip() for cell in row):
+                continue
+            try:
+                if long_layout:
+                    cells = [(row[currency_index], row[rate_index])]
+                    day = row[date_index]
+                else:
+                    cells = [(currencies[i], row[i]) for i in currencies if i < len(row)]
+                    day = row[0]
+                day = datetime.strptime(day.strip(), '%Y-%m-%d').date()
+
+                for currency, value in cells:
+                    value = value.strip()
+                    if not value or value.upper() == 'N/A':
+                        continue
+                    rate = Decimal(value)
+                    if not rate.is_finite() or rate <= 0:
+                        raise ValueError(f'Invalid rate: {value}')
+                    rates.setdefault(day, {})[normalize_currency(currency)] = rate
+            except (ValueError, IndexError, InvalidOperation) as e:
+                raise ValueError(f'Line {line}: {str(e) or "malformed row"}')
+        return rates
+
+    def _rebase(self, rates, base):
+        """Re-quote {day: {currency: rate}} from base against FX_BASE_CURRENCY"""
+        target = self.cache.base
+        if base == target:
+            return {
+                day: {currency: rate for currency, rate in day_rates.items() if currency != target}
+                for day, day_rates in rates.items()
+            }
+
+        rebased = {}
+        for day, day_rates in rates.items():
+            pivot = day_rates.get(target)
+            if pivot is None:
+                raise ValueError(f'No {target} rate on {day.isoformat()} to rebase {base} rates')
+            rebased[day] = {
+                currency: rate / pivot for currency, rate in day_rates.items() if currency != target
+            }
+            rebased[day][base] = 1 / pivot
+        return rebased
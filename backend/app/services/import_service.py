@@ -0,0 +1,305 @@
+import hashlib
+import os
+import threading
+import uuid
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.utils import secure_filename
+
+from app import db
+from app.models import (
+    Transaction, TransactionType, TransactionCategory, StatementImport, ImportStatus
+)
+from app.services.ledger_service import LedgerService
+from app.services.period_service import PeriodClosedError, PeriodService
+from app.services.rollup_service import RollupService
+from app.services.statement_parsers import (
+    SUPPORTED_FORMATS, StatementParseError, detect_format, parse_statement
+)
+from app.utils.money import normalize_currency
+
+class ImportService:
+    """Service for importing bank statement files into the ledger
+    
+    The import is a chain of generators: parse -> normalize -> chunk -> write.
+    Only one chunk of rows is held in memory at a time, and every row carries
+    a content hash that is unique per user, so importing the same file (or an
+    overlapping export) twice never creates duplicate transactions.
+    """
+    
+    MAX_STORED_ERRORS = 100
+    PARSER_OPTIONS = ('date_format', 'delimiter', 'encoding', 'date_column',
+                      'amount_column', 'description_column', 'reference_column', 'currency_column')
+    
+    def __init__(self):
+        self.rollup_service = RollupService()
+        self.ledger_service = LedgerService()
+        self.period_service = PeriodService()
+    
+    def create_import(self, user_id, file, upload_folder, format=None, **options):
+        """
+        Store an uploaded statement and register it for import
+        
+        Args:
+            user_id (int): ID of the importing user
+            file (FileStorage): Uploaded file
+            upload_folder (str): Directory to store the upload in
+            format (str, optional): Statement format, detected from the name if omitted
+            **options: Parser options and income_category/expense_category
+            
+        Returns:
+            StatementImport: The pending import
+            
+        Raises:
+            ValueError: If the format or options are invalid
+        """
+        filename = secure_filename(file.filename or '') or 'statement'
+        format = format or detect_format(filename)
+        if format not in SUPPORTED_FORMATS:
+            raise ValueError(f'Unsupported statement format. Must be one of: {", ".join(SUPPORTED_FORMATS)}')
+        
+        for key in ('income_category', 'expense_category'):
+            if options.get(key):
+                TransactionCategory(options[key])
+        
+        folder = os.path.join(upload_folder, 'imports')
+        os.makedirs(folder, exist_ok=True)
+        stored_path = os.path.join(folder, f'{uuid.uuid4().hex}_{filename}')
+        file.save(stored_path)
+        
+        statement_import = StatementImport(
+            filename=filename,
+            stored_path=stored_path,
+            format=format,
+            status=ImportStatus.PENDING,
+            bytes_total=os.path.getsize(stored_path),
+            options={key: value for key, value in options.items() if value},
+            errors=[],
+            user_id=user_id
+        )
+        
+        try:
+            db.session.add(statement_import)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            os.remove(stored_path)
+            raise Exception(f'Failed to create import: {str(e)}')
+        
+        return statement_import
+    
+    def start_import(self, app, import_id, run_async=True, chunk_size=500):
+        """
+        Run an import, in a background thread unless run_async is False
+        
+        Args:
+            app (Flask): Application to create the worker's app context from
+            import_id (int): ID of the StatementImport
+            run_async (bool): Whether to return before the import finishes
+            chunk_size (int): Rows written per chunk
+        """
+        if not run_async:
+            self.run_import(import_id, chunk_size=chunk_size)
+            return
+        
+        def worker():
+            with app.app_context():
+                self.run_import(import_id, chunk_size=chunk_size)
+        
+        threading.Thread(target=worker, name=f'statement-import-{import_id}', daemon=True).start()
+    
+    def run_import(self, import_id, chunk_size=500):
+        """
+        Parse, normalize, dedup and write a stored statement
+        
+        Progress counters are committed after every chunk so they can be
+        polled while the import runs.
+        
+        Args:
+            import_id (int): ID of the StatementImport
+            chunk_size (int): Rows written per chunk
+            
+        Returns:
+            StatementImport: The finished import
+        """
+        statement_import = db.session.get(StatementImport, import_id)
+        statement_import.status = ImportStatus.PROCESSING
+        db.session.commit()
+        
+        options = statement_import.options or {}
+        parser_options = {k: v for k, v in options.items() if k in self.PARSER_OPTIONS}
+        
+        try:
+            with open(statement_import.stored_path, 'rb') as stream:
+                records = parse_statement(stream, statement_import.format, **parser_options)
+                rows = self.normalize(
+                    records,
+                    user_id=statement_import.user_id,
+                    income_category=options.get('income_category'),
+                    expense_category=options.get('expense_category'),
+                    closed_range=self.period_service.closed_range(statement_import.user_id)
+                )
+                
+                for chunk in self._chunks(rows, chunk_size):
+                    valid = []
+                    for item in chunk:
+                        if isinstance(item, StatementParseError):
+                            self._record_error(statement_import, item.line, str(item))
+                        else:
+                            valid.append(item)
+                    
+                    imported, duplicates, failed = self._write_chunk(statement_import.user_id, valid)
+                    if failed:
+                        self._record_error(statement_import, None, failed)
+                    
+                    statement_import.rows_read += len(chunk)
+                    statement_import.rows_imported += imported
+                    statement_import.rows_duplicate += duplicates
+                    if failed:
+                        statement_import.rows_failed += len(valid)
+                    statement_import.bytes_processed = stream.tell()
+                    db.session.commit()
+            
+            statement_import.status = ImportStatus.COMPLETED
+            statement_import.bytes_processed = statement_import.bytes_total
+            os.remove(statement_import.stored_path)
+            
+        except Exception as e:
+            db.session.rollback()
+            statement_import.status = ImportStatus.FAILED
+            statement_import.error_message = str(e)
+            if os.path.exists(statement_import.stored_path):
+                os.remove(statement_import.stored_path)
+        
+        statement_import.completed_at = datetime.utcnow()
+        db.session.commit()
+        return statement_import
+    
+    def normalize(self, records, user_id, income_category=None, expense_category=None, closed_range=None):
+        """
+        Turn parsed statement records into transaction rows
+        
+        Credits become income and debits expenses, with the given default
+        categories, in the currency the statement gives for the entry
+        (DEFAULT_CURRENCY if it gives none). Each row gets an import_hash: the bank's own entry ID when
+        the format has one, otherwise a hash of the entry's content plus its
+        occurrence number, so identical entries within one file stay distinct.
+        
+        Args:
+            records (iterable): StatementRecord / StatementParseError items
+            user_id (int): ID of the owning user
+            income_category (str, optional): Category for credits
+            expense_category (str, optional): Category for debits
+            closed_range (tuple, optional): Locked dates from PeriodService.closed_range;
+                records inside it are rejected
+            
+        Yields:
+            dict column values, or StatementParseError
+        """
+        income_category = TransactionCategory(income_category or TransactionCategory.OTHER_INCOME)
+        expense_category = TransactionCategory(expense_category or TransactionCategory.OTHER_EXPENSE)
+        occurrences = {}
+        
+        for record in records:
+            if isinstance(record, StatementParseError):
+                yield record
+                continue
+            
+            if record.amount == 0:
+                yield StatementParseError(record.line, 'Amount must not be zero')
+                continue
+            
+            if self.period_service.is_closed(closed_range, record.date):
+                yield StatementParseError(record.line, str(PeriodClosedError(record.date)))
+                continue
+            
+            try:
+                currency = normalize_currency(record.currency)
+            except ValueError as e:
+                yield StatementParseError(record.line, str(e))
+                continue
+            
+            if record.external_id:
+                key = f'id:{record.external_id}'
+            else:
+                digest = hashlib.blake2b(record.raw.encode('utf-8'), digest_size=16).digest()
+                occurrence = occurrences.get(digest, 0)
+                occurrences[digest] = occurrence + 1
+                key = f'line:{record.raw}#{occurrence}'
+            
+            is_income = record.amount > 0
+            yield {
+                'date': record.date,
+                'amount': abs(record.amount),
+                'currency': currency,
+                'type': TransactionType.INCOME if is_income else TransactionType.EXPENSE,
+                'category': income_category if is_income else expense_category,
+                'description': record.description,
+                'reference': record.reference[:100] if record.reference else None,
+                'is_reconciled': False,
+                'import_hash': hashlib.sha256(key.encode('utf-8')).hexdigest(),
+                'user_id': user_id
+            }
+    
+    def _write_chunk(self, user_id, rows):
+        """
+        Insert the rows of a chunk that are not in the ledger yet
+        
+        Returns:
+            tuple: (imported, duplicates, error message or None)
+        """
+        if not rows:
+            return 0, 0, None
+        
+        hashes = [row['import_hash'] for row in rows]
+        existing = {
+            import_hash for (import_hash,) in db.session.query(Transaction.import_hash).filter(
+                Transaction.user_id == user_id,
+                Transaction.import_hash.in_(hashes)
+            )
+        }
+        
+        new_rows = []
+        for row in rows:
+            if row['import_hash'] not in existing:
+                existing.add(row['import_hash'])
+                new_rows.append(row)
+        
+        duplicates = len(rows) - len(new_rows)
+        if not new_rows:
+            return 0, duplicates, None
+        
+        now = datetime.utcnow()
+        for row in new_rows:
+            row['created_at'] = row['updated_at'] = now
+        
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Transaction.__table__), new_rows)
+                self.rollup_service.add_many(new_rows)
+            self.ledger_service.bump_version(user_id)
+        except SQLAlchemyError as e:
+            return 0, 0, f'Failed to write chunk: {str(getattr(e, "orig", None) or e)}'
+        
+        return len(new_rows), duplicates, None
+    
+    def _record_error(self, statement_import, line, message):
+        """Keep the first MAX_STORED_ERRORS row errors on the import"""
+        if line is not None:
+            statement_import.rows_failed += 1
+        errors = list(statement_import.errors or [])
+        if len(errors) < self.MAX_STORED_ERRORS:
+            errors.append({'line': line, 'message': message})
+            statement_import.errors = errors
+    
+    @staticmethod
+    def _chunks(iterable, size):
+        iterator = iter(iterable)
+        while True:
+            chunk = list(islice(iterator, size))
+            if not chunk:
+                return
+            yield chunk
@@ -0,0 +1,168 @@
+import re
+import string
+from datetime import date
+
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Invoice, InvoiceSequence
+
+class InvoiceNumberService:
+    """Service for allocating invoice numbers from per-user sequences
+
+    Each (user, period) pair has one row in invoice_sequences that is
+    incremented atomically, so allocating a number is a single statement,
+    does not depend on how many invoices exist and never hands out the same
+    number twice, even under concurrent creates. The row stays locked until
+    the surrounding transaction ends, so a rolled-back create releases its
+    number.
+    """
+    
+    DEFAULT_FORMAT = 'INV-{year}{month:02d}-{seq:04d}'
+    RESET_POLICIES = ('monthly', 'yearly', 'never')
+    
+    def __init__(self, number_format=DEFAULT_FORMAT, reset='monthly'):
+        if reset not in self.RESET_POLICIES:
+            raise ValueError(f'Invalid reset policy. Must be one of: {", ".join(self.RESET_POLICIES)}')
+        self.number_format = number_format
+        self.reset = reset
+    
+    def period_for(self, day):
+        """
+        Get the numbering period a date belongs to
+        
+        Args:
+            day (date): Date of the invoice
+            
+        Returns:
+            str: 'YYYYMM' for monthly, 'YYYY' for yearly and '' for never
+        """
+        if self.reset == 'monthly':
+            return f'{day.year}{day.month:02d}'
+        if self.reset == 'yearly':
+            return str(day.year)
+        return ''
+    
+    def next_number(self, user_id, day=None):
+        """
+        Allocate the next invoice number of a user, without committing
+        
+        Args:
+            user_id (int): ID of the user
+            day (date, optional): Date that selects the period, defaults to today
+            
+        Returns:
+            str: Formatted invoice number
+        """
+        day = day or date.today()
+        sequence = self.next_value(user_id, self.period_for(day))
+        return self.number_format.format(year=day.year, month=day.month, seq=sequence)
+    
+    def next_value(self, user_id, period):
+        """
+        Atomically increment and return a sequence
+        
+        Args:
+            user_id (int): ID of the user
+            period (str): Numbering period
+            
+        Returns:
+            int: The allocated value, starting at 1
+        """
+        table = InvoiceSequence.__table__
+        dialect = db.engine.dialect
+        
+        if dialect.name in ('postgresql', 'sqlite') and dialect.insert_returning:
+            # One INSERT ... ON CONFLICT DO UPDATE ... RETURNING; takes the row
+            # lock on PostgreSQL and the database write lock on SQLite
+            dialect_insert = postgresql_insert if dialect.name == 'postgresql' else sqlite_insert
+            stmt = dialect_insert(table).values(user_id=user_id, period=period, last_value=1)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['user_id', 'period'],
+                set_={'last_value': table.c.last_value + 1, 'updated_at': func.now()}
+            ).returning(table.c.last_value)
+            return db.session.execute(stmt).scalar_one()
+        
+        # Locked fallback: the UPDATE holds the row (or database) lock until
+        # commit, so reading the value back in the same transaction is safe
+        for _ in range(2):
+            result = db.session.execute(
+                update(table)
+                .where(table.c.user_id == user_id, table.c.period == period)
+                .values(last_value=table.c.last_value + 1)
+            )
+            if result.rowcount:
+                return db.session.execute(
+                    select(table.c.last_value)
+                    .where(table.c.user_id == user_id, table.c.period == period)
+                ).scalar_one()
+            
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(
+                        table.insert().values(user_id=user_id, period=period, last_value=1)
+                    )
+                return 1
+            except IntegrityError:
+                # Another transaction created the row first; increment it instead
+                continue
+        
+        raise Exception(f'Failed to allocate invoice number for user {user_id}')
+    
+    def seed_from_invoices(self):
+        """
+        Initialize sequences from existing invoice numbers
+        
+        Only numbers matching the configured format are considered. Existing
+        sequences are only ever moved forward.
+        
+        Returns:
+            int: Number of sequences written
+        """
+        pattern = self._number_pattern()
+        highest = {}
+        
+        query = db.session.query(Invoice.user_id, Invoice.invoice_number, Invoice.issue_date)
+        for user_id, number, issue_date in query.yield_per(1000):
+            match = pattern.fullmatch(number or '')
+            if not match:
+                continue
+            fields = match.groupdict()
+            day = date(
+                int(fields.get('year') or issue_date.year),
+                int(fields.get('month') or issue_date.month),
+                1
+            )
+            key = (user_id, self.period_for(day))
+            highest[key] = max(highest.get(key, 0), int(fields['seq']))
+        
+        try:
+            for (user_id, period), value in highest.items():
+                sequence = InvoiceSequence.query.filter_by(user_id=user_id, period=period).first()
+                if sequence is None:
+                    db.session.add(InvoiceSequence(user_id=user_id, period=period, last_value=value))
+                elif sequence.last_value < value:
+                    sequence.last_value = value
+            db.session.commit()
+            return len(highest)
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f'Failed to seed invoice sequences: {str(e)}')
+    
+    def _number_pattern(self):
+        """Build a regex matching numbers in the configured format"""
+        parts = []
+        for literal, field, spec, _ in string.Formatter().parse(self.number_format):
+            parts.append(re.escape(literal))
+            if field == 'year':
+                parts.append(r'(?P<year>\d{4})')
+            elif field == 'month':
+                parts.append(r'(?P<month>\d{2})' if spec == '02d' else r'(?P<month>\d{1,2})')
+            elif field == 'seq':
+                parts.append(r'(?P<seq>\d+)')
+            elif field is not None:
+                parts.append(r'.*?')
+        return re.compile(''.join(parts))
@@ -1,18 +1,72 @@
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
-import re
+
+from flask import current_app
+from sqlalchemy import case, func
+from sqlalchemy.orm import joinedload, selectinload
 
 from app import db
-from app.models import Invoice, InvoiceStatus, InvoiceItem, Transaction, TransactionType
+from app.models import (
+    Invoice, InvoiceStatus, InvoiceItem, Client, Transaction, TransactionType, TransactionCategory,
+    Tombstone, SyncEntity
+)
+from app.services.fx_service import fx_rates
+from app.services.invoice_number_service import InvoiceNumberService
+from app.services.ledger_service import LedgerService
+from app.services.period_service import PeriodService
+from app.services.rollup_service import RollupService
+from app.utils.money import DEFAULT_CURRENCY, Money, cents, normalize_currency
 
 class InvoiceService:
     """Service for handling invoice business logic"""
     
+    # Statuses whose amount due is still expected to be collected
+    OPEN_STATUSES = (
+        InvoiceStatus.SENT,
+        InvoiceStatus.VIEWED,
+        InvoiceStatus.PARTIALLY_PAID,
+        InvoiceStatus.OVERDUE
+    )
+    
+    # (label, first day overdue, last day overdue) of the aging buckets
+    AGING_BUCKETS = (
+        ('current', None, 0),
+        ('1_30', 1, 30),
+        ('31_60', 31, 60),
+        ('61_90', 61, 90),
+        ('over_90', 91, None)
+    )
+    
+    def __init__(self):
+        self.rollup_service = RollupService()
+        self.ledger_service = LedgerService()
+        self.period_service = PeriodService()
+    
+    @staticmethod
+    def load_options(detail=False):
+        """
+        Loader options to serialize invoices without per-row lazy loads
+        
+        Items are loaded with one extra SELECT ... IN for the whole result,
+        so a page of invoices costs a fixed number of queries.
+        
+        Args:
+            detail (bool): Also join the client and project, for single-invoice views
+            
+        Returns:
+            list: Options for Query.options()
+        """
+        options = [selectinload(Invoice.items)]
+        if detail:
+            options.extend([joinedload(Invoice.client), joinedload(Invoice.project)])
+        return options
+    
     def _generate_invoice_number(self, user_id):
         """
-        Generate a unique invoice number
+        Allocate the next invoice number of a user, without committing
         
-        Format: INV-{year}{month}-{sequence}
+        The format and reset policy come from INVOICE_NUMBER_FORMAT and
+        INVOICE_NUMBER_RESET (default: INV-{year}{month}-{sequence}, monthly).
         
         Args:
             user_id (int): ID of the user
@@ -20,34 +74,11 @@ class InvoiceService:
         Returns:
             str: Generated invoice number
         """
-        # Get the latest invoice for this user
-        latest_invoice = Invoice.query.filter_by(user_id=user_id)\
-                                    .order_by(Invoice.id.desc())\
-                                    .first()
-        
-        current_year = date.today().year
-        current_month = date.today().month
-        
-        if latest_invoice and latest_invoice.invoice_number:
-            # Extract sequence number from the latest invoice
-            match = re.match(r'INV-(\d{4})(\d{2})-(\d+)', latest_invoice.invoice_number)
-            if match:
-                year = int(match.group(1))
-                month = int(match.group(2))
-                sequence = int(match.group(3))
-                
-                if year == current_year and month == current_month:
-                    # Increment sequence for the same month
-                    sequence += 1
-                else:
-                    # Start new sequence for new month
-                    sequence = 1
-            else:
-                sequence = 1
-        else:
-            sequence = 1
-        
-        return f"INV-{current_year}{current_month:02d}-{sequence:04d}"
+        number_service = InvoiceNumberService(
+            number_format=current_app.config.get('INVOICE_NUMBER_FORMAT', InvoiceNumberService.DEFAULT_FORMAT),
+            reset=current_app.config.get('INVOICE_NUMBER_RESET', 'monthly')
+        )
+        return number_service.next_number(user_id)
     
     def create_invoice(self, user_id, **data):
         """
@@ -74,7 +105,8 @@ class InvoiceService:
             Invoice: The created invoice
             
         Raises:
-            ValueError: If required fields are missing or invalid
+            ValueError: If required fields are missing or invalid, or the
+                issue date falls in a closed fiscal period
         """
         # Validate required fields
         required_fields = ['client_id', 'issue_date', 'due_date', 'items']
@@ -93,6 +125,8 @@ class InvoiceService:
             if due_date < issue_date:
                 raise ValueError('Due date cannot be before issue date')
             
+            self.period_service.check_open(user_id, issue_date)
+            
             # Create invoice
             invoice = Invoice(
                 invoice_number=self._generate_invoice_number(user_id),
@@ -102,7 +136,8 @@ class InvoiceService:
                 notes=data.get('notes'),
                 terms=data.get('terms'),
                 tax_rate=Decimal(str(data.get('tax_rate', 0))),
-                currency=data.get('currency', 'USD'),
+                amount_paid=Decimal('0'),
+                currency=normalize_currency(data.get('currency')),
                 client_id=data['client_id'],
                 project_id=data.get('project_id'),
                 user_id=user_id
@@ -116,13 +151,13 @@ class InvoiceService:
                 item = InvoiceItem(
                     description=item_data['description'],
                     quantity=Decimal(str(item_data['quantity'])),
-                    unit_price=Decimal(str(item_data['unit_price'])),
+                    unit_price=Money.of(item_data['unit_price']).to_decimal(),
                     tax_rate=Decimal(str(item_data.get('tax_rate', 0))),
                     invoice=invoice
                 )
                 
-                # Calculate item amount (quantity * unit_price * (1 + tax_rate/100))
-                item.amount = item.quantity * item.unit_price * (1 + item.tax_rate / 100)
+                # Calculate item amount (quantity * unit_price * (1 + tax_rate/100)) in whole cents
+                item.amount = item.calculate_amount()
                 
                 db.session.add(item)
             
@@ -130,6 +165,7 @@ class InvoiceService:
             invoice.calculate_totals()
             
             db.session.add(invoice)
+            self.ledger_service.bump_version(user_id)
             db.session.commit()
             
             return invoice
@@ -168,12 +204,16 @@ class InvoiceService:
             Invoice: The updated invoice
             
         Raises:
-            ValueError: If provided data is invalid
+            ValueError: If provided data is invalid, or the old or new issue
+                date falls in a closed fiscal period
         """
         try:
+            previous_issue_date = invoice.issue_date
+            
             # Update basic fields if provided
             if 'issue_date' in data:
                 invoice.issue_date = datetime.strptime(data['issue_date'], '%Y-%m-%d').date()
+            self.period_service.check_open(invoice.user_id, previous_issue_date, invoice.issue_date)
                 
             if 'due_date' in data:
                 due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date()
@@ -184,9 +224,12 @@ class InvoiceService:
             if 'status' in data:
                 invoice.status = InvoiceStatus(data['status'])
                 
+            if 'currency' in data:
+                invoice.currency = normalize_currency(data['currency'])
+                
             # Update other fields
             optional_fields = [
-                'client_id', 'project_id', 'currency', 'tax_rate',
+                'client_id', 'project_id', 'tax_rate',
                 'notes', 'terms'
             ]
             
@@ -210,9 +253,9 @@ class InvoiceService:
                         item = existing_items[item_id]
                         item.description = item_data['description']
                         item.quantity = Decimal(str(item_data['quantity']))
-                        item.unit_price = Decimal(str(item_data['unit_price']))
+                        item.unit_price = Money.of(item_data['unit_price']).to_decimal()
                         item.tax_rate = Decimal(str(item_data.get('tax_rate', 0)))
-                        item.amount = item.quantity * item.unit_price * (1 + item.tax_rate / 100)
+                        item.amount = item.calculate_amount()
                         
                         # Remove from existing items to track which ones to delete
                         del existing_items[item_id]
@@ -221,11 +264,11 @@ class InvoiceService:
                         item = InvoiceItem(
                             description=item_data['description'],
                             quantity=Decimal(str(item_data['quantity'])),
-                            unit_price=Decimal(str(item_data['unit_price'])),
+                            unit_price=Money.of(item_data['unit_price']).to_decimal(),
                             tax_rate=Decimal(str(item_data.get('tax_rate', 0))),
                             invoice=invoice
                         )
-                        item.amount = item.quantity * item.unit_price * (1 + item.tax_rate / 100)
+                        item.amount = item.calculate_amount()
                         db.session.add(item)
                     
                     new_items.append(item)
@@ -239,7 +282,10 @@ class InvoiceService:
             
             # Recalculate totals
             invoice.calculate_totals()
+            # Items have their own table: an update of items alone must still reach delta syncs
+            invoice.updated_at = datetime.utcnow()
             
+            self.ledger_service.bump_version(invoice.user_id)
             db.session.commit()
             return invoice
             
@@ -250,6 +296,35 @@ class InvoiceService:
             db.session.rollback()
             raise Exception(f'Failed to update invoice: {str(e)}')
     
+    def delete_invoice(self, invoice):
+        """
+        Delete an invoice
+        
+        Args:
+            invoice (Invoice): Invoice to delete
+            
+        Returns:
+            bool: True if deletion was successful
+            
+        Raises:
+            ValueError: If the invoice is paid or its issue date falls in a
+                closed fiscal period
+        """
+        if invoice.status == InvoiceStatus.PAID:
+            raise ValueError('Cannot delete a paid invoice')
+        
+        self.period_service.check_open(invoice.user_id, invoice.issue_date)
+        
+        try:
+            db.session.delete(invoice)
+            db.session.add(Tombstone(user_id=invoice.user_id, entity=SyncEntity.INVOICE, entity_id=invoice.id))
+            self.ledger_service.bump_version(invoice.user_id)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f'Failed to delete invoice: {str(e)}')
+    
     def record_payment(self, invoice, amount, payment_date, payment_method=None, notes=None):
         """
         Record a payment for an invoice
@@ -265,15 +340,18 @@ class InvoiceService:
             tuple: (updated_invoice, transaction)
             
         Raises:
-            ValueError: If payment amount is invalid
+            ValueError: If payment amount is invalid or the payment date
+                falls in a closed fiscal period
         """
         try:
-            amount = Decimal(str(amount))
+            amount = Money.of(amount, invoice.currency).to_decimal()
             if amount <= 0:
                 raise ValueError('Payment amount must be greater than 0')
                 
             if amount > invoice.amount_due:
                 raise ValueError('Payment amount cannot be greater than the amount due')
+            
+            self.period_service.check_open(invoice.user_id, payment_date)
                 
             # Update invoice payment
             invoice.amount_paid += amount
@@ -283,8 +361,9 @@ class InvoiceService:
             transaction = Transaction(
                 date=payment_date,
                 amount=amount,
+                currency=invoice.currency or DEFAULT_CURRENCY,
                 type=TransactionType.INCOME,
-                category='service',  # Or get from settings
+                category=TransactionCategory.SERVICE,  # Or get from settings
                 description=f'Payment for invoice {invoice.invoice_number}',
                 reference=f'INV-{invoice.id}',
                 is_reconciled=True,
@@ -294,6 +373,8 @@ class InvoiceService:
             )
             
             db.session.add(transaction)
+            self.rollup_service.add(transaction)
+            self.ledger_service.bump_version(invoice.user_id)
             db.session.commit()
             
             return invoice, transaction
@@ -330,6 +411,7 @@ class InvoiceService:
             # Update invoice status
             if invoice.status == InvoiceStatus.DRAFT:
                 invoice.status = InvoiceStatus.SENT
+                self.ledger_service.bump_version(invoice.user_id)
                 db.session.commit()
             
             if send_email:
@@ -364,3 +446,266 @@ class InvoiceService:
         except Exception as e:
             db.session.rollback()
             raise Exception(f'Failed to send invoice: {str(e)}')
+    
+    def get_invoice_summary(self, user_id, start_date=None, end_date=None, aging=False, as_of=None,
+                            currency=None):
+        """
+        Get invoice totals by status and by client, aggregated in the database
+        
+        Totals are grouped by invoice currency as well and converted to the
+        reporting currency at the rates of the reference date.
+        
+        Args:
+            user_id (int): ID of the user
+            start_date (date, optional): Only include invoices issued on or after this date
+            end_date (date, optional): Only include invoices issued on or before this date
+            aging (bool): Include the aging breakdown of open invoices
+            as_of (date, optional): Reference date for aging and rates, defaults to today
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
+            
+        Returns:
+            dict: Summary with amounts summed in whole cents
+            
+        Raises:
+            ValueError: If the currency is invalid or an exchange rate is missing
+        """
+        as_of = as_of or date.today()
+        currency = fx_rates.reporting_currency(currency)
+        
+        filters = [Invoice.user_id == user_id]
+        if start_date:
+            filters.append(Invoice.issue_date >= start_date)
+        if end_date:
+            filters.append(Invoice.issue_date <= end_date)
+        
+        amounts = (
+            func.count(Invoice.id),
+            func.coalesce(func.sum(cents(Invoice.total)), 0),
+            func.coalesce(func.sum(cents(Invoice.amount_paid)), 0),
+            func.coalesce(func.sum(cents(Invoice.amount_due)), 0)
+        )
+        
+        summary = {
+            'total_invoices': 0,
+            'total_amount': 0,
+            'total_paid': 0,
+            'total_due': 0,
+            'by_status': {},
+            'by_client': {},
+            'currency': currency
+        }
+        
+        by_status = db.session.query(Invoice.status, Invoice.currency, *amounts)\
+                              .filter(*filters)\
+                              .group_by(Invoice.status, Invoice.currency)
+        
+        for status, code, count, total, paid, due in by_status:
+            total, paid, due = (self._convert(value, code, currency, as_of) for value in (total, paid, due))
+            entry = summary['by_status'].setdefault(
+                InvoiceStatus(status).value, {'count': 0, 'amount': 0}
+            )
+            entry['count'] += count
+            entry['amount'] += total
+            summary['total_invoices'] += count
+            summary['total_amount'] += total
+            summary['total_paid'] += paid
+            summary['total_due'] += due
+        
+        by_client = db.session.query(Client.name, Invoice.currency, *amounts[:2])\
+                              .select_from(Invoice)\
+                              .outerjoin(Client, Client.id == Invoice.client_id)\
+                              .filter(*filters)\
+                              .group_by(Invoice.client_id, Client.name, Invoice.currency)
+        
+        for name, code, count, total in by_client:
+            # Clients are reported by name, so merge clients sharing one
+            entry = summary['by_client'].setdefault(
+                name or 'Unknown', {'count': 0, 'amount': 0}
+            )
+            entry['count'] += count
+            entry['amount'] += self._convert(total, code, currency, as_of)
+        
+        for key in ('total_amount', 'total_paid', 'total_due'):
+            summary[key] = self._money(summary[key])
+        for entry in (*summary['by_status'].values(), *summary['by_client'].values()):
+            entry['amount'] = self._money(entry['amount'])
+        
+        if aging:
+            summary['aging'] = self.get_aging(user_id, filters=filters, as_of=as_of, currency=currency)
+        
+        return summary
+    
+    def get_aging(self, user_id, filters=None, as_of=None, currency=None):
+        """
+        Get the amount due of open invoices bucketed by days past due
+        
+        Args:
+            user_id (int): ID of the user
+            filters (list, optional): Extra invoice filters
+            as_of (date, optional): Reference date for buckets and rates, defaults to today
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
+            
+        Returns:
+            dict: {bucket: {'count': int, 'amount': float}}
+            
+        Raises:
+            ValueError: If the currency is invalid or an exchange rate is missing
+        """
+        as_of = as_of or date.today()
+        currency = fx_rates.reporting_currency(currency)
+        
+        open_invoices = db.session.query(
+            self._aging_bucket(as_of).label('bucket'),
+            Invoice.id.label('id'),
+            Invoice.currency.label('currency'),
+            Invoice.amount_due.label('amount_due')
+        ).filter(*self._open_filters(user_id), *(filters or [])).subquery()
+        
+        # Group on a subquery column; PostgreSQL rejects grouping by a CASE with bound parameters
+        query = db.session.query(
+            open_invoices.c.bucket,
+            open_invoices.c.currency,
+            func.count(open_invoices.c.id),
+            func.coalesce(func.sum(cents(open_invoices.c.amount_due)), 0)
+        ).group_by(open_invoices.c.bucket, open_invoices.c.currency)
+        
+        aging = {label: {'count': 0, 'amount': 0} for label, _, _ in self.AGING_BUCKETS}
+        for label, code, count, amount in query:
+            aging[label]['count'] += count
+            aging[label]['amount'] += self._convert(amount, code, currency, as_of)
+        
+        for bucket in aging.values():
+            bucket['amount'] = self._money(bucket['amount'])
+        return aging
+    
+    def get_ar_aging(self, user_id, as_of=None, client_id=None, currency=None):
+        """
+        Get the accounts-receivable aging of open invoices per client
+        
+        All buckets of all clients come from one grouped query over the
+        (user_id, status, due_date) index; a client drill-down adds one
+        query for that client's open invoices.
+        
+        Args:
+            user_id (int): ID of the user
+            as_of (date, optional): Reference date for buckets and rates, defaults to today
+            client_id (int, optional): Only include this client, and list its open invoices
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
+            
+        Returns:
+            dict: Totals per bucket, overall and per client (largest balance
+                first), with amounts summed in whole cents
+            
+        Raises:
+            ValueError: If the currency is invalid or an exchange rate is missing
+        """
+        as_of = as_of or date.today()
+        currency = fx_rates.reporting_currency(currency)
+        labels = [label for label, _, _ in self.AGING_BUCKETS]
+        
+        filters = self._open_filters(user_id)
+        if client_id is not None:
+            filters.append(Invoice.client_id == client_id)
+        
+        open_invoices = db.session.query(
+            self._aging_bucket(as_of).label('bucket'),
+            Invoice.id.label('id'),
+            Invoice.client_id.label('client_id'),
+            Invoice.currency.label('currency'),
+            Invoice.amount_due.label('amount_due')
+        ).filter(*filters).subquery()
+        
+        query = db.session.query(
+            open_invoices.c.client_id,
+            Client.name,
+            open_invoices.c.currency,
+            open_invoices.c.bucket,
+            func.count(open_invoices.c.id),
+            func.coalesce(func.sum(cents(open_invoices.c.amount_due)), 0)
+        ).outerjoin(Client, Client.id == open_invoices.c.client_id)\
+         .group_by(open_invoices.c.currency, open_invoices.c.bucket, open_invoices.c.client_id, Client.name)
+        
+        def empty():
+            return {label: {'count': 0, 'amount': 0} for label in labels + ['total']}
+        
+        totals = empty()
+        clients = {}
+        for row_client_id, name, code, label, count, amount in query:
+            amount = self._convert(amount, code, currency, as_of)
+            entry = clients.setdefault(row_client_id, {
+                'client_id': row_client_id, 'client_name': name or 'Unknown', 'buckets': empty()
+            })
+            for buckets in (entry['buckets'], totals):
+                for key in (label, 'total'):
+                    buckets[key]['count'] += count
+                    buckets[key]['amount'] += amount
+        
+        clients = sorted(
+            clients.values(), key=lambda entry: (-entry['buckets']['total']['amount'], entry['client_name'])
+        )
+        for buckets in (totals, *(entry['buckets'] for entry in clients)):
+            for bucket in buckets.values():
+                bucket['amount'] = self._money(bucket['amount'])
+        
+        aging = {
+            'as_of': as_of.isoformat(),
+            'currency': currency,
+            'buckets': labels,
+            'totals': totals,
+            'clients': clients
+        }
+        
+        if client_id is not None:
+            aging['invoices'] = [
+                {
+                    'id': invoice.id,
+                    'invoice_number': invoice.invoice_number,
+                    'due_date': invoice.due_date.isoformat(),
+                    'days_overdue': max((as_of - invoice.due_date).days, 0),
+                    'bucket': self._aging_label((as_of - invoice.due_date).days),
+                    'amount_due': Money.of(invoice.amount_due).to_json(),
+                    'currency': invoice.currency
+                }
+                for invoice in Invoice.query.filter(*filters).order_by(Invoice.due_date, Invoice.id)
+            ]
+        
+        return aging
+    
+    def _open_filters(self, user_id):
+        """Filters of a user's invoices with an amount due, matching ix_invoices_user_status_due_date"""
+        return [
+            Invoice.user_id == user_id,
+            Invoice.status.in_(self.OPEN_STATUSES),
+            Invoice.amount_due > 0
+        ]
+    
+    @classmethod
+    def _aging_bucket(cls, as_of):
+        """CASE expression of the aging bucket label of an invoice's due date"""
+        # Compare due dates against precomputed cutoffs so the CASE stays portable
+        conditions = []
+        for label, first_day, last_day in cls.AGING_BUCKETS:
+            clauses = []
+            if first_day is not None:
+                clauses.append(Invoice.due_date <= as_of - timedelta(days=first_day))
+            if last_day is not None:
+                clauses.append(Invoice.due_date >= as_of - timedelta(days=last_day))
+            conditions.append((db.and_(*clauses), label))
+        return case(*conditions[:-1], else_=conditions[-1][1])
+    
+    @classmethod
+    def _aging_label(cls, days_overdue):
+        """Aging bucket label of a number of days past due, as _aging_bucket computes it in SQL"""
+        for label, first_day, last_day in cls.AGING_BUCKETS:
+            if (first_day is None or days_overdue >= first_day) and (last_day is None or days_overdue <= last_day):
+                return label
+    
+    @staticmethod
+    def _money(value):
+        """Serialize an aggregate of whole cents like every other API amount"""
+        return Money(value or 0).to_json()
+    
+    @staticmethod
+    def _convert(value, source, currency, day):
+        """Convert an aggregate of whole cents in an invoice currency to reporting currency cents"""
+        return fx_rates.convert_cents(int(value or 0), source or DEFAULT_CURRENCY, currency, day)
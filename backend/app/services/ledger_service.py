@@ -0,0 +1,68 @@
+from flask import g, has_request_context
+from sqlalchemy import update
+
+from app import db
+from app.models.user import User
+
+class LedgerService:
+    """Service for tracking the per-user ledger version
+
+    Every write to a user's transactions or invoices bumps the version inside
+    the same database transaction, so anything derived from the ledger (cached
+    reports, ETags) can be keyed on it and is never served stale.
+    """
+    
+    def get_version(self, user_id):
+        """
+        Get the current ledger version of a user
+        
+        Args:
+            user_id (int): ID of the user
+            
+        Returns:
+            int: Current ledger version (0 for unknown users)
+        """
+        # Read once per request: the ETag, report cache and report engine all key on it
+        if has_request_context():
+            versions = g.setdefault('ledger_versions', {})
+            if user_id not in versions:
+                versions[user_id] = self._read_version(user_id)
+            return versions[user_id]
+        return self._read_version(user_id)
+    
+    def _read_version(self, user_id):
+        version = db.session.query(User.ledger_version).filter(User.id == user_id).scalar()
+        return version or 0
+    
+    def bump_version(self, user_id):
+        """
+        Increment the ledger version of a user, without committing
+        
+        Args:
+            user_id (int): ID of the user whose ledger changed
+        """
+        db.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(ledger_version=User.ledger_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        self._forget_versions()
+    
+    def bump_all_versions(self):
+        """
+        Increment the ledger version of every user, without committing
+        
+        For changes that affect every user's derived data at once, such as
+        newly loaded exchange rates.
+        """
+        db.session.execute(
+            update(User)
+            .values(ledger_version=User.ledger_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        self._forget_versions()
+    
+    def _forget_versions(self):
+        if has_request_context():
+            g.pop('ledger_versions', None)
@@ -0,0 +1,186 @@
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, insert
+
+from app import db
+from app.models import FiscalPeriod, PeriodBalance, TransactionRollup
+from app.services.ledger_service import LedgerService
+
+class PeriodClosedError(ValueError):
+    """A ledger write touches a date inside a closed fiscal period"""
+
+    def __init__(self, day):
+        super().__init__(f'The fiscal period containing {day.isoformat()} is closed')
+        self.day = day
+
+class PeriodService:
+    """Service for closing fiscal periods
+
+    Closed periods are contiguous ranges of whole months. Closing one freezes
+    its monthly totals per type, category and currency into PeriodBalance
+    snapshots and locks every date in it against ledger writes, so reports
+    can read the snapshots instead of the transactions for closed ranges.
+    Only the most recent period can be reopened, which drops its snapshots.
+    """
+
+    def __init__(self):
+        self.ledger_service = LedgerService()
+
+    def list_periods(self, user_id):
+        """Closed periods of a user, oldest first"""
+        return FiscalPeriod.query.filter_by(user_id=user_id).order_by(FiscalPeriod.start_date).all()
+
+    def closed_range(self, user_id):
+        """
+        Get the range of dates locked by closed periods
+
+        Args:
+            user_id (int): ID of the user
+
+        Returns:
+            tuple: (first_day, last_day), or None if no period is closed
+        """
+        first, last = db.session.query(
+            func.min(FiscalPeriod.start_date), func.max(FiscalPeriod.end_date)
+        ).filter(FiscalPeriod.user_id == user_id).one()
+        return (first, last) if first else None
+
+    @staticmethod
+    def is_closed(closed_range, day):
+        """Whether a day falls in a range returned by closed_range()"""
+        return closed_range is not None and closed_range[0] <= day <= closed_range[1]
+
+    def check_open(self, user_id, *days):
+        """
+        Ensure ledger writes on the given days are allowed
+
+        Args:
+            user_id (int): ID of the user
+            *days (date): Dates touched by the write; None is ignored
+
+        Raises:
+            PeriodClosedError: If a day falls in a closed period
+        """
+        days = [day for day in days if day is not None]
+        if not days:
+            return
+        closed = self.closed_range(user_id)
+        for day in days:
+            if self.is_closed(closed, day):
+                raise PeriodClosedError(day)
+
+    def close_period(self, user_id, start_date, end_date):
+        """
+        Close a range of whole months and snapshot its balances
+
+        Args:
+            user_id (int): ID of the user
+            start_date (date): First day of a month, right after the last closed period
+            end_date (date): Last day of a month that has already ended
+
+        Returns:
+            FiscalPeriod: The closed period
+
+        Raises:
+            ValueError: If the range is not whole months, not contiguous with
+                the closed periods or not over yet
+        """
+        if start_date.day != 1:
+            raise ValueError('A fiscal period must start on the first day of a month')
+        if end_date.day != monthrange(end_date.year, end_date.month)[1]:
+            raise ValueError('A fiscal period must end on the last day of a month')
+        if end_date < start_date:
+            raise ValueError('A fiscal period cannot end before it starts')
+        if end_date >= datetime.utcnow().date():
+            raise ValueError('Cannot close a fiscal period that has not ended')
+
+        closed = self.closed_range(user_id)
+        if closed and start_date != closed[1] + timedelta(days=1):
+            raise ValueError(
+                f'Fiscal periods must be contiguous; the next period starts on '
+                f'{(closed[1] + timedelta(days=1)).isoformat()}'
+            )
+
+        try:
+            period = FiscalPeriod(user_id=user_id, start_date=start_date, end_date=end_date)
+            db.session.add(period)
+            db.session.flush()
+
+            balances = self._monthly_balances(user_id, start_date, end_date)
+            if balances:
+                for balance in balances:
+                    balance.update(period_id=period.id, user_id=user_id)
+                db.session.execute(insert(PeriodBalance.__table__), balances)
+
+            self.ledger_service.bump_version(user_id)
+            db.session.commit()
+            return period
+
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f'Failed to close fiscal period: {str(e)}')
+
+    def reopen_period(self, period):
+        """
+        Reopen the most recent closed period, dropping its snapshots
+
+        Args:
+            period (FiscalPeriod): Period to reopen
+
+        Returns:
+            bool: True if the period was reopened
+
+        Raises:
+            ValueError: If a later period is still closed
+        """
+        latest = db.session.query(func.max(FiscalPeriod.end_date)).filter(
+            FiscalPeriod.user_id == period.user_id
+        ).scalar()
+        if period.end_date != latest:
+            raise ValueError('Only the most recent fiscal period can be reopened')
+
+        try:
+            db.session.delete(period)
+            self.ledger_service.bump_version(period.user_id)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f'Failed to reopen fiscal period: {str(e)}')
+
+    @staticmethod
+    def _monthly_balances(user_id, start_date, end_date):
+        """Sum the daily rollups of a range into per-month rows"""
+        rows = db.session.query(
+            TransactionRollup.day,
+            TransactionRollup.type,
+            TransactionRollup.category,
+            TransactionRollup.currency,
+            TransactionRollup.total_amount,
+            TransactionRollup.transaction_count
+        ).filter(
+            TransactionRollup.user_id == user_id,
+            TransactionRollup.day >= start_date,
+            TransactionRollup.day <= end_date,
+            TransactionRollup.transaction_count > 0
+        )
+
+        totals = {}
+        for day, txn_type, category, currency, amount, count in rows:
+            key = (date(day.year, day.month, 1), txn_type, category, currency)
+            total, transactions = totals.get(key, (Decimal('0'), 0))
+            totals[key] = (total + Decimal(amount), transactions + count)
+
+        return [
+            {
+                'month': month,
+                'type': txn_type,
+                'category': category,
+                'currency': currency,
+                'total_amount': total,
+                'transaction_count': count
+            }
+            for (month, txn_type, category, currency), (total, count) in sorted(totals.items())
+        ]
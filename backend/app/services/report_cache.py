@@ -0,0 +1,217 @@
+"""
+Versioned cache for report responses.
+
+Entries are keyed by (user, endpoint, normalized query params, ledger version).
+Because every ledger write bumps the user's version, a write makes all of that
+user's cached reports unreachable and they age out of the backend on their own;
+no explicit invalidation is needed and a stale entry can never be served.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, request, make_response
+from flask_jwt_extended import get_jwt_identity
+
+from app.services.etags import normalize_params
+from app.services.ledger_service import LedgerService
+
+class LRUCacheBackend:
+    """In-process LRU cache backend, used for development and tests"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, counter):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + 1
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+class RedisCacheBackend:
+    """Redis cache backend, shared by all workers in production"""
+
+    name = 'redis'
+    prefix = 'report_cache:'
+
+    def __init__(self, url):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._redis.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self._redis.set(self.prefix + key, value, ex=ttl)
+
+    def incr(self, counter):
+        self._redis.incr(f'{self.prefix}stats:{counter}')
+
+    def counters(self):
+        names = ['hits', 'misses']
+        values = self._redis.mget([f'{self.prefix}stats:{name}' for name in names])
+        return {name: int(value) for name, value in zip(names, values) if value is not None}
+
+    def clear(self):
+        for key in self._redis.scan_iter(match=self.prefix + '*'):
+            self._redis.delete(key)
+
+class ReportCache:
+    """Report response cache with pluggable backends"""
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = None
+        self.ledger_service = LedgerService()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configure the cache backend from the app config
+
+        Config:
+            REPORT_CACHE_BACKEND: 'redis', 'memory' or 'null' (disabled)
+            REPORT_CACHE_TTL: Entry lifetime in seconds
+            REPORT_CACHE_MAX_ENTRIES: Size of the in-process LRU
+            REDIS_URL: Redis connection URL for the redis backend
+        """
+        backend = app.config.get('REPORT_CACHE_BACKEND', 'memory')
+        self.ttl = app.config.get('REPORT_CACHE_TTL', 300)
+
+        if backend == 'redis':
+            self.backend = RedisCacheBackend(app.config['REDIS_URL'])
+        elif backend == 'memory':
+            self.backend = LRUCacheBackend(app.config.get('REPORT_CACHE_MAX_ENTRIES', 1024))
+        else:
+            self.backend = None
+
+        app.extensions['report_cache'] = self
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def make_key(self, user_id, endpoint, params, version):
+        """
+        Build a cache key from the request identity
+
+        Args:
+            user_id (int): ID of the user
+            endpoint (str): Flask endpoint name
+            params (MultiDict): Query parameters
+            version (int): Ledger version of the user
+
+        Returns:
+            str: Cache key
+        """
+        normalized = normalize_params(params)
+        # Reports default their date range to "today", so the day is part of the key
+        today = datetime.utcnow().date().isoformat()
+        digest = hashlib.sha1(f'{normalized}|{today}'.encode('utf-8')).hexdigest()
+        return f'{user_id}:{endpoint}:v{version}:{digest}'
+
+    def get(self, key):
+        """Get a cached payload, counting the hit or miss"""
+        try:
+            value = self.backend.get(key)
+            self.backend.incr('hits' if value is not None else 'misses')
+            return value
+        except Exception as e:
+            current_app.logger.warning(f'Report cache read failed: {str(e)}')
+            return None
+
+    def set(self, key, value):
+        """Store a payload, ignoring backend failures"""
+        try:
+            self.backend.set(key, value, ttl=self.ttl)
+        except Exception as e:
+            current_app.logger.warning(f'Report cache write failed: {str(e)}')
+
+    def stats(self):
+        """
+        Get hit/miss counters of the cache
+
+        Returns:
+            dict: Backend name, hits, misses and hit rate
+        """
+        if not self.enabled:
+            return {'backend': None, 'hits': 0, 'misses': 0, 'hit_rate': 0.0}
+
+        counters = self.backend.counters()
+        hits = counters.get('hits', 0)
+        misses = counters.get('misses', 0)
+        total = hits + misses
+        return {
+            'backend': self.backend.name,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0
+        }
+
+report_cache = ReportCache()
+
+def cached_report(view):
+    """
+    Cache a report view's JSON response per user, params and ledger version
+
+    Must be applied below @jwt_required() so the user identity is available.
+    Only successful responses are cached.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not report_cache.enabled:
+            return view(*args, **kwargs)
+
+        user_id = get_jwt_identity()
+        version = report_cache.ledger_service.get_version(user_id)
+        key = report_cache.make_key(user_id, request.endpoint, request.args, version)
+
+        payload = report_cache.get(key)
+        if payload is not None:
+            response = current_app.response_class(payload, mimetype='application/json')
+            response.headers['X-Cache'] = 'HIT'
+            return response
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            report_cache.set(key, response.get_data())
+        response.headers['X-Cache'] = 'MISS'
+        return response
+
+    return wrapper
@@ -0,0 +1,504 @@
+"""
+Columnar in-memory report engine.
+
+A user's ledger is read once into NumPy arrays (day, type, category,
+amount in cents, transaction count) and kept per ledger version, so every
+report and pivot over the same version is pure vectorized aggregation.
+Amounts stay integer cents until the caller formats them, so totals are
+exact.
+
+Frames are read from the daily rollups (see rollup_service), so their size
+depends on the number of days with activity rather than the number of
+transactions. Only project pivots need the transactions themselves.
+
+Amounts keep the currency they were recorded in. Reports ask for a
+reporting currency, and the selected rows are converted in bulk at each
+row's own day (see fx_service) before they are grouped.
+
+Closed fiscal periods are read from their monthly PeriodBalance snapshots
+instead of their daily rollups, so the frame only grows with the open tail
+of the ledger. Requests that need more detail than a month inside a closed
+period (day or week groups, mid-month boundaries) fall back to a frame of
+the daily rollups throughout, and project groups to one of every
+transaction. So do requests whose closed months hold amounts in another
+currency than the reporting one: a snapshot is dated on the 1st of its
+month, so converting it would use that day's rate instead of the rates of
+its transactions.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import Integer, case, cast, func, or_, select
+
+from app import db
+from app.models import PeriodBalance, Transaction, TransactionRollup, TransactionType, TransactionCategory
+from app.services.fx_service import fx_rates
+from app.services.ledger_service import LedgerService
+from app.services.period_service import PeriodService
+from app.utils.money import cents
+
+EPOCH = date(1970, 1, 1)
+
+TYPES = list(TransactionType)
+CATEGORIES = list(TransactionCategory)
+
+class LedgerFrame:
+    """Column arrays of one user's ledger at one ledger version"""
+
+    __slots__ = (
+        'version', 'days', 'types', 'categories', 'amounts', 'projects', 'currencies',
+        'currency_codes', 'counts', 'closed'
+    )
+
+    COLUMNS = ('days', 'types', 'categories', 'amounts', 'projects', 'currencies', 'counts')
+
+    def __init__(self, version, days, types, categories, amounts, projects, currencies, currency_codes,
+                 counts=None, closed=None):
+        self.version = version
+        self.days = days            # int32 days since 1970-01-01
+        self.types = types          # int8 index into TYPES
+        self.categories = categories  # int8 index into CATEGORIES
+        self.amounts = amounts      # int64 cents, in each row's own currency
+        self.projects = projects    # int64 project ID, 0 for none; None when grouped without projects
+        self.currencies = currencies  # int8 index into currency_codes
+        self.currency_codes = currency_codes  # tuple of currency codes
+        self.counts = counts        # int64 transactions per row when pre-grouped, else None
+        self.closed = closed        # (first, last) day numbers summarised by month, or None
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.COLUMNS if getattr(self, name) is not None)
+
+class ReportEngine:
+    """Vectorized group-by over cached per-user ledger columns"""
+
+    DIMENSIONS = ('day', 'week', 'month', 'year', 'type', 'category', 'project')
+
+    # Frame sources from coarsest to finest: closed periods by month and the
+    # rest by day, daily rollups throughout, every transaction
+    DETAILS = ('period', 'day', 'transaction')
+
+    def __init__(self, max_ledgers=32):
+        self.max_ledgers = max_ledgers
+        self.ledger_service = LedgerService()
+        self.period_service = PeriodService()
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the engine from the app config
+
+        Config:
+            REPORT_ENGINE_MAX_LEDGERS: Number of user ledgers kept in memory
+        """
+        self.max_ledgers = app.config.get('REPORT_ENGINE_MAX_LEDGERS', 32)
+        self.clear()
+        app.extensions['report_engine'] = self
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+    def frame(self, user_id, detail='period'):
+        """
+        Get the column arrays of a user's ledger at its current version
+
+        Args:
+            user_id (int): ID of the user
+            detail (str): One of DETAILS
+
+        Returns:
+            LedgerFrame: Cached frame, loaded if the version changed
+        """
+        version = self.ledger_service.get_version(user_id)
+        key = (user_id, detail)
+
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None and frame.version == version:
+                self._frames.move_to_end(key)
+                return frame
+
+        frame = self._load(user_id, version, detail)
+
+        with self._lock:
+            current = self._frames.get(key)
+            # Never replace a newer frame loaded concurrently
+            if current is None or current.version <= version:
+                self._frames[key] = frame
+                self._frames.move_to_end(key)
+            while len(self._frames) > self.max_ledgers:
+                self._frames.popitem(last=False)
+
+        return frame
+
+    @staticmethod
+    def answers(frame, group_by, start_date=None, end_date=None, currency=None):
+        """
+        Whether a frame holds enough detail for a grouping, date range and currency
+
+        Only frames of every transaction can group by project. Closed
+        periods are only summarised per month, so inside them a request can
+        only group by month, year, type and category, its date range must
+        start and end on month boundaries, and their amounts must already be
+        in the reporting currency.
+        """
+        if 'project' in group_by and frame.projects is None:
+            return False
+        if frame.closed is None:
+            return True
+
+        first, last = frame.closed
+        start = (start_date - EPOCH).days if start_date is not None else None
+        end = (end_date - EPOCH).days if end_date is not None else None
+        if (end is not None and end < first) or (start is not None and start > last):
+            return True
+
+        # Snapshots convert at the rate of the 1st of their month, not of their transactions
+        low = first if start is None else max(first, start)
+        high = last if end is None else min(last, end)
+        in_closed = (frame.days >= low) & (frame.days <= high)
+        target = fx_rates.reporting_currency(currency)
+        if any(frame.currency_codes[code] != target for code in np.unique(frame.currencies[in_closed])):
+            return False
+        if any(dimension in ('day', 'week') for dimension in group_by):
+            return False
+        if start is not None and first < start <= last and start_date.day != 1:
+            return False
+        if end is not None and first <= end < last and (end_date + timedelta(days=1)).day != 1:
+            return False
+        return True
+
+    def aggregate(self, user_id, group_by, start_date=None, end_date=None, types=None, currency=None):
+        """
+        Sum amounts and count transactions per group
+
+        Args:
+            user_id (int): ID of the user
+            group_by (sequence): Dimensions from DIMENSIONS, outermost first
+            start_date (date, optional): First day to include
+            end_date (date, optional): Last day to include
+            types (sequence, optional): Only include these TransactionTypes
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
+
+        Returns:
+            list: (key, amount_cents, count) tuples sorted by key, where key is
+                a tuple with one decoded value per dimension
+
+        Raises:
+            ValueError: If a dimension or currency is not supported, or an
+                exchange rate is missing
+        """
+        for detail in self.DETAILS:
+            frame = self.frame(user_id, detail)
+            if self.answers(frame, group_by, start_date, end_date, currency):
+                break
+        return self.aggregate_frame(frame, group_by, start_date, end_date, types, currency)
+
+    def condense(self, user_id, start_date=None, end_date=None, currency=None):
+        """
+        Pre-group a date range of the ledger by (day, type, category)
+
+        Args:
+            user_id (int): ID of the user
+            start_date (date, optional): First day to include
+            end_date (date, optional): Last day to include
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
+
+        Returns:
+            GroupedTotals: Totals that answer any coarser aggregate() call
+                in the same currency
+        """
+        currency = fx_rates.reporting_currency(currency)
+        # Whole months, so month snapshots of closed periods are never cut off
+        if start_date is not None:
+            start_date = start_date.replace(day=1)
+        if end_date is not None:
+            end_date = (end_date.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        frame = self.frame(user_id)
+        if not self.answers(frame, ('month',), start_date, end_date, currency):
+            frame = self.frame(user_id, 'day')
+        mask = self._mask(frame, start_date, end_date, None)
+        codes = [self._codes(frame, dimension, mask) for dimension in ('day', 'type', 'category')]
+        weights = frame.counts[mask] if frame.counts is not None else None
+
+        if len(codes[0]):
+            amounts = self.amounts(frame, mask, currency)
+            (days, types, categories), sums, counts = self._group(codes, amounts, weights)
+        else:
+            days = types = categories = sums = counts = np.zeros(0, dtype=np.int64)
+
+        return GroupedTotals(self, LedgerFrame(
+            version=frame.version,
+            days=days.astype(np.int32),
+            types=types.astype(np.int8),
+            categories=categories.astype(np.int8),
+            amounts=sums,
+            projects=None,
+            currencies=np.zeros(len(sums), dtype=np.int8),
+            currency_codes=(currency,),
+            counts=counts,
+            closed=frame.closed
+        ))
+
+    def aggregate_frame(self, frame, group_by, start_date=None, end_date=None, types=None, currency=None):
+        """Group one frame; see aggregate()"""
+        for dimension in group_by:
+            if dimension not in self.DIMENSIONS:
+                raise ValueError(f'Invalid dimension: {dimension}. Must be one of: {", ".join(self.DIMENSIONS)}')
+
+        mask = self._mask(frame, start_date, end_date, types)
+        amounts = self.amounts(frame, mask, currency)
+        if not len(amounts):
+            return []
+
+        codes = [self._codes(frame, dimension, mask) for dimension in group_by]
+        weights = frame.counts[mask] if frame.counts is not None else None
+        group_codes, sums, counts = self._group(codes, amounts, weights)
+
+        decoded = [
+            self._decode(dimension, column)
+            for dimension, column in zip(group_by, group_codes)
+        ]
+        return [
+            (tuple(values), int(total), int(count))
+            for values, total, count in zip(zip(*decoded), sums, counts)
+        ]
+
+    @staticmethod
+    def amounts(frame, mask, currency=None):
+        """
+        Selected amounts of a frame in a reporting currency
+
+        Each row is converted at the rate of its own day, with one vectorized
+        rate lookup per source currency. A frame recorded entirely in the
+        reporting currency never touches the rates.
+
+        Raises:
+            ValueError: If the currency is invalid or a rate is missing
+        """
+        target = fx_rates.reporting_currency(currency)
+        amounts = frame.amounts[mask]
+        if all(code == target for code in frame.currency_codes):
+            return amounts
+        return fx_rates.convert(
+            amounts, frame.currencies[mask], frame.currency_codes, frame.days[mask], target
+        )
+
+    def _load(self, user_id, version, detail='period'):
+        """Read the ledger columns at one of DETAILS"""
+        if detail == 'transaction':
+            rows = db.session.execute(
+                select(
+                    self._day_number(Transaction.date),
+                    self._type_code(Transaction.type),
+                    self._category_code(Transaction.category),
+                    cents(Transaction.amount),
+                    Transaction.currency,
+                    func.coalesce(Transaction.project_id, 0)
+                ).where(Transaction.user_id == user_id)
+            ).all()
+            return self._frame(version, rows, projects=True)
+
+        closed = self.period_service.closed_range(user_id) if detail == 'period' else None
+
+        query = select(
+            self._day_number(TransactionRollup.day),
+            self._type_code(TransactionRollup.type),
+            self._category_code(TransactionRollup.category),
+            cents(TransactionRollup.total_amount),
+            TransactionRollup.currency,
+            TransactionRollup.transaction_count
+        ).where(TransactionRollup.user_id == user_id, TransactionRollup.transaction_count > 0)
+        if closed:
+            query = query.where(or_(TransactionRollup.day < closed[0], TransactionRollup.day > closed[1]))
+        rows = db.session.execute(query).all()
+
+        if closed:
+            rows += db.session.execute(
+                select(
+                    self._day_number(PeriodBalance.month),
+                    self._type_code(PeriodBalance.type),
+                    self._category_code(PeriodBalance.category),
+                    cents(PeriodBalance.total_amount),
+                    PeriodBalance.currency,
+                    PeriodBalance.transaction_count
+                ).where(PeriodBalance.user_id == user_id)
+            ).all()
+            closed = ((closed[0] - EPOCH).days, (closed[1] - EPOCH).days)
+
+        return self._frame(version, rows, closed=closed)
+
+    def _frame(self, version, rows, projects=False, closed=None):
+        """
+        Build a frame from (day, type, category, cents, currency, extra) rows
+
+        The extra column is the project ID of single transactions when
+        projects is set, else the number of transactions in a grouped row.
+        """
+        columns = list(zip(*rows)) or [()] * 6
+        days = columns[0]
+        if self._day_number_is_date():
+            days = [(day - EPOCH).days for day in days]
+
+        # Currency codes are few; number them in order of appearance
+        currency_codes = {}
+        currencies = [currency_codes.setdefault(code, len(currency_codes)) for code in columns[4]]
+        extra = np.array(columns[5], dtype=np.int64)
+
+        return LedgerFrame(
+            version=version,
+            days=np.array(days, dtype=np.int32),
+            types=np.array(columns[1], dtype=np.int8),
+            categories=np.array(columns[2], dtype=np.int8),
+            amounts=np.array(columns[3], dtype=np.int64),
+            projects=extra if projects else None,
+            currencies=np.array(currencies, dtype=np.int8),
+            currency_codes=tuple(currency_codes),
+            counts=None if projects else extra,
+            closed=closed
+        )
+
+    @staticmethod
+    def _type_code(column):
+        # Enum columns store member names
+        return case({member.name: code for code, member in enumerate(TYPES)}, value=column)
+
+    @staticmethod
+    def _category_code(column):
+        return case({member.name: code for code, member in enumerate(CATEGORIES)}, value=column)
+
+    @staticmethod
+    def _day_number_is_date():
+        return db.engine.dialect.name not in ('sqlite', 'postgresql')
+
+    @staticmethod
+    def _day_number(column):
+        """Days since 1970-01-01 computed in SQL, to skip Python date objects"""
+        dialect = db.engine.dialect.name
+        if dialect == 'sqlite':
+            return cast(func.julianday(column) - 2440587.5, Integer)
+        if dialect == 'postgresql':
+            return column - EPOCH
+        return column
+
+    @staticmethod
+    def _mask(frame, start_date, end_date, types):
+        mask = np.ones(len(frame), dtype=bool)
+        if start_date is not None:
+            mask &= frame.days >= (start_date - EPOCH).days
+        if end_date is not None:
+            mask &= frame.days <= (end_date - EPOCH).days
+        if types is not None:
+            mask &= np.isin(frame.types, [TYPES.index(TransactionType(t)) for t in types])
+        return mask
+
+    @staticmethod
+    def _codes(frame, dimension, mask):
+        """Integer code per row for a dimension"""
+        if dimension == 'type':
+            return frame.types[mask].astype(np.int64)
+        if dimension == 'category':
+            return frame.categories[mask].astype(np.int64)
+        if dimension == 'project':
+            return frame.projects[mask]
+
+        days = frame.days[mask].astype(np.int64)
+        if dimension == 'day':
+            return days
+        if dimension == 'week':
+            # Monday of the ISO week; 1970-01-01 was a Thursday
+            return days - (days + 3) % 7
+        dates = days.astype('datetime64[D]')
+        if dimension == 'month':
+            return dates.astype('datetime64[M]').astype(np.int64)
+        return dates.astype('datetime64[Y]').astype(np.int64) + 1970
+
+    @staticmethod
+    def _group(codes, amounts, weights=None):
+        """
+        Group rows by their code columns, counting each row as its weight (default 1)
+
+        Returns:
+            tuple: (list of code arrays per group, sums, counts)
+        """
+        # Pack the code columns into one int64 key (mixed radix) when it fits
+        offsets = [column.min() for column in codes]
+        radices = [int(column.max()) - int(offset) + 1 for column, offset in zip(codes, offsets)]
+
+        if np.prod([float(radix) for radix in radices]) < 2 ** 62:
+            key = np.zeros(len(amounts), dtype=np.int64)
+            for column, offset, radix in zip(codes, offsets, radices):
+                key = key * radix + (column - offset)
+
+            order = np.argsort(key, kind='stable')
+            sorted_key = key[order]
+            starts = np.flatnonzero(np.r_[True, sorted_key[1:] != sorted_key[:-1]])
+            group_keys = sorted_key[starts]
+
+            group_codes = []
+            for offset, radix in reversed(list(zip(offsets, radices))):
+                group_codes.append(group_keys % radix + offset)
+                group_keys = group_keys // radix
+            group_codes.reverse()
+        else:
+            stacked = np.stack(codes, axis=1)
+            order = np.lexsort(stacked.T[::-1])
+            sorted_rows = stacked[order]
+            starts = np.flatnonzero(np.r_[True, np.any(sorted_rows[1:] != sorted_rows[:-1], axis=1)])
+            group_codes = list(sorted_rows[starts].T)
+
+        sums = np.add.reduceat(amounts[order], starts)
+        if weights is None:
+            counts = np.diff(np.r_[starts, len(amounts)])
+        else:
+            counts = np.add.reduceat(weights[order], starts)
+        return group_codes, sums, counts
+
+    @staticmethod
+    def _decode(dimension, column):
+        """Turn a column of group codes back into report values"""
+        if dimension == 'type':
+            return [TYPES[code] for code in column]
+        if dimension == 'category':
+            return [CATEGORIES[code] for code in column]
+        if dimension == 'project':
+            return [int(code) or None for code in column]
+        if dimension == 'year':
+            return [int(code) for code in column]
+        if dimension == 'month':
+            return [str(np.datetime64(int(code), 'M')) for code in column]
+
+        days = [EPOCH + timedelta(days=int(code)) for code in column]
+        if dimension == 'week':
+            return [f'{d.isocalendar()[0]}-{d.isocalendar()[1]:02d}' for d in days]
+        return [d.isoformat() for d in days]
+
+class GroupedTotals:
+    """
+    A ledger range condensed to (day, type, category) totals
+
+    Has the same aggregate() interface as ReportEngine, so several reports
+    can be derived from one grouped scan of their union date range.
+    """
+
+    def __init__(self, engine, frame):
+        self.engine = engine
+        self.frame = frame
+
+    def aggregate(self, user_id, group_by, start_date=None, end_date=None, types=None, currency=None):
+        """Same contract as ReportEngine.aggregate; finer requests go back to the engine"""
+        if (
+            fx_rates.reporting_currency(currency) != self.frame.currency_codes[0]
+            or not self.engine.answers(self.frame, group_by, start_date, end_date, currency)
+        ):
+            return self.engine.aggregate(user_id, group_by, start_date, end_date, types, currency)
+        return self.engine.aggregate_frame(self.frame, group_by, start_date, end_date, types, currency)
+
+report_engine = ReportEngine()
@@ -0,0 +1,284 @@
+"""
+Asynchronous report jobs.
+
+A job is one report from ReportService.BUNDLE_REPORTS with the same query
+parameters as its endpoint. Enqueueing stores the job with a TTL and hands
+its ID to a broker; a worker computes the report and stores the result under
+the same key, where it can be polled or long-polled until it expires.
+
+Backends:
+    redis: Jobs and results live in Redis, job IDs are queued on a Redis
+        list and `flask reports worker` computes them in a process pool,
+        so long reports never hold a web worker.
+    local: In-process stand-in for development and tests; jobs run on a
+        thread pool of the web process and are kept in an LRU.
+"""
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+from flask import current_app
+
+from app import db
+from app.services.report_cache import LRUCacheBackend
+from app.services.report_service import ReportService
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+FINISHED = (COMPLETED, FAILED)
+
+class LocalJobBackend:
+    """In-process job store and thread pool, used for development and tests"""
+
+    name = 'local'
+
+    def __init__(self, app, workers=2, max_entries=1024):
+        self.app = app
+        self._store = LRUCacheBackend(max_entries)
+        self._executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='report-job')
+        self._finished = threading.Condition()
+
+    def get(self, job_id):
+        return self._store.get(job_id)
+
+    def set(self, job_id, payload, ttl):
+        self._store.set(job_id, payload, ttl=ttl)
+        with self._finished:
+            self._finished.notify_all()
+
+    def enqueue(self, job_id):
+        self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            run_job(job_id)
+
+    def wait(self, job_id, timeout):
+        deadline = time.monotonic() + timeout
+        with self._finished:
+            while True:
+                payload = self.get(job_id)
+                remaining = deadline - time.monotonic()
+                if payload is None or json.loads(payload)['status'] in FINISHED or remaining <= 0:
+                    return payload
+                self._finished.wait(remaining)
+
+class RedisJobBackend:
+    """Redis job store and queue, consumed by `flask reports worker`"""
+
+    name = 'redis'
+    prefix = 'report_jobs:'
+    poll_interval = 0.2
+
+    def __init__(self, url):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+
+    @property
+    def queue(self):
+        return self.prefix + 'queue'
+
+    def get(self, job_id):
+        return self._redis.get(self.prefix + job_id)
+
+    def set(self, job_id, payload, ttl):
+        self._redis.set(self.prefix + job_id, payload, ex=ttl)
+
+    def enqueue(self, job_id):
+        self._redis.lpush(self.queue, job_id)
+
+    def dequeue(self, timeout):
+        item = self._redis.brpop(self.queue, timeout=timeout)
+        return item[1].decode('utf-8') if item else None
+
+    def wait(self, job_id, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            payload = self.get(job_id)
+            if payload is None or json.loads(payload)['status'] in FINISHED or time.monotonic() >= deadline:
+                return payload
+            time.sleep(self.poll_interval)
+
+class ReportJobs:
+    """Report job queue with pluggable backends"""
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = None
+        self.max_wait = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configure the job backend from the app config
+
+        Config:
+            REPORT_JOBS_BACKEND: 'redis' or 'local'
+            REPORT_JOBS_TTL: Lifetime of jobs and their results in seconds
+            REPORT_JOBS_WORKERS: Worker threads (local) or processes (worker command)
+            REPORT_JOBS_MAX_WAIT: Longest long-poll in seconds
+            REDIS_URL: Redis connection URL for the redis backend
+        """
+        self.ttl = app.config.get('REPORT_JOBS_TTL', 3600)
+        self.max_wait = app.config.get('REPORT_JOBS_MAX_WAIT', 30)
+
+        if app.config.get('REPORT_JOBS_BACKEND', 'local') == 'redis':
+            self.backend = RedisJobBackend(app.config['REDIS_URL'])
+        else:
+            self.backend = LocalJobBackend(app, workers=app.config.get('REPORT_JOBS_WORKERS', 2))
+
+        app.extensions['report_jobs'] = self
+
+    def enqueue(self, user_id, report, params):
+        """
+        Validate and queue a report job
+
+        Args:
+            user_id (int): ID of the requesting user
+            report (str): Report name from ReportService.BUNDLE_REPORTS
+            params (dict): Query parameters of the report, as strings
+
+        Returns:
+            dict: The queued job
+
+        Raises:
+            ValueError: If the report or its parameters are invalid
+        """
+        params = {key: str(value) for key, value in (params or {}).items()}
+        ReportService.plan([report], params)
+
+        job = {
+            'id': uuid.uuid4().hex,
+            'user_id': user_id,
+            'report': report,
+            'params': params,
+            'status': QUEUED,
+            'created_at': datetime.utcnow().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'error': None,
+            'result': None
+        }
+        self.save(job)
+        self.backend.enqueue(job['id'])
+        return job
+
+    def get(self, job_id, user_id=None):
+        """Get a job, or None if it is unknown, expired or owned by another user"""
+        payload = self.backend.get(job_id)
+        return self._owned(payload, user_id)
+
+    def wait(self, job_id, user_id=None, timeout=None):
+        """
+        Block until a job finishes or the timeout passes
+
+        Args:
+            job_id (str): ID of the job
+            user_id (int, optional): Only return the job if owned by this user
+            timeout (float, optional): Seconds to wait, capped at REPORT_JOBS_MAX_WAIT
+
+        Returns:
+            dict: The job in its latest state, or None if unknown
+        """
+        if self.get(job_id, user_id) is None:
+            return None
+        timeout = min(timeout if timeout is not None else self.max_wait, self.max_wait)
+        return self._owned(self.backend.wait(job_id, max(timeout, 0)), user_id)
+
+    def save(self, job):
+        self.backend.set(job['id'], current_app.json.dumps(job), self.ttl)
+
+    @staticmethod
+    def _owned(payload, user_id):
+        if payload is None:
+            return None
+        job = json.loads(payload)
+        if user_id is not None and str(job['user_id']) != str(user_id):
+            return None
+        return job
+
+report_jobs = ReportJobs()
+
+def run_job(job_id):
+    """
+    Compute a queued job and store its result; requires an app context
+
+    Args:
+        job_id (str): ID of the job
+
+    Returns:
+        dict: The finished job, or None if it expired before it ran
+    """
+    job = report_jobs.get(job_id)
+    if job is None:
+        return None
+
+    job['status'] = RUNNING
+    job['started_at'] = datetime.utcnow().isoformat()
+    report_jobs.save(job)
+
+    try:
+        plan = ReportService.plan([job['report']], job['params'])
+        job['result'] = ReportService().bundle(job['user_id'], plan)[job['report']]
+        job['status'] = COMPLETED
+    except Exception as e:
+        current_app.logger.error(f'Report job {job_id} failed: {str(e)}')
+        job['status'] = FAILED
+        job['error'] = str(e)
+    finally:
+        db.session.remove()
+
+    job['finished_at'] = datetime.utcnow().isoformat()
+    report_jobs.save(job)
+    return job
+
+_worker_app = None
+
+def _init_worker_process(config):
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app(type('WorkerConfig', (), config))
+
+def _run_in_worker_process(job_id):
+    with _worker_app.app_context():
+        run_job(job_id)
+
+def run_worker(processes, poll_timeout=5, max_jobs=None):
+    """
+    Consume the Redis job queue with a process pool; requires an app context
+
+    At most `processes` jobs are taken off the queue at a time, so several
+    worker hosts can share one queue.
+
+    Args:
+        processes (int): Number of worker processes
+        poll_timeout (int): Seconds to block on the queue between checks
+        max_jobs (int, optional): Stop after this many jobs
+    """
+    backend = report_jobs.backend
+    if not isinstance(backend, RedisJobBackend):
+        raise ValueError('The report worker requires REPORT_JOBS_BACKEND=redis')
+
+    # Worker processes build their own app from the same settings
+    config = {key: value for key, value in current_app.config.items() if key.isupper()}
+
+    slots = threading.BoundedSemaphore(processes)
+    taken = 0
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker_process, initargs=(config,)
+    ) as pool:
+        while max_jobs is None or taken < max_jobs:
+            slots.acquire()
+            job_id = backend.dequeue(poll_timeout)
+            if job_id is None:
+                slots.release()
+                continue
+            taken += 1
+            future = pool.submit(_run_in_worker_process, job_id)
+            future.add_done_callback(lambda _: slots.release())
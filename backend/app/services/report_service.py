@@ -0,0 +1,652 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import select
+
+from app import db
+from app.models import Project, ProjectRollup, TransactionType
+from app.services.checkpoint_service import CheckpointService
+from app.services.fx_service import EPOCH, fx_rates
+from app.services.report_engine import report_engine
+from app.utils.money import Money, cents
+
+class ReportService:
+    """Service for building financial reports with the columnar report engine
+
+    All reports over the same ledger version share one in-memory copy of the
+    user's daily rollups; amounts are summed as integer cents and only
+    converted to floats for the response. Every report takes a reporting
+    currency: amounts recorded in other currencies are converted at the rate
+    of their own day, and a missing rate raises ValueError.
+    """
+
+    GROUP_BY_OPTIONS = ('day', 'week', 'month', 'year')
+    BUNDLE_REPORTS = ('income_expense', 'profit_loss', 'cash_flow', 'tax_summary', 'transaction_summary')
+
+    def __init__(self, engine=None):
+        self.engine = engine or report_engine
+        self.checkpoint_service = CheckpointService()
+
+    @staticmethod
+    def period_key(day, group_by):
+        """
+        Get the report period a day falls into
+
+        Args:
+            day (date): Day to bucket
+            group_by (str): One of day, week, month, year
+
+        Returns:
+            The period label (int for years, ISO strings otherwise)
+        """
+        if group_by == 'year':
+            return day.year
+        if group_by == 'month':
+            return day.strftime('%Y-%m')
+        if group_by == 'week':
+            iso_year, iso_week, _ = day.isocalendar()
+            return f'{iso_year}-{iso_week:02d}'
+        return day.isoformat()
+
+    @staticmethod
+    def _to_amount(amount_cents):
+        return Money(amount_cents).to_json()
+
+    def _period_totals(self, user_id, start_date, end_date, group_by, currency=None):
+        """Income and expense cents per period; every non-income type counts as expense"""
+        totals = {}
+        rows = self.engine.aggregate(user_id, (group_by, 'type'), start_date, end_date, currency=currency)
+        for (period, txn_type), amount_cents, _ in rows:
+            income, expense = totals.get(period, (0, 0))
+            if txn_type == TransactionType.INCOME:
+                income += amount_cents
+            else:
+                expense += amount_cents
+            totals[period] = (income, expense)
+        return totals
+
+    def _category_totals(self, user_id, start_date, end_date, currency=None):
+        """(type, category, cents) for a date range"""
+        return [
+            (txn_type, category, amount_cents)
+            for (txn_type, category), amount_cents, _ in self.engine.aggregate(
+                user_id, ('type', 'category'), start_date, end_date, currency=currency
+            )
+        ]
+
+    @classmethod
+    def plan(cls, names, args, today=None):
+        """
+        Build a bundle plan from shared query parameters
+
+        Parameters default exactly like the individual report endpoints:
+        ``start_date``/``end_date`` (both or neither, current year to date),
+        ``group_by`` (month), ``months`` (12), ``year`` (current year) and
+        ``reporting_currency`` (REPORTING_CURRENCY).
+
+        Args:
+            names (sequence): Report names from BUNDLE_REPORTS
+            args (dict): Query parameters as strings
+            today (date, optional): Reference day of the defaults
+
+        Returns:
+            dict: Plan for bundle()
+
+        Raises:
+            ValueError: If a report name or parameter is invalid
+        """
+        today = today or date.today()
+        try:
+            start_date = args.get('start_date')
+            end_date = args.get('end_date')
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        except ValueError:
+            raise ValueError('Invalid date format. Use YYYY-MM-DD')
+        try:
+            months = int(args.get('months', 12))
+            fiscal_year = int(args.get('year', today.year))
+        except (TypeError, ValueError):
+            raise ValueError('months and year must be integers')
+        currency = fx_rates.reporting_currency(args.get('reporting_currency'))
+
+        if start_date and end_date:
+            report_start, report_end = start_date, end_date
+        else:
+            report_start, report_end = today.replace(month=1, day=1), today
+
+        params = {
+            'income_expense': {
+                'start_date': report_start, 'end_date': report_end, 'group_by': args.get('group_by', 'month')
+            },
+            'profit_loss': {'start_date': report_start, 'end_date': report_end},
+            'cash_flow': {'end_date': end_date or today, 'months': months},
+            'tax_summary': {'fiscal_year': fiscal_year},
+            'transaction_summary': {'start_date': start_date, 'end_date': end_date},
+        }
+
+        for name in names:
+            if name not in cls.BUNDLE_REPORTS:
+                raise ValueError(f'Invalid report: {name}. Must be one of: {", ".join(cls.BUNDLE_REPORTS)}')
+        return {name: dict(params[name], currency=currency) for name in names}
+
+    @staticmethod
+    def _cash_flow_start(end_date, months):
+        return (end_date - timedelta(days=30*months)).replace(day=1)
+
+    def report_range(self, name, params):
+        """
+        Date range a report reads
+
+        Args:
+            name (str): One of BUNDLE_REPORTS
+            params (dict): Keyword arguments of the report method
+
+        Returns:
+            tuple: (start_date, end_date), None meaning unbounded
+        """
+        if name == 'cash_flow':
+            months = params.get('months', 12)
+            if months <= 0:
+                raise ValueError('Months must be greater than 0')
+            return self._cash_flow_start(params['end_date'], months), params['end_date']
+        if name == 'tax_summary':
+            return date(params['fiscal_year'], 1, 1), date(params['fiscal_year'], 12, 31)
+        return params.get('start_date'), params.get('end_date')
+
+    def bundle(self, user_id, plan):
+        """
+        Build several reports from one grouped scan of their union date range
+
+        The union range is aggregated once by (day, type, category) and every
+        report is derived from that result instead of scanning the ledger again.
+
+        Args:
+            user_id (int): ID of the user
+            plan (dict): Report name (from BUNDLE_REPORTS) to the keyword
+                arguments of its report method, without user_id
+
+        Returns:
+            dict: Report name to report payload
+
+        Raises:
+            ValueError: If a report name or its parameters are invalid
+        """
+        for name in plan:
+            if name not in self.BUNDLE_REPORTS:
+                raise ValueError(f'Invalid report: {name}. Must be one of: {", ".join(self.BUNDLE_REPORTS)}')
+        if not plan:
+            return {}
+
+        ranges = [self.report_range(name, params) for name, params in plan.items()]
+        starts = [start for start, _ in ranges]
+        ends = [end for _, end in ranges]
+        start_date = None if None in starts else min(starts)
+        end_date = None if None in ends else max(ends)
+
+        currencies = {
+            name: fx_rates.reporting_currency(params.get('currency'))
+            for name, params in plan.items()
+        }
+        derived = {
+            currency: ReportService(engine=self.engine.condense(user_id, start_date, end_date, currency))
+            for currency in set(currencies.values())
+        }
+        return {
+            name: getattr(derived[currencies[name]], name)(user_id, **params)
+            for name, params in plan.items()
+        }
+
+    def transaction_summary(self, user_id, start_date=None, end_date=None, currency=None):
+        """
+        Totals by type and category, as served by /api/transactions/summary
+
+        Args:
+            user_id (int): ID of the user
+            start_date (date, optional): First day to include
+            end_date (date, optional): Last day to include
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
+
+        Returns:
+            dict: Summary payload
+        """
+        currency = fx_rates.reporting_currency(currency)
+        by_type = {}
+        by_category = {}
+        total_income = total_expenses = 0
+        for txn_type, category, amount_cents in self._category_totals(user_id, start_date, end_date, currency):
+            by_type[txn_type.value] = by_type.get(txn_type.value, 0) + amount_cents
+            by_category[category.value] = by_category.get(category.value, 0) + amount_cents
+            if txn_type == TransactionType.INCOME:
+                total_income += amount_cents
+            else:
+                total_expenses += amount_cents
+
+        return {
+            'total_income': self._to_amount(total_income),
+            'total_expenses': self._to_amount(total_expenses),
+            'net_income': self._to_amount(total_income - total_expenses),
+            'by_type': {key: self._to_amount(amount_cents) for key, amount_cents in by_type.items()},
+            'by_category': {key: self._to_amount(amount_cents) for key, amount_cents in by_category.items()},
+            'currency': currency
+        }
+
+    def pivot(self, user_id, group_by, start_date=None, end_date=None, types=None, currency=None):
+        """
+        Ad-hoc totals for any combination of engine dimensions
+
+        Args:
+            user_id (int): ID of the user
+            group_by (sequence): Dimensions, see ReportEngine.DIMENSIONS
+            start_date (date, optional): First day to include
+            end_date (date, optional): Last day to include
+            types (sequence, optional): Only include these transaction types
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
+
+        Returns:
+            dict: Report payload with one row per group
+
+        Raises:
+            ValueError: If a dimension, type or currency is invalid
+        """
+        if not group_by:
+            raise ValueError('At least one group_by dimension is required')
+        currency = fx_rates.reporting_currency(currency)
+
+        data = []
+        for key, amount_cents, count in self.engine.aggregate(user_id, group_by, start_date, end_date, types, currency):
+            row = {}
+            for dimension, value in zip(group_by, key):
+                row[dimension] = value.value if hasattr(value, 'value') else value
+            row['amount'] = self._to_amount(amount_cents)
+            row['count'] = count
+            data.append(row)
+
+        return {
+            'group_by': list(group_by),
+            'start_date': start_date.isoformat() if start_date else None,
+            'end_date': end_date.isoformat() if end_date else None,
+            'currency': currency,
+            'data': data
+        }
+
+    def income_expense(self, user_id, start_date, end_date, group_by='month', currency=None):
+        """
+        Income vs expense per period
+
+        Args:
+            user_id (int): ID of the user
+            start_date (date): First day of the report
+            end_date (date): Last day of the report
+            group_by (str): One of day, week, month, year
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
+
+        Returns:
+            dict: Report payload
+
+        Raises:
+            ValueError: If group_by or currency is not supported
+        """
+        if group_by not in self.GROUP_BY_OPTIONS:
+            raise ValueError('Invalid group_by parameter. Must be one of: day, week, month, year')
+        currency = fx_rates.reporting_currency(currency)
+
+        report_data = []
+        total_income = total_expense = 0
+        for period, (income, expense) in sorted(
+            self._period_totals(user_id, start_date, end_date, group_by, currency).items()
+        ):
+            report_data.append({
+                'period': period,
+                'income': self._to_amount(income),
+                'expense': self._to_amount(expense),
+                'net': self._to_amount(income - expense)
+            })
+            total_income += income
+            total_expense += expense
+
+        totals = {
+            'total_income': self._to_amount(total_income),
+            'total_expense': self._to_amount(total_expense),
+            'net_income': self._to_amount(total_income - total_expense)
+        }
+
+        return {
+            'data': report_data,
+            'totals': totals,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'group_by': group_by,
+            'currency': currency
+        }
+
+    def profit_loss(self, user_id, start_date, end_date, currency=None):
+        """
+        Profit and loss by category
+
+        Args:
+            user_id (int): ID of the user
+            start_date (date): First day of the report
+            end_date (date): Last day of the report
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
+
+        Returns:
+            dict: Report payload
+        """
+        currency = fx_rates.reporting_currency(currency)
+        income = []
+        expenses = []
+        total_income = total_expenses = 0
+
+        for txn_type, category, amount_cents in self._category_totals(user_id, start_date, end_date, currency):
+            if txn_type == TransactionType.INCOME:
+                income.append({'category': category.value, 'amount': self._to_amount(amount_cents)})
+                total_income += amount_cents
+            elif txn_type == TransactionType.EXPENSE:
+                expenses.append({'category': category.value, 'amount': self._to_amount(amount_cents)})
+                total_expenses += amount_cents
+
+        return {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'currency': currency,
+            'income': income,
+            'expenses': expenses,
+            'totals': {
+                'total_income': self._to_amount(total_income),
+                'total_expenses': self._to_amount(total_expenses),
+                'net_profit': self._to_amount(total_income - total_expenses)
+            }
+        }
+
+    def cash_flow(self, user_id, end_date, months=12, currency=None):
+        """
+        Monthly cash flow with a running balance
+
+        The running balance starts from the balance carried into the first
+        month, read from the monthly checkpoints, so opening and ending
+        balances reflect the whole ledger history. Opening balances held in
+        other currencies are converted at the rate of the day before the
+        first month.
+
+        Args:
+            user_id (int): ID of the user
+            end_date (date): Last day of the report
+            months (int): Number of months to cover
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
+
+        Returns:
+            dict: Report payload
+
+        Raises:
+            ValueError: If months is not positive, or the currency is invalid
+        """
+        if months <= 0:
+            raise ValueError('Months must be greater than 0')
+        currency = fx_rates.reporting_currency(currency)
+
+        start_date = self._cash_flow_start(end_date, months)
+
+        # Generate all periods in the range
+        periods = []
+        current = start_date
+        while current <= end_date:
+            periods.append(current.strftime('%Y-%m'))
+            # Move to first day of next month
+            if current.month == 12:
+                current = current.replace(year=current.year + 1, month=1, day=1)
+            else:
+                current = current.replace(month=current.month + 1, day=1)
+
+        totals_by_month = self._period_totals(user_id, start_date, end_date, 'month', currency)
+        opening_balance = sum(
+            fx_rates.convert_cents(Money.of(balance).cents, code, currency, start_date - timedelta(days=1))
+            for code, balance in self.checkpoint_service.balance_before(user_id, start_date).items()
+        )
+
+        cash_flow = []
+        running_balance = opening_balance
+        total_income = total_expense = 0
+        for period in periods:
+            income, expense = totals_by_month.get(period, (0, 0))
+            running_balance += income - expense
+            total_income += income
+            total_expense += expense
+            cash_flow.append({
+                'period': period,
+                'income': self._to_amount(income),
+                'expense': self._to_amount(expense),
+                'net': self._to_amount(income - expense),
+                'running_balance': self._to_amount(running_balance)
+            })
+
+        totals = {
+            'opening_balance': self._to_amount(opening_balance),
+            'total_income': self._to_amount(total_income),
+            'total_expense': self._to_amount(total_expense),
+            'net_cash_flow': self._to_amount(total_income - total_expense),
+            'ending_balance': self._to_amount(running_balance)
+        }
+
+        return {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'currency': currency,
+            'data': cash_flow,
+            'totals': totals
+        }
+
+    def tax_summary(self, user_id, fiscal_year, currency=None):
+        """
+        Tax summary for a fiscal (calendar) year
+
+        Args:
+            user_id (int): ID of the user
+            fiscal_year (int): Year to summarise
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
+
+        Returns:
+            dict: Report payload
+        """
+        currency = fx_rates.reporting_currency(currency)
+        start_date = date(fiscal_year, 1, 1)
+        end_date = date(fiscal_year, 12, 31)
+
+        tax_categories = {
+            'income': {
+                'service': 0.0,
+                'product_sale': 0.0,
+                'other_income': 0.0,
+                'total': 0.0
+            },
+            'expenses': {
+                'office_supplies': 0.0,
+                'rent': 0.0,
+                'utilities': 0.0,
+                'salary': 0.0,
+                'contractor': 0.0,
+                'software': 0.0,
+                'hardware': 0.0,
+                'travel': 0.0,
+                'meals': 0.0,
+                'marketing': 0.0,
+                'professional_services': 0.0,
+                'insurance': 0.0,
+                'taxes': 0.0,
+                'other_expense': 0.0,
+                'total': 0.0
+            },
+            'net_profit': 0.0,
+            'estimated_tax': 0.0
+        }
+
+        section_cents = {'income': {}, 'expenses': {}}
+        for txn_type, category, amount in self._category_totals(user_id, start_date, end_date, currency):
+            section = 'income' if txn_type == TransactionType.INCOME else 'expenses'
+            fallback = 'other_income' if section == 'income' else 'other_expense'
+            category = category.value if category.value in tax_categories[section] else fallback
+            section_cents[section][category] = section_cents[section].get(category, 0) + amount
+            section_cents[section]['total'] = section_cents[section].get('total', 0) + amount
+
+        for section, amounts in section_cents.items():
+            for category, amount in amounts.items():
+                tax_categories[section][category] = self._to_amount(amount)
+
+        # Calculate net profit and estimated tax (simplified) in whole cents
+        net_profit = Money(section_cents['income'].get('total', 0) - section_cents['expenses'].get('total', 0))
+        estimated_tax = net_profit * Decimal('0.30')  # 30% estimated tax rate (simplified), rounded half up
+        tax_categories['net_profit'] = self._to_amount(net_profit.cents)
+        tax_categories['estimated_tax'] = self._to_amount(estimated_tax.cents)
+
+        return {
+            'fiscal_year': fiscal_year,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'currency': currency,
+            'tax_categories': tax_categories
+        }
+
+    def projects(self, user_id, start_date=None, end_date=None, project_id=None, active_only=False,
+                 currency=None):
+        """
+        Income, expense, margin and budget burn per project and month
+
+        Read from the monthly project rollups, so every project of a user
+        costs one grouped read instead of a ledger scan each. Dates are
+        widened to whole months. Budget burn is the share of the budget
+        spent on expenses from the start of the project through each month,
+        so it also counts months before start_date. Budgets are taken to be
+        in REPORTING_CURRENCY; monthly totals are converted at month-end rates.
+
+        Args:
+            user_id (int): ID of the user
+            start_date (date, optional): First day of the report
+            end_date (date, optional): Last day of the report
+            project_id (int, optional): Only report this project
+            active_only (bool): Skip inactive projects
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
+
+        Returns:
+            dict: Report payload with one entry per project
+
+        Raises:
+            ValueError: If the currency is invalid or an exchange rate is missing
+        """
+        currency = fx_rates.reporting_currency(currency)
+        if start_date is not None:
+            start_date = start_date.replace(day=1)
+        if end_date is not None:
+            end_date = self._month_end(end_date)
+
+        filters = [Project.user_id == user_id]
+        if project_id is not None:
+            filters.append(Project.id == project_id)
+        if active_only:
+            filters.append(Project.is_active.is_(True))
+        projects = Project.query.filter(*filters).order_by(Project.name, Project.id).all()
+        if not projects:
+            return self._projects_payload(start_date, end_date, currency, [], 0, 0)
+
+        query = select(
+            ProjectRollup.project_id,
+            ProjectRollup.month,
+            ProjectRollup.type,
+            ProjectRollup.currency,
+            cents(ProjectRollup.total_amount)
+        ).where(
+            ProjectRollup.user_id == user_id,
+            ProjectRollup.project_id.in_([project.id for project in projects])
+        ).order_by(ProjectRollup.month)
+        if end_date is not None:
+            query = query.where(ProjectRollup.month <= end_date)
+        rows = db.session.execute(query).all()
+
+        # Convert every (month, currency) total in one pass, at its month-end rate
+        codes = {}
+        converted = fx_rates.convert(
+            np.array([row[4] for row in rows], dtype=np.int64),
+            np.array([codes.setdefault(row[3], len(codes)) for row in rows], dtype=np.int64),
+            tuple(codes),
+            np.array([(self._month_end(row[1]) - EPOCH).days for row in rows], dtype=np.int64),
+            currency
+        )
+
+        monthly = {}
+        for (row_project_id, month, txn_type, _, _), amount in zip(rows, converted):
+            income, expense = monthly.setdefault(row_project_id, {}).get(month, (0, 0))
+            if TransactionType(txn_type) == TransactionType.INCOME:
+                income += int(amount)
+            else:
+                expense += int(amount)
+            monthly[row_project_id][month] = (income, expense)
+
+        budget_day = end_date or date.today()
+        entries = []
+        total_income = total_expense = 0
+        for project in projects:
+            budget = None
+            if project.budget is not None:
+                budget = fx_rates.convert_cents(
+                    Money.of(project.budget).cents, fx_rates.default_currency, currency, budget_day
+                )
+
+            periods = []
+            income = expense = spent = 0
+            for month, (month_income, month_expense) in sorted(monthly.get(project.id, {}).items()):
+                spent += month_expense
+                if start_date is not None and month < start_date:
+                    continue
+                income += month_income
+                expense += month_expense
+                periods.append({
+                    'period': month.strftime('%Y-%m'),
+                    'income': self._to_amount(month_income),
+                    'expense': self._to_amount(month_expense),
+                    'margin': self._to_amount(month_income - month_expense),
+                    'spent_to_date': self._to_amount(spent),
+                    'budget_burn': self._burn(spent, budget)
+                })
+
+            total_income += income
+            total_expense += expense
+            entries.append({
+                'id': project.id,
+                'name': project.name,
+                'client_id': project.client_id,
+                'is_active': project.is_active,
+                'hourly_rate': Money.of(project.hourly_rate or 0).to_json(),
+                'budget': self._to_amount(budget) if budget is not None else None,
+                'income': self._to_amount(income),
+                'expense': self._to_amount(expense),
+                'margin': self._to_amount(income - expense),
+                'margin_percent': round((income - expense) * 100 / income, 2) if income else None,
+                'spent_to_date': self._to_amount(spent),
+                'budget_remaining': self._to_amount(budget - spent) if budget is not None else None,
+                'budget_burn': self._burn(spent, budget),
+                'periods': periods
+            })
+
+        return self._projects_payload(start_date, end_date, currency, entries, total_income, total_expense)
+
+    @staticmethod
+    def _month_end(day):
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+    @staticmethod
+    def _burn(spent, budget):
+        """Share of a budget spent, None without a positive budget"""
+        return round(spent / budget, 4) if budget else None
+
+    def _projects_payload(self, start_date, end_date, currency, entries, total_income, total_expense):
+        return {
+            'start_date': start_date.isoformat() if start_date else None,
+            'end_date': end_date.isoformat() if end_date else None,
+            'currency': currency,
+            'projects': entries,
+            'totals': {
+                'total_income': self._to_amount(total_income),
+                'total_expense': self._to_amount(total_expense),
+                'margin': self._to_amount(total_income - total_expense)
+            }
+        }
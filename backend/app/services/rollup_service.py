@@ -0,0 +1,267 @@
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import select, func, insert, update, delete, and_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app import db
+from app.models import Transaction, TransactionType, TransactionCategory, TransactionRollup, ProjectRollup
+from app.services.checkpoint_service import CheckpointService
+from app.utils.money import DEFAULT_CURRENCY, Money, cents
+
+class RollupService:
+    """Service for maintaining the per-user daily transaction rollups
+
+    The rollup table holds one row per (user, day, type, category, currency)
+    with the summed amount and number of transactions in that bucket. Every write to
+    the transactions table must go through this service inside the same
+    database transaction so that reports can read the rollups instead of
+    re-aggregating the raw ledger. The monthly balance checkpoints and the
+    monthly per-project rollups are kept in step with the daily rollups.
+    """
+
+    BUCKET_KEYS = ('user_id', 'day', 'type', 'category', 'currency')
+    PROJECT_KEYS = ('user_id', 'project_id', 'month', 'type', 'currency')
+
+    def __init__(self):
+        self.checkpoint_service = CheckpointService()
+
+    def bucket_for(self, transaction):
+        """
+        Capture the rollup bucket a transaction currently contributes to
+
+        Args:
+            transaction (Transaction): Transaction to inspect
+
+        Returns:
+            tuple: (user_id, day, type, category, currency, project_id, amount)
+        """
+        return (
+            transaction.user_id,
+            transaction.date,
+            TransactionType(transaction.type),
+            TransactionCategory(transaction.category),
+            transaction.currency or DEFAULT_CURRENCY,
+            transaction.project_id,
+            self._to_decimal(transaction.amount)
+        )
+
+    def add(self, transaction):
+        """Add a new transaction to its rollup bucket"""
+        self._apply(self.bucket_for(transaction), 1)
+
+    def remove(self, transaction):
+        """Remove a deleted transaction from its rollup bucket"""
+        self._apply(self.bucket_for(transaction), -1)
+
+    def move(self, previous_bucket, transaction):
+        """
+        Move an updated transaction from its previous bucket to its current one
+
+        Args:
+            previous_bucket (tuple): Bucket captured with bucket_for() before the update
+            transaction (Transaction): The updated transaction
+        """
+        current_bucket = self.bucket_for(transaction)
+        if current_bucket == previous_bucket:
+            return
+
+        self._apply(previous_bucket, -1)
+        self._apply(current_bucket, 1)
+
+    def rebuild(self, user_id=None):
+        """
+        Rebuild the rollups, project rollups and balance checkpoints from the transactions table
+
+        Args:
+            user_id (int, optional): Only rebuild this user's rollups
+
+        Returns:
+            int: Number of daily rollup rows written
+        """
+        table = TransactionRollup.__table__
+        project_table = ProjectRollup.__table__
+
+        clear = delete(table)
+        clear_projects = delete(project_table)
+        source = select(
+            Transaction.user_id,
+            Transaction.date,
+            Transaction.type,
+            Transaction.category,
+            Transaction.currency,
+            func.sum(Transaction.amount),
+            func.count(Transaction.id)
+        ).group_by(
+            Transaction.user_id, Transaction.date, Transaction.type, Transaction.category,
+            Transaction.currency
+        )
+
+        if user_id is not None:
+            clear = clear.where(table.c.user_id == user_id)
+            clear_projects = clear_projects.where(project_table.c.user_id == user_id)
+            source = source.where(Transaction.user_id == user_id)
+
+        try:
+            db.session.execute(clear)
+            db.session.execute(clear_projects)
+            result = db.session.execute(
+                insert(table).from_select(
+                    ['user_id', 'day', 'type', 'category', 'currency', 'total_amount', 'transaction_count'],
+                    source
+                )
+            )
+            self._rebuild_projects(user_id)
+            self.checkpoint_service.rebuild(user_id)
+            db.session.commit()
+            return result.rowcount
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f'Failed to rebuild rollups: {str(e)}')
+
+    def _rebuild_projects(self, user_id=None):
+        """Refill the project rollups from daily per-project sums, folded into months"""
+        query = select(
+            Transaction.user_id,
+            Transaction.project_id,
+            Transaction.date,
+            Transaction.type,
+            Transaction.currency,
+            func.sum(cents(Transaction.amount)),
+            func.count(Transaction.id)
+        ).where(Transaction.project_id.isnot(None)).group_by(
+            Transaction.user_id, Transaction.project_id, Transaction.date, Transaction.type,
+            Transaction.currency
+        )
+        if user_id is not None:
+            query = query.where(Transaction.user_id == user_id)
+
+        deltas = {}
+        for row_user_id, project_id, day, type_, currency, amount, count in db.session.execute(query):
+            key = self._project_key(row_user_id, project_id, day, type_, currency)
+            self._add_delta(deltas, key, Money(amount).to_decimal(), count)
+        self._upsert(ProjectRollup.__table__, self.PROJECT_KEYS, self._rows(self.PROJECT_KEYS, deltas))
+
+    def add_many(self, rows):
+        """
+        Add a batch of inserted transactions with one batched upsert
+
+        Args:
+            rows (list): Dicts with user_id, date, type, category, amount and
+                optionally currency and project_id
+        """
+        deltas = {}
+        project_deltas = {}
+        nets = {}
+        for row in rows:
+            currency = row.get('currency') or DEFAULT_CURRENCY
+            key = (
+                row['user_id'],
+                row['date'],
+                TransactionType(row['type']),
+                TransactionCategory(row['category']),
+                currency
+            )
+            amount = self._to_decimal(row['amount'])
+            self._add_delta(deltas, key, amount, 1)
+
+            if row.get('project_id') is not None:
+                project_key = self._project_key(row['user_id'], row['project_id'], row['date'], row['type'], currency)
+                self._add_delta(project_deltas, project_key, amount, 1)
+
+            month = (row['user_id'], self.checkpoint_service.month_of(row['date']), currency)
+            nets[month] = nets.get(month, Decimal('0')) + self.checkpoint_service.signed(row['type'], amount)
+
+        self._upsert(TransactionRollup.__table__, self.BUCKET_KEYS, self._rows(self.BUCKET_KEYS, deltas))
+        self._upsert(ProjectRollup.__table__, self.PROJECT_KEYS, self._rows(self.PROJECT_KEYS, project_deltas))
+        self.checkpoint_service.apply(nets)
+
+    def _apply(self, bucket, count):
+        """Add count transactions worth count * amount to a bucket, without committing"""
+        user_id, day, type_, category, currency, project_id, amount = bucket
+
+        buckets = [(TransactionRollup.__table__, self.BUCKET_KEYS, (user_id, day, type_, category, currency))]
+        if project_id is not None:
+            buckets.append((
+                ProjectRollup.__table__, self.PROJECT_KEYS,
+                self._project_key(user_id, project_id, day, type_, currency)
+            ))
+
+        for table, keys, key in buckets:
+            self._upsert(table, keys, self._rows(keys, {key: (amount * count, count)}))
+
+            # Drop buckets that no longer hold any transactions
+            if count < 0:
+                db.session.execute(
+                    delete(table).where(
+                        self._bucket_clause(table, keys, key),
+                        table.c.transaction_count <= 0
+                    )
+                )
+
+        self.checkpoint_service.apply({
+            (user_id, self.checkpoint_service.month_of(day), currency):
+                self.checkpoint_service.signed(type_, amount * count)
+        })
+
+    def _project_key(self, user_id, project_id, day, type_, currency):
+        return (
+            user_id, project_id, self.checkpoint_service.month_of(day), TransactionType(type_),
+            currency or DEFAULT_CURRENCY
+        )
+
+    @staticmethod
+    def _add_delta(deltas, key, amount, count):
+        total, transactions = deltas.get(key, (Decimal('0'), 0))
+        deltas[key] = (total + amount, transactions + count)
+
+    @staticmethod
+    def _rows(keys, deltas):
+        """Upsert rows from {bucket key tuple: (amount, count)}"""
+        return [
+            dict(zip(keys, key), total_amount=amount, transaction_count=count)
+            for key, (amount, count) in deltas.items()
+        ]
+
+    def _upsert(self, table, keys, rows):
+        """Add each row's amount and count to its bucket, creating missing buckets"""
+        if not rows:
+            return
+
+        dialect = db.engine.dialect.name
+
+        if dialect in ('postgresql', 'sqlite'):
+            # Batched INSERT ... ON CONFLICT; buckets are unique per batch
+            dialect_insert = postgresql_insert if dialect == 'postgresql' else sqlite_insert
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(keys),
+                set_={
+                    'total_amount': table.c.total_amount + stmt.excluded.total_amount,
+                    'transaction_count': table.c.transaction_count + stmt.excluded.transaction_count
+                }
+            )
+            db.session.execute(stmt, rows)
+            return
+
+        for row in rows:
+            key = tuple(row[name] for name in keys)
+            result = db.session.execute(
+                update(table).where(self._bucket_clause(table, keys, key)).values(
+                    total_amount=table.c.total_amount + row['total_amount'],
+                    transaction_count=table.c.transaction_count + row['transaction_count']
+                )
+            )
+            if result.rowcount == 0:
+                db.session.execute(insert(table).values(**row))
+
+    @staticmethod
+    def _bucket_clause(table, keys, key):
+        return and_(*(table.c[name] == value for name, value in zip(keys, key)))
+
+    @staticmethod
+    def _to_decimal(amount):
+        try:
+            return Decimal(str(amount))
+        except (InvalidOperation, TypeError):
+            raise ValueError(f'Invalid amount: {amount}')
@@ -0,0 +1,111 @@
+import re
+
+from sqlalchemy import column, desc, func, or_, select, table, text
+
+from app import db
+from app.models import search_vector, fts_table_name
+from app.models.search_index import SEARCH_COLUMNS, TRIGRAM_COLUMNS, fts_ddl
+
+class SearchService:
+    """Service for full-text search over transactions and invoices
+
+    Terms are split into words and every word must match, as a prefix, one
+    of the model's searchable columns. PostgreSQL matches against the GIN
+    tsvector index and falls back to the trigram index for substrings of
+    references and invoice numbers; SQLite matches against the FTS5 table.
+    Other databases fall back to ILIKE.
+    """
+    
+    def apply(self, query, model, term, rank=False):
+        """
+        Restrict a query to the rows matching a search term
+        
+        Args:
+            query (Query): Query over the model
+            model (db.Model): Transaction or Invoice
+            term (str): User-supplied search term
+            rank (bool): Order the results by relevance, best match first
+            
+        Returns:
+            Query: The filtered (and possibly ordered) query
+        """
+        words = self._words(term)
+        dialect = db.engine.dialect.name
+        
+        if not words:
+            return self._apply_like(query, model, term)
+        if dialect == 'postgresql':
+            return self._apply_postgresql(query, model, term, words, rank)
+        if dialect == 'sqlite':
+            return self._apply_sqlite(query, model, words, rank)
+        return self._apply_like(query, model, term)
+    
+    def rebuild(self):
+        """
+        Create missing search structures and reindex existing rows
+        
+        Needed once for SQLite databases created before the FTS tables
+        existed; PostgreSQL indexes are maintained by the database.
+        """
+        if db.engine.dialect.name != 'sqlite':
+            return
+        
+        try:
+            for model in SEARCH_COLUMNS:
+                for statement in fts_ddl(model):
+                    db.session.execute(text(statement))
+                fts = fts_table_name(model)
+                db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f'Failed to rebuild search index: {str(e)}')
+    
+    @staticmethod
+    def _words(term):
+        return re.findall(r'\w+', term or '')
+    
+    def _apply_postgresql(self, query, model, term, words, rank):
+        tsquery = func.to_tsquery('simple', ' & '.join(f'{word}:*' for word in words))
+        vector = search_vector(model)
+        trigram_column = getattr(model, TRIGRAM_COLUMNS[model])
+        
+        query = query.filter(or_(
+            vector.op('@@')(tsquery),
+            trigram_column.ilike(self._like_pattern(term), escape='\\')
+        ))
+        if rank:
+            query = query.order_by(desc(func.ts_rank(vector, tsquery)))
+        return query
+    
+    def _apply_sqlite(self, query, model, words, rank):
+        name = fts_table_name(model)
+        fts = table(name, column('rowid'), column(name))
+        expression = ' '.join(f'"{word}"*' for word in words)
+        
+        match = fts.c[name].match(expression)
+        
+        if not rank:
+            # IN (subquery) makes SQLite run the FTS query once instead of
+            # probing the FTS table for every candidate row
+            return query.filter(model.id.in_(select(fts.c.rowid).where(match)))
+        
+        matches = select(
+            fts.c.rowid.label('id'),
+            func.bm25(fts.c[name]).label('rank')
+        ).where(match).subquery()
+        
+        # bm25() is lower for better matches
+        return query.join(matches, matches.c.id == model.id).order_by(matches.c.rank)
+    
+    def _apply_like(self, query, model, term):
+        pattern = self._like_pattern(term)
+        return query.filter(or_(*[
+            getattr(model, name).ilike(pattern, escape='\\')
+            for name in SEARCH_COLUMNS[model]
+        ]))
+    
+    @staticmethod
+    def _like_pattern(term):
+        escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f'%{escaped}%'
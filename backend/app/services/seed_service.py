@@ -0,0 +1,375 @@
+import math
+import random
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import chain
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models import (
+    User, Client, Project, Invoice, InvoiceItem, InvoiceStatus, InvoiceSequence,
+    Transaction, TransactionType, TransactionCategory
+)
+from app.services.rollup_service import RollupService
+
+# (weight, median amount, spread) of generated expenses per category
+EXPENSE_PROFILES = {
+    TransactionCategory.RENT: (4, 1800, 0.3),
+    TransactionCategory.UTILITIES: (6, 140, 0.5),
+    TransactionCategory.SALARY: (5, 3500, 0.4),
+    TransactionCategory.CONTRACTOR: (6, 900, 0.8),
+    TransactionCategory.SOFTWARE: (14, 45, 1.0),
+    TransactionCategory.HARDWARE: (3, 600, 0.9),
+    TransactionCategory.OFFICE_SUPPLIES: (10, 35, 0.8),
+    TransactionCategory.TRAVEL: (8, 250, 1.0),
+    TransactionCategory.MEALS: (18, 28, 0.7),
+    TransactionCategory.MARKETING: (5, 400, 1.0),
+    TransactionCategory.PROFESSIONAL_SERVICES: (4, 750, 0.7),
+    TransactionCategory.INSURANCE: (2, 300, 0.3),
+    TransactionCategory.TAXES: (2, 2500, 0.6),
+    TransactionCategory.OTHER_EXPENSE: (6, 80, 1.2),
+}
+
+# (weight, median amount, spread) of generated income that is not an invoice payment
+INCOME_PROFILES = {
+    TransactionCategory.PRODUCT_SALE: (10, 120, 0.9),
+    TransactionCategory.INTEREST: (2, 15, 0.8),
+    TransactionCategory.REFUND: (2, 60, 0.9),
+    TransactionCategory.OTHER_INCOME: (1, 200, 1.0),
+}
+
+INVOICE_STATUS_WEIGHTS = {
+    InvoiceStatus.PAID: 60,
+    InvoiceStatus.SENT: 12,
+    InvoiceStatus.VIEWED: 3,
+    InvoiceStatus.OVERDUE: 10,
+    InvoiceStatus.PARTIALLY_PAID: 5,
+    InvoiceStatus.DRAFT: 7,
+    InvoiceStatus.VOID: 2,
+    InvoiceStatus.UNCOLLECTIBLE: 1,
+}
+
+VENDORS = [
+    'Acme Supplies', 'Globex', 'Initech', 'Umbrella Hosting', 'Stark Hardware', 'Wayne Travel',
+    'Cyberdyne Cloud', 'Hooli Workspace', 'Vandelay Imports', 'Soylent Catering', 'Wonka Office',
+    'Tyrell Insurance', 'Oceanic Airlines', 'Monarch Legal', 'Pied Piper Software',
+]
+CLIENT_NAMES = [
+    'Northwind', 'Contoso', 'Fabrikam', 'Tailspin Toys', 'Adventure Works', 'Litware',
+    'Proseware', 'Wide World Importers', 'Blue Yonder', 'Coho Winery', 'Fourth Coffee',
+    'Lucerne Publishing', 'Margie Travel', 'Alpine Ski House', 'Trey Research',
+]
+WORK_ITEMS = [
+    'Consulting', 'Development', 'Design', 'Support retainer', 'Workshop', 'Code review',
+    'Project management', 'Hosting', 'Training', 'Audit',
+]
+
+class SeedService:
+    """Service for generating a synthetic ledger at production scale
+
+    Rows are generated lazily and written with batched Core inserts, one user
+    at a time, so memory stays flat no matter how many transactions are
+    requested. A fixed seed makes every run produce the same data set.
+    """
+
+    def __init__(self, seed=42, chunk_size=5000):
+        self.rng = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.rollup_service = RollupService()
+        self._password_hash = None
+
+    def seed(self, users=1, transactions=10000, invoices=500, years=3, progress=None):
+        """
+        Create users with clients, projects, invoices and transactions
+
+        Args:
+            users (int): Number of users to create
+            transactions (int): Transactions per user, excluding invoice payments
+            invoices (int): Invoices per user
+            years (int): How many years of history to spread the data over
+            progress (callable, optional): Called with (user_index, stats) after each user
+
+        Returns:
+            dict: Totals of the created rows, plus the created user IDs and emails
+        """
+        totals = {
+            'users': 0, 'clients': 0, 'projects': 0, 'invoices': 0,
+            'invoice_items': 0, 'transactions': 0, 'user_ids': [], 'emails': []
+        }
+        # Emails are unique per run; everything else only depends on the seed
+        run_id = uuid.uuid4().hex[:8]
+
+        for index in range(users):
+            stats = self.seed_user(
+                email=f'seed-{run_id}-{index}@example.com',
+                transactions=transactions,
+                invoices=invoices,
+                years=years
+            )
+            for key in ('clients', 'projects', 'invoices', 'invoice_items', 'transactions'):
+                totals[key] += stats[key]
+            totals['users'] += 1
+            totals['user_ids'].append(stats['user_id'])
+            totals['emails'].append(stats['email'])
+            if progress:
+                progress(index, stats)
+
+        return totals
+
+    def seed_user(self, email, transactions=10000, invoices=500, years=3):
+        """
+        Create one user with a full synthetic ledger, committing once done
+
+        Args:
+            email (str): Email of the new user (password: "password")
+            transactions (int): Transactions to create, excluding invoice payments
+            invoices (int): Invoices to create
+            years (int): Years of history
+
+        Returns:
+            dict: Counts of the created rows and the user ID
+        """
+        end = date.today()
+        start = end - timedelta(days=365 * years)
+
+        try:
+            user = User(
+                email=email,
+                first_name='Seed',
+                last_name=email.split('@')[0],
+                password_hash=self._get_password_hash()
+            )
+            db.session.add(user)
+            db.session.flush()
+
+            clients, projects = self._create_clients(user.id, start, end)
+            invoice_count, item_count, payments = self._create_invoices(
+                user.id, invoices, clients, projects, start, end
+            )
+
+            rows = self._iter_transactions(user.id, transactions, projects, start, end)
+            transaction_count = self._insert_chunked(Transaction, chain(payments, rows))
+
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f'Failed to seed user: {str(e)}')
+
+        self.rollup_service.rebuild(user_id=user.id)
+
+        return {
+            'user_id': user.id,
+            'email': email,
+            'clients': len(clients),
+            'projects': sum(len(p) for p in projects.values()),
+            'invoices': invoice_count,
+            'invoice_items': item_count,
+            'transactions': transaction_count
+        }
+
+    def _get_password_hash(self):
+        # Hashing is deliberately slow, so every seeded user shares one hash
+        if self._password_hash is None:
+            self._password_hash = generate_password_hash('password')
+        return self._password_hash
+
+    def _create_clients(self, user_id, start, end):
+        """Create 3-15 clients with 0-3 projects each"""
+        clients = []
+        for _ in range(self.rng.randint(3, 15)):
+            client = Client(
+                name=f'{self.rng.choice(CLIENT_NAMES)} {self.rng.randint(1, 999)}',
+                email=f'billing{self.rng.randint(1, 10 ** 6)}@example.com',
+                user_id=user_id
+            )
+            clients.append(client)
+        db.session.add_all(clients)
+        db.session.flush()
+
+        projects = {}
+        for client in clients:
+            projects[client.id] = []
+            for number in range(self.rng.choice([0, 1, 1, 2, 3])):
+                project_start = self._random_date(start, end)
+                project = Project(
+                    name=f'{client.name} project {number + 1}',
+                    start_date=project_start,
+                    hourly_rate=Decimal(self.rng.choice([60, 85, 100, 120, 150])),
+                    budget=Decimal(self.rng.randrange(5, 200) * 1000),
+                    client_id=client.id,
+                    user_id=user_id
+                )
+                db.session.add(project)
+                projects[client.id].append(project)
+        db.session.flush()
+
+        return [client.id for client in clients], {
+            client_id: [project.id for project in client_projects]
+            for client_id, client_projects in projects.items()
+        }
+
+    def _create_invoices(self, user_id, count, clients, projects, start, end):
+        """
+        Create invoices with items, their numbering sequences and payment rows
+
+        Returns:
+            tuple: (invoice_count, item_count, payment transaction rows)
+        """
+        statuses = list(INVOICE_STATUS_WEIGHTS)
+        weights = list(INVOICE_STATUS_WEIGHTS.values())
+        issue_dates = sorted(self._random_date(start, end) for _ in range(count))
+        sequences = {}
+        payments = []
+        item_count = 0
+        now = datetime.utcnow()
+
+        for offset in range(0, count, self.chunk_size):
+            invoice_rows, item_rows = [], []
+
+            for issue_date in issue_dates[offset:offset + self.chunk_size]:
+                period = f'{issue_date.year}{issue_date.month:02d}'
+                sequences[period] = sequences.get(period, 0) + 1
+
+                client_id = self.rng.choice(clients)
+                items = []
+                for _ in range(self.rng.randint(1, 5)):
+                    quantity = Decimal(self.rng.choice([1, 1, 2, 5, 10, 20, 40]))
+                    unit_price = Decimal(self.rng.choice([50, 85, 100, 120, 250, 500, 1200]))
+                    items.append({
+                        'description': self.rng.choice(WORK_ITEMS),
+                        'quantity': quantity,
+                        'unit_price': unit_price,
+                        'tax_rate': Decimal('0'),
+                        'amount': quantity * unit_price
+                    })
+
+                status = self.rng.choices(statuses, weights)[0]
+                tax_rate = Decimal(self.rng.choice([0, 0, 7, 19, 20]))
+                subtotal = sum(item['amount'] for item in items)
+                tax_amount = (subtotal * tax_rate / 100).quantize(Decimal('0.01'))
+                total = subtotal + tax_amount
+                if status == InvoiceStatus.PAID:
+                    paid = total
+                elif status == InvoiceStatus.PARTIALLY_PAID:
+                    paid = (total * Decimal(self.rng.choice([25, 50, 75])) / 100).quantize(Decimal('0.01'))
+                else:
+                    paid = Decimal('0')
+
+                invoice_rows.append({
+                    'invoice_number': f'INV-{period}-{sequences[period]:04d}',
+                    'issue_date': issue_date,
+                    'due_date': issue_date + timedelta(days=self.rng.choice([14, 30, 30, 45, 60])),
+                    'status': status,
+                    'tax_rate': tax_rate,
+                    'subtotal': subtotal,
+                    'tax_amount': tax_amount,
+                    'total': total,
+                    'amount_paid': paid,
+                    'amount_due': total - paid,
+                    'currency': 'USD',
+                    'created_at': now,
+                    'updated_at': now,
+                    'user_id': user_id,
+                    'client_id': client_id,
+                    'project_id': self.rng.choice(projects[client_id]) if projects[client_id] else None
+                })
+                item_rows.append(items)
+
+            invoice_ids = db.session.execute(
+                insert(Invoice).returning(Invoice.id, sort_by_parameter_order=True),
+                invoice_rows
+            ).scalars().all()
+
+            for invoice_id, invoice, items in zip(invoice_ids, invoice_rows, item_rows):
+                for item in items:
+                    item['invoice_id'] = invoice_id
+                item_count += len(items)
+
+                if invoice['amount_paid'] > 0:
+                    paid_on = min(invoice['issue_date'] + timedelta(days=self.rng.randint(0, 60)), end)
+                    payments.append(self._transaction_row(
+                        user_id, paid_on, invoice['amount_paid'], TransactionType.INCOME,
+                        TransactionCategory.SERVICE, f'Payment for invoice {invoice["invoice_number"]}',
+                        invoice['invoice_number'], project_id=invoice['project_id'], invoice_id=invoice_id
+                    ))
+
+            self._insert_chunked(InvoiceItem, (item for items in item_rows for item in items))
+
+        if sequences:
+            db.session.execute(insert(InvoiceSequence), [
+                {'user_id': user_id, 'period': period, 'last_value': value}
+                for period, value in sequences.items()
+            ])
+
+        return count, item_count, payments
+
+    def _iter_transactions(self, user_id, count, projects, start, end):
+        """Lazily generate expense and non-invoice income rows"""
+        expense = list(EXPENSE_PROFILES)
+        expense_weights = [profile[0] for profile in EXPENSE_PROFILES.values()]
+        income = list(INCOME_PROFILES)
+        income_weights = [profile[0] for profile in INCOME_PROFILES.values()]
+        project_ids = [project_id for ids in projects.values() for project_id in ids]
+        span = (end - start).days
+
+        for number in range(count):
+            if self.rng.random() < 0.2:
+                type_ = TransactionType.INCOME
+                category = self.rng.choices(income, income_weights)[0]
+                _, median, spread = INCOME_PROFILES[category]
+            else:
+                type_ = TransactionType.EXPENSE
+                category = self.rng.choices(expense, expense_weights)[0]
+                _, median, spread = EXPENSE_PROFILES[category]
+
+            # Activity grows over time: later days are more likely
+            day = start + timedelta(days=int(span * math.sqrt(self.rng.random())))
+            amount = Decimal(str(round(self.rng.lognormvariate(math.log(median), spread), 2))) or Decimal('0.01')
+
+            yield self._transaction_row(
+                user_id, day, amount, type_, category,
+                f'{self.rng.choice(VENDORS)} {category.value.replace("_", " ")}',
+                f'TX-{number:08d}' if self.rng.random() < 0.3 else None,
+                project_id=self.rng.choice(project_ids) if project_ids and self.rng.random() < 0.15 else None,
+                is_reconciled=self.rng.random() < 0.8
+            )
+
+    @staticmethod
+    def _transaction_row(user_id, day, amount, type_, category, description, reference,
+                         project_id=None, invoice_id=None, is_reconciled=True):
+        now = datetime.utcnow()
+        return {
+            'date': day,
+            'amount': amount,
+            'type': type_,
+            'category': category,
+            'description': description,
+            'reference': reference,
+            'is_reconciled': is_reconciled,
+            'project_id': project_id,
+            'invoice_id': invoice_id,
+            'user_id': user_id,
+            'created_at': now,
+            'updated_at': now
+        }
+
+    def _insert_chunked(self, model, rows):
+        """Insert an iterable of rows with executemany in chunks, returning the row count"""
+        count = 0
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                db.session.execute(insert(model.__table__), chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            db.session.execute(insert(model.__table__), chunk)
+            count += len(chunk)
+        return count
+
+    def _random_date(self, start, end):
+        return start + timedelta(days=self.rng.randrange((end - start).days + 1))
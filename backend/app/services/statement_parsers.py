@@ -0,0 +1,295 @@
+"""
+Streaming parsers for bank statement exports.
+
+Every parser reads a binary file object incrementally and yields one
+``StatementRecord`` per booked entry, so memory use does not depend on the
+size of the export. Supported formats are CSV, OFX (SGML 1.x and XML 2.x)
+and ISO 20022 CAMT.053.
+"""
+import codecs
+import csv
+import io
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+SUPPORTED_FORMATS = ('csv', 'ofx', 'camt053')
+
+class StatementRecord:
+    """A single booked entry of a bank statement"""
+
+    __slots__ = ('line', 'date', 'amount', 'currency', 'description', 'reference', 'external_id', 'raw')
+
+    def __init__(self, line, date, amount, currency=None, description=None, reference=None, external_id=None,
+                 raw=''):
+        self.line = line                # 1-based position of the entry in the file
+        self.date = date                # datetime.date
+        self.amount = amount            # Signed Decimal, negative for debits
+        self.currency = currency        # ISO 4217 code as given by the file, None if it has none
+        self.description = description
+        self.reference = reference
+        self.external_id = external_id  # Bank-assigned unique ID, when the format has one
+        self.raw = raw                  # Source content the dedup hash is derived from
+
+class StatementParseError(ValueError):
+    """Raised for an entry that cannot be parsed; carries the entry's line"""
+
+    def __init__(self, line, message):
+        super().__init__(message)
+        self.line = line
+
+def detect_format(filename):
+    """
+    Guess the statement format from a file name
+
+    Args:
+        filename (str): Uploaded file name
+
+    Returns:
+        str: One of SUPPORTED_FORMATS, or None if unknown
+    """
+    name = (filename or '').lower()
+    if name.endswith('.csv') or name.endswith('.txt'):
+        return 'csv'
+    if name.endswith('.ofx') or name.endswith('.qfx'):
+        return 'ofx'
+    if name.endswith('.xml') or name.endswith('.053') or 'camt' in name:
+        return 'camt053'
+    return None
+
+def parse_statement(stream, format, **options):
+    """
+    Parse a statement file lazily
+
+    Args:
+        stream (file): Binary file object
+        format (str): One of SUPPORTED_FORMATS
+        **options: Format-specific options (see the individual parsers)
+
+    Yields:
+        StatementRecord or StatementParseError for entries that failed to parse
+    """
+    parsers = {
+        'csv': parse_csv,
+        'ofx': parse_ofx,
+        'camt053': parse_camt053
+    }
+    if format not in parsers:
+        raise ValueError(f'Unsupported statement format: {format}')
+    return parsers[format](stream, **options)
+
+def _parse_amount(value):
+    value = (value or '').strip().replace(' ', '').replace('\u00a0', '')
+    # Accept both 1,234.56 and 1.234,56
+    if ',' in value and '.' in value:
+        if value.rfind(',') > value.rfind('.'):
+            value = value.replace('.', '').replace(',', '.')
+        else:
+            value = value.replace(',', '')
+    elif ',' in value:
+        value = value.replace(',', '.')
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f'Invalid amount: {value}')
+    if not amount.is_finite():
+        raise ValueError(f'Invalid amount: {value}')
+    return amount
+
+def parse_csv(stream, date_format='%Y-%m-%d', delimiter=',', encoding='utf-8-sig',
+              date_column='date', amount_column='amount', description_column='description',
+              reference_column='reference', currency_column='currency', **_):
+    """
+    Parse a CSV export with a header row
+
+    Args:
+        stream (file): Binary file object
+        date_format (str): strptime format of the date column
+        delimiter (str): Field delimiter
+        encoding (str): Text encoding of the file
+        *_column (str): Header names of the mapped columns
+
+    Yields:
+        StatementRecord or StatementParseError
+    """
+    text = io.TextIOWrapper(stream, encoding=encoding, newline='')
+    try:
+        yield from _iter_csv(text, delimiter, date_format, date_column, amount_column,
+                             description_column, reference_column, currency_column)
+    finally:
+        # Detach so the wrapper does not close the caller's stream when collected
+        text.detach()
+
+def _iter_csv(text, delimiter, date_format, date_column, amount_column,
+              description_column, reference_column, currency_column):
+    reader = csv.reader(text, delimiter=delimiter)
+
+    try:
+        header = [name.strip().lower() for name in next(reader)]
+    except StopIteration:
+        return
+
+    def column(name, required=True):
+        name = (name or '').lower()
+        if name in header:
+            return header.index(name)
+        if required:
+            raise ValueError(f'CSV is missing the "{name}" column')
+        return None
+
+    date_idx = column(date_column)
+    amount_idx = column(amount_column)
+    description_idx = column(description_column, required=False)
+    reference_idx = column(reference_column, required=False)
+    currency_idx = column(currency_column, required=False)
+
+    for row in reader:
+        line = reader.line_num
+        if not any(field.strip() for field in row):
+            continue
+        try:
+            yield StatementRecord(
+                line=line,
+                date=datetime.strptime(row[date_idx].strip(), date_format).date(),
+                amount=_parse_amount(row[amount_idx]),
+                currency=(row[currency_idx].strip() or None) if currency_idx is not None else None,
+                description=row[description_idx].strip() if description_idx is not None else None,
+                reference=row[reference_idx].strip() if reference_idx is not None else None,
+                raw=delimiter.join(field.strip() for field in row)
+            )
+        except (ValueError, IndexError) as e:
+            yield StatementParseError(line, str(e))
+
+_OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+def _iter_ofx_tags(stream, encoding, chunk_size=64 * 1024):
+    """Yield (closing, tag, value) tuples from an OFX stream, chunk by chunk"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    buffer = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += decoder.decode(chunk or b'', final=not chunk)
+        # Keep the last (possibly incomplete) tag in the buffer
+        cut = max(buffer.rfind('<'), 0) if chunk else len(buffer)
+        for match in _OFX_TAG.finditer(buffer, 0, cut):
+            yield match.group(1) == '/', match.group(2).upper(), match.group(3).strip()
+        buffer = buffer[cut:]
+        if not chunk:
+            return
+
+def parse_ofx(stream, encoding='latin-1', **_):
+    """
+    Parse an OFX/QFX statement (SGML or XML flavour)
+
+    Entries are in the statement's default currency (CURDEF).
+
+    Args:
+        stream (file): Binary file object
+        encoding (str): Text encoding of the file
+
+    Yields:
+        StatementRecord or StatementParseError
+    """
+    entry = None
+    index = 0
+    currency = None
+
+    for closing, tag, value in _iter_ofx_tags(stream, encoding):
+        if tag == 'CURDEF' and not closing:
+            currency = value or None
+        elif tag == 'STMTTRN' and not closing:
+            entry = {}
+            index += 1
+        elif tag == 'STMTTRN' and closing and entry is not None:
+            try:
+                yield StatementRecord(
+                    line=index,
+                    date=datetime.strptime(entry.get('DTPOSTED', '')[:8], '%Y%m%d').date(),
+                    amount=_parse_amount(entry.get('TRNAMT')),
+                    currency=currency,
+                    description=entry.get('NAME') or entry.get('MEMO'),
+                    reference=entry.get('CHECKNUM') or entry.get('REFNUM'),
+                    external_id=entry.get('FITID'),
+                    raw='|'.join(f'{k}={v}' for k, v in sorted(entry.items()))
+                )
+            except ValueError as e:
+                yield StatementParseError(index, str(e))
+            entry = None
+        elif entry is not None and not closing and value:
+            entry[tag] = value
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _find(element, path):
+    """Namespace-agnostic find of a '/'-separated path of local names"""
+    for name in path.split('/'):
+        if element is None:
+            return None
+        element = next((child for child in element if _local(child.tag) == name), None)
+    return element
+
+def _text(element, path):
+    found = _find(element, path)
+    return found.text.strip() if found is not None and found.text else None
+
+def parse_camt053(stream, **_):
+    """
+    Parse an ISO 20022 CAMT.053 bank-to-customer statement
+
+    Entries are processed as soon as their closing tag is read and then
+    cleared, so memory stays bounded for multi-year statements.
+
+    Args:
+        stream (file): Binary file object
+
+    Yields:
+        StatementRecord or StatementParseError
+    """
+    index = 0
+    stack = []
+
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            stack.append(element)
+            continue
+
+        stack.pop()
+        if _local(element.tag) != 'Ntry':
+            continue
+
+        index += 1
+        try:
+            amount_element = _find(element, 'Amt')
+            amount = _parse_amount(_text(element, 'Amt'))
+            if _text(element, 'CdtDbtInd') == 'DBIT':
+                amount = -amount
+            booked = _text(element, 'BookgDt/Dt') or _text(element, 'BookgDt/DtTm') \
+                or _text(element, 'ValDt/Dt') or ''
+            description = _text(element, 'NtryDtls/TxDtls/RmtInf/Ustrd') \
+                or _text(element, 'AddtlNtryInf')
+            reference = _text(element, 'NtryDtls/TxDtls/Refs/EndToEndId') \
+                or _text(element, 'NtryRef')
+
+            yield StatementRecord(
+                line=index,
+                date=datetime.strptime(booked[:10], '%Y-%m-%d').date(),
+                amount=amount,
+                currency=amount_element.get('Ccy') if amount_element is not None else None,
+                description=description,
+                reference=reference,
+                external_id=_text(element, 'AcctSvcrRef') or _text(element, 'NtryRef'),
+                raw=ET.tostring(element, encoding='unicode')
+            )
+        except ValueError as e:
+            yield StatementParseError(index, str(e))
+
+        # Free the processed entry (and already-processed siblings)
+        element.clear()
+        if stack:
+            parent = stack[-1]
+            for child in list(parent):
+                if child is element:
+                    parent.remove(child)
+                    break
@@ -0,0 +1,163 @@
+"""
+Delta sync of a user's transactions, invoices and clients.
+
+A sync token holds one keyset cursor per entity, on (updated_at, id), and
+one on the (deleted_at, id) of the user's tombstones. A sync returns the
+rows past each cursor in that order, so it reads only what changed since
+the token through the ix_*_user_updated_id indexes, and its cost follows
+the number of changes rather than the size of the ledger.
+
+Timestamps come from the application servers and a row's is taken before
+its transaction commits, so a row can become visible with an updated_at a
+little older than changes already synced. Once an entity is fully synced,
+its cursor is therefore set back SYNC_OVERLAP_SECONDS from the start of the
+sync: later syncs may resend rows changed in that window, and clients apply
+changes as idempotent upserts and deletes by id.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import tuple_
+
+from app import db
+from app.models import Client, Invoice, Transaction, Tombstone
+from app.models.read_models import ClientRow, InvoiceRow, TransactionRow
+from app.utils.pagination import encode_cursor, decode_cursor
+
+class SyncTokenExpiredError(ValueError):
+    """A sync token predates the tombstones still kept"""
+
+    def __init__(self):
+        super().__init__('Sync token expired; start over with a full sync')
+
+class SyncService:
+    """Service for incremental sync of a user's records"""
+
+    # Response key, model and read model of each synced entity
+    ENTITIES = [
+        ('transactions', Transaction, TransactionRow),
+        ('invoices', Invoice, InvoiceRow),
+        ('clients', Client, ClientRow),
+    ]
+
+    MAX_PAGE_SIZE = 5000
+
+    def __init__(self, overlap_seconds=5, retention_days=90):
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.retention = timedelta(days=retention_days)
+
+    def _token_columns(self):
+        columns = []
+        for _, model, _ in self.ENTITIES:
+            columns += [model.updated_at, model.id]
+        return columns + [Tombstone.deleted_at, Tombstone.id]
+
+    def decode_token(self, token):
+        """
+        Decode a sync token into its cursors
+
+        Args:
+            token (str): Token returned by a previous sync
+
+        Returns:
+            dict: (timestamp, id) cursor per entity name and for 'deleted'
+
+        Raises:
+            ValueError: If the token is malformed
+        """
+        values = decode_cursor(token, self._token_columns())
+        names = [name for name, _, _ in self.ENTITIES] + ['deleted']
+        return {name: (values[2 * i], values[2 * i + 1]) for i, name in enumerate(names)}
+
+    def encode_token(self, cursors):
+        """Encode cursors from decode_token() or changes() into a sync token"""
+        names = [name for name, _, _ in self.ENTITIES] + ['deleted']
+        return encode_cursor([value for name in names for value in cursors[name]])
+
+    def changes(self, user_id, token=None, limit=500):
+        """
+        Get the changes to a user's records since a sync token
+
+        Without a token every record is returned, which is the initial full
+        sync. Each entity returns at most ``limit`` rows; when any has more,
+        ``has_more`` is set and the next token continues where this page
+        stopped.
+
+        Args:
+            user_id (int): ID of the user
+            token (str, optional): Token returned by the previous sync
+            limit (int): Rows per entity and of deletions, up to MAX_PAGE_SIZE
+
+        Returns:
+            dict: Changed rows per entity, deleted ids per entity, the next
+                token and has_more
+
+        Raises:
+            SyncTokenExpiredError: If the token is older than the tombstones kept
+            ValueError: If the token is malformed
+        """
+        limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+        started_at = datetime.utcnow()
+        horizon = (started_at - self.overlap, 0)
+
+        if token:
+            cursors = self.decode_token(token)
+            deleted_since = cursors['deleted'][0]
+            if deleted_since is None or deleted_since < started_at - self.retention:
+                raise SyncTokenExpiredError()
+        else:
+            # A full sync has nothing to delete that happened before it
+            cursors = {name: (None, None) for name, _, _ in self.ENTITIES}
+            cursors['deleted'] = horizon
+
+        result = {'deleted': {}}
+        next_cursors = {}
+        has_more = False
+
+        for name, model, read_model in self.ENTITIES:
+            query = model.query.filter(model.user_id == user_id)
+            updated_at, row_id = cursors[name]
+            if updated_at is not None:
+                query = query.filter(tuple_(model.updated_at, model.id) > tuple_(updated_at, row_id))
+            rows = read_model.select(query).order_by(model.updated_at, model.id).limit(limit + 1).all()
+
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursors[name] = (rows[-1].updated_at, rows[-1].id)
+                has_more = True
+            else:
+                next_cursors[name] = horizon
+            result[name] = [row.to_dict() for row in read_model.from_rows(rows)]
+            result['deleted'][name] = []
+
+        tombstones = db.session.query(Tombstone.id, Tombstone.entity, Tombstone.entity_id, Tombstone.deleted_at)\
+                               .filter(Tombstone.user_id == user_id,
+                                       tuple_(Tombstone.deleted_at, Tombstone.id) > tuple_(*cursors['deleted']))\
+                               .order_by(Tombstone.deleted_at, Tombstone.id)\
+                               .limit(limit + 1).all()
+        if len(tombstones) > limit:
+            tombstones = tombstones[:limit]
+            next_cursors['deleted'] = (tombstones[-1].deleted_at, tombstones[-1].id)
+            has_more = True
+        else:
+            next_cursors['deleted'] = horizon
+        for tombstone in tombstones:
+            result['deleted'][tombstone.entity.value].append(tombstone.entity_id)
+
+        result['next_token'] = self.encode_token(next_cursors)
+        result['has_more'] = has_more
+        return result
+
+    def prune_tombstones(self, older_than=None):
+        """
+        Delete tombstones past the retention period
+
+        Args:
+            older_than (datetime, optional): Cutoff, default now minus the retention
+
+        Returns:
+            int: Number of tombstones deleted
+        """
+        cutoff = older_than or datetime.utcnow() - self.retention
+        deleted = Tombstone.query.filter(Tombstone.deleted_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
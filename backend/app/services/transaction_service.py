@@ -1,12 +1,25 @@
 from datetime import datetime
-from decimal import Decimal
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
 
 from app import db
-from app.models import Transaction, TransactionType, TransactionCategory
+from app.models import Transaction, TransactionType, TransactionCategory, Tombstone, SyncEntity
+from app.services.fx_service import fx_rates
+from app.services.ledger_service import LedgerService
+from app.services.period_service import PeriodClosedError, PeriodService
+from app.services.report_service import ReportService
+from app.services.rollup_service import RollupService
+from app.utils.money import Money, cents, normalize_currency
 
 class TransactionService:
     """Service for handling transaction business logic"""
     
+    def __init__(self):
+        self.rollup_service = RollupService()
+        self.ledger_service = LedgerService()
+        self.period_service = PeriodService()
+    
     def create_transaction(self, user_id, **data):
         """
         Create a new transaction
@@ -16,6 +29,7 @@ class TransactionService:
             **data: Transaction data
                 - date (str): Transaction date in YYYY-MM-DD format
                 - amount (float): Transaction amount
+                - currency (str, optional): ISO 4217 code of the amount, default USD
                 - type (str): Transaction type (income/expense/transfer)
                 - category (str): Transaction category
                 - description (str, optional): Transaction description
@@ -29,40 +43,16 @@ class TransactionService:
             Transaction: The created transaction
             
         Raises:
-            ValueError: If required fields are missing or invalid
+            ValueError: If required fields are missing or invalid, or the
+                date falls in a closed fiscal period
         """
-        # Validate required fields
-        required_fields = ['date', 'amount', 'type', 'category']
-        for field in required_fields:
-            if field not in data:
-                raise ValueError(f'Missing required field: {field}')
-        
         try:
-            # Convert and validate transaction type
-            transaction_type = TransactionType(data['type'])
-            
-            # Convert and validate category
-            category = TransactionCategory(data['category'])
-            
-            # Convert date string to date object
-            date = datetime.strptime(data['date'], '%Y-%m-%d').date()
-            
-            # Create transaction
-            transaction = Transaction(
-                date=date,
-                amount=data['amount'],
-                type=transaction_type,
-                category=category,
-                description=data.get('description'),
-                reference=data.get('reference'),
-                is_reconciled=bool(data.get('is_reconciled', False)),
-                receipt_url=data.get('receipt_url'),
-                project_id=data.get('project_id'),
-                invoice_id=data.get('invoice_id'),
-                user_id=user_id
-            )
+            transaction = Transaction(**self._parse_transaction_data(user_id, data))
+            self.period_service.check_open(user_id, transaction.date)
             
             db.session.add(transaction)
+            self.rollup_service.add(transaction)
+            self.ledger_service.bump_version(user_id)
             db.session.commit()
             
             return transaction
@@ -74,6 +64,118 @@ class TransactionService:
             db.session.rollback()
             raise Exception(f'Failed to create transaction: {str(e)}')
     
+    def bulk_create_transactions(self, user_id, rows, chunk_size=500):
+        """
+        Create many transactions with one batched multi-row INSERT per chunk
+        
+        Invalid rows are reported and skipped; valid rows are still inserted.
+        Each chunk runs in its own savepoint, so a database error only rejects
+        the rows of that chunk. Rollups and the ledger version are updated in
+        the same database transaction, which is committed once.
+        
+        Args:
+            user_id (int): ID of the user creating the transactions
+            rows (list): Transaction data dicts, as accepted by create_transaction
+            chunk_size (int): Maximum number of rows per INSERT statement
+            
+        Returns:
+            tuple: (created_count, errors) where errors is a list of
+                {'index': int, 'message': str} for rejected rows
+        """
+        errors = []
+        valid = []
+        closed = self.period_service.closed_range(user_id)
+        
+        for index, data in enumerate(rows):
+            try:
+                if not isinstance(data, dict):
+                    raise ValueError('Transaction must be an object')
+                values = self._parse_transaction_data(user_id, data)
+                if self.period_service.is_closed(closed, values['date']):
+                    raise PeriodClosedError(values['date'])
+                valid.append((index, values))
+            except ValueError as e:
+                errors.append({'index': index, 'message': f'Invalid data: {str(e)}'})
+        
+        created = 0
+        table = Transaction.__table__
+        
+        try:
+            for start in range(0, len(valid), chunk_size):
+                chunk = valid[start:start + chunk_size]
+                values = [row for _, row in chunk]
+                now = datetime.utcnow()
+                for row in values:
+                    row['created_at'] = row['updated_at'] = now
+                
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(
+                            insert(table).execution_options(insertmanyvalues_page_size=chunk_size),
+                            values
+                        )
+                        self.rollup_service.add_many(values)
+                    created += len(values)
+                except SQLAlchemyError as e:
+                    errors.extend(
+                        {'index': index, 'message': f'Failed to create transaction: {str(e.orig or e)}'}
+                        for index, _ in chunk
+                    )
+            
+            if created:
+                self.ledger_service.bump_version(user_id)
+            db.session.commit()
+            
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f'Failed to create transactions: {str(e)}')
+        
+        errors.sort(key=lambda error: error['index'])
+        return created, errors
+    
+    def _parse_transaction_data(self, user_id, data):
+        """
+        Validate transaction data and convert it to column values
+        
+        Args:
+            user_id (int): ID of the owning user
+            data (dict): Transaction data, see create_transaction
+            
+        Returns:
+            dict: Column values for a Transaction
+            
+        Raises:
+            ValueError: If required fields are missing or invalid
+        """
+        # Validate required fields
+        required_fields = ['date', 'amount', 'type', 'category']
+        for field in required_fields:
+            if field not in data:
+                raise ValueError(f'Missing required field: {field}')
+        
+        return {
+            # Convert and validate transaction type
+            'type': TransactionType(data['type']),
+            # Convert and validate category
+            'category': TransactionCategory(data['category']),
+            # Convert date string to date object
+            'date': datetime.strptime(data['date'], '%Y-%m-%d').date(),
+            'amount': self._parse_amount(data['amount']),
+            'currency': normalize_currency(data.get('currency')),
+            'description': data.get('description'),
+            'reference': data.get('reference'),
+            'is_reconciled': bool(data.get('is_reconciled', False)),
+            'receipt_url': data.get('receipt_url'),
+            'project_id': data.get('project_id'),
+            'invoice_id': data.get('invoice_id'),
+            'user_id': user_id
+        }
+    
+    @staticmethod
+    def _parse_amount(amount):
+        """Convert an amount to a Decimal in whole cents, raising ValueError if it is not finite"""
+        return Money.of(amount).to_decimal()
+    
     def update_transaction(self, transaction, **data):
         """
         Update an existing transaction
@@ -83,6 +185,7 @@ class TransactionService:
             **data: Fields to update
                 - date (str, optional): Transaction date in YYYY-MM-DD format
                 - amount (float, optional): Transaction amount
+                - currency (str, optional): ISO 4217 code of the amount
                 - type (str, optional): Transaction type (income/expense/transfer)
                 - category (str, optional): Transaction category
                 - description (str, optional): Transaction description
@@ -96,14 +199,21 @@ class TransactionService:
             Transaction: The updated transaction
             
         Raises:
-            ValueError: If provided data is invalid
+            ValueError: If provided data is invalid, or the old or new date
+                falls in a closed fiscal period
         """
         try:
+            previous_bucket = self.rollup_service.bucket_for(transaction)
+            
             if 'date' in data:
                 transaction.date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+            self.period_service.check_open(transaction.user_id, previous_bucket[1], transaction.date)
                 
             if 'amount' in data:
-                transaction.amount = data['amount']
+                transaction.amount = self._parse_amount(data['amount'])
+                
+            if 'currency' in data:
+                transaction.currency = normalize_currency(data['currency'])
                 
             if 'type' in data:
                 transaction.type = TransactionType(data['type'])
@@ -121,6 +231,8 @@ class TransactionService:
                 if field in data:
                     setattr(transaction, field, data[field])
             
+            self.rollup_service.move(previous_bucket, transaction)
+            self.ledger_service.bump_version(transaction.user_id)
             db.session.commit()
             return transaction
             
@@ -143,7 +255,8 @@ class TransactionService:
             bool: True if deletion was successful
             
         Raises:
-            ValueError: If transaction not found or not owned by user
+            ValueError: If transaction not found or not owned by user, or its
+                date falls in a closed fiscal period
         """
         transaction = Transaction.query.filter_by(
             id=transaction_id,
@@ -153,26 +266,40 @@ class TransactionService:
         if not transaction:
             raise ValueError('Transaction not found or access denied')
         
+        self.period_service.check_open(user_id, transaction.date)
+        
         try:
+            self.rollup_service.remove(transaction)
             db.session.delete(transaction)
+            db.session.add(Tombstone(user_id=user_id, entity=SyncEntity.TRANSACTION, entity_id=transaction.id))
+            self.ledger_service.bump_version(user_id)
             db.session.commit()
             return True
         except Exception as e:
             db.session.rollback()
             raise Exception(f'Failed to delete transaction: {str(e)}')
     
-    def get_transaction_summary(self, user_id, start_date=None, end_date=None):
+    def get_transaction_summary(self, user_id, start_date=None, end_date=None, currency=None):
         """
         Get transaction summary for a user within a date range
         
+        Amounts in other currencies than the reporting currency need a rate
+        per transaction day, so such ledgers are summarised by the report
+        engine instead of a GROUP BY.
+        
         Args:
             user_id (int): ID of the user
             start_date (date, optional): Start date of the period
             end_date (date, optional): End date of the period
+            currency (str, optional): Reporting currency, default REPORTING_CURRENCY
             
         Returns:
-            dict: Summary of transactions
+            dict: Totals by type and category, summed exactly in cents
+            
+        Raises:
+            ValueError: If the currency is invalid or an exchange rate is missing
         """
+        currency = fx_rates.reporting_currency(currency)
         query = Transaction.query.filter_by(user_id=user_id)
         
         if start_date:
@@ -180,50 +307,39 @@ class TransactionService:
         if end_date:
             query = query.filter(Transaction.date <= end_date)
         
-        # Group by type and category
+        # Group by type and category, summing whole cents
         results = query.with_entities(
             Transaction.type,
             Transaction.category,
-            db.func.sum(Transaction.amount).label('total_amount')
-        ).group_by(Transaction.type, Transaction.category).all()
-        
-        # Format results
-        summary = {
-            'total_income': Decimal('0'),
-            'total_expenses': Decimal('0'),
-            'by_category': {},
-            'by_type': {}
-        }
+            Transaction.currency,
+            db.func.sum(cents(Transaction.amount)).label('total_cents')
+        ).group_by(Transaction.type, Transaction.category, Transaction.currency).all()
         
-        for type_, category, amount in results:
-            amount = amount or Decimal('0')
-            
-            # Update type totals
-            if type_ not in summary['by_type']:
-                summary['by_type'][type_] = Decimal('0')
-            summary['by_type'][type_] += amount
-            
-            # Update category totals
-            if category not in summary['by_category']:
-                summary['by_category'][category] = Decimal('0')
-            summary['by_category'][category] += amount
-            
-            # Update overall totals
-            if type_ == TransactionType.INCOME:
-                summary['total_income'] += amount
-            else:
-                summary['total_expenses'] += amount
+        if any(row.currency != currency for row in results):
+            return ReportService().transaction_summary(user_id, start_date, end_date, currency)
         
-        summary['net_income'] = summary['total_income'] - summary['total_expenses']
+        total_income = 0
+        total_expenses = 0
+        by_type = {}
+        by_category = {}
         
-        # Convert Decimal to float for JSON serialization
-        for key in ['total_income', 'total_expenses', 'net_income']:
-            summary[key] = float(summary[key])
+        for type_, category, _, amount in results:
+            amount = int(amount or 0)
+            type_, category = TransactionType(type_), TransactionCategory(category)
             
-        for key in summary['by_type']:
-            summary['by_type'][key] = float(summary['by_type'][key])
+            by_type[type_.value] = by_type.get(type_.value, 0) + amount
+            by_category[category.value] = by_category.get(category.value, 0) + amount
             
-        for key in summary['by_category']:
-            summary['by_category'][key] = float(summary['by_category'][key])
+            if type_ == TransactionType.INCOME:
+                total_income += amount
+            else:
+                total_expenses += amount
         
-        return summary
+        return {
+            'total_income': Money(total_income).to_json(),
+            'total_expenses': Money(total_expenses).to_json(),
+            'net_income': Money(total_income - total_expenses).to_json(),
+            'by_type': {key: Money(value).to_json() for key, value in by_type.items()},
+            'by_category': {key: Money(value).to_json() for key, value in by_category.items()},
+            'currency': currency
+        }
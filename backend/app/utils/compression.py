@@ -0,0 +1,148 @@
+"""
+Response compression.
+
+Responses of a text type are compressed with the best encoding the
+client's Accept-Encoding allows, among COMPRESS_ALGORITHMS in order of
+preference: brotli when the brotli package is installed, then gzip from
+the standard library. Buffered responses are only compressed from
+COMPRESS_MIN_SIZE bytes, below which the headers outweigh the saving.
+Streamed responses (exports) are compressed chunk by chunk, each chunk
+flushed so the client still receives rows as they are read.
+
+Compression runs after the report cache, which keeps storing the
+uncompressed body, so one cache entry serves every encoding. A strong
+ETag gets the content coding appended when the body is compressed.
+"""
+import gzip
+import zlib
+
+from flask import request
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'text/csv',
+    'text/html',
+    'text/plain'
+}
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data):
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def stream(self, chunks):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+class BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, quality=4):
+        import brotli
+        self._brotli = brotli
+        self.quality = quality
+
+    def compress(self, data):
+        return self._brotli.compress(data, quality=self.quality)
+
+    def stream(self, chunks):
+        compressor = self._brotli.Compressor(quality=self.quality)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+def _encode_chunks(chunks):
+    for chunk in chunks:
+        yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+class ResponseCompressor:
+    """Negotiates and applies Content-Encoding for every response"""
+
+    def __init__(self):
+        self.encoders = {}
+        self.min_size = 1024
+
+    def init_app(self, app):
+        """
+        Configure the encoders and register the after_request hook
+
+        Config:
+            COMPRESS_ALGORITHMS: Comma-separated encodings in order of
+                preference, from 'br' and 'gzip'; empty disables compression
+            COMPRESS_MIN_SIZE: Smallest buffered body compressed, in bytes
+            COMPRESS_GZIP_LEVEL: gzip level, 1-9
+            COMPRESS_BROTLI_QUALITY: brotli quality, 0-11
+
+        Raises:
+            ValueError: If an encoding is unknown
+        """
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+        self.encoders = {}
+        for name in app.config.get('COMPRESS_ALGORITHMS', 'br,gzip').split(','):
+            name = name.strip().lower()
+            if not name:
+                continue
+            if name == 'gzip':
+                self.encoders[name] = GzipEncoder(app.config.get('COMPRESS_GZIP_LEVEL', 6))
+            elif name == 'br':
+                try:
+                    self.encoders[name] = BrotliEncoder(app.config.get('COMPRESS_BROTLI_QUALITY', 4))
+                except ImportError:
+                    app.logger.info('brotli is not installed; responses will not be brotli-compressed')
+            else:
+                raise ValueError(f'Invalid compression algorithm: {name}. Use br or gzip')
+
+        app.extensions['compression'] = self
+        app.after_request(self.compress)
+
+    def compress(self, response):
+        """after_request hook: compress the response if the client accepts an encoding"""
+        if not self.encoders or 'Content-Encoding' in response.headers:
+            return response
+        if response.status_code == 304 and 'ETag' in response.headers:
+            # Revalidations answer for the same representations as the 200
+            response.vary.add('Accept-Encoding')
+            return response
+        if not 200 <= response.status_code < 300 or response.status_code in (204, 206):
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES or response.direct_passthrough:
+            return response
+
+        # The body depends on Accept-Encoding whether or not this one is compressed
+        response.vary.add('Accept-Encoding')
+
+        if not response.is_streamed:
+            length = response.calculate_content_length()
+            if length is not None and length < self.min_size:
+                return response
+
+        name = request.accept_encodings.best_match(list(self.encoders))
+        if name is None:
+            return response
+        encoder = self.encoders[name]
+
+        if response.is_streamed:
+            response.response = encoder.stream(_encode_chunks(response.response))
+            response.headers.pop('Content-Length', None)
+        else:
+            response.set_data(encoder.compress(response.get_data()))
+        response.headers['Content-Encoding'] = name
+
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # A strong tag names exact bytes, and the encoded body is different ones
+            response.set_etag(f'{etag}-{name}')
+        return response
+
+compression = ResponseCompressor()
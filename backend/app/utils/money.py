@@ -0,0 +1,167 @@
+"""
+Money as integer minor units.
+
+Amounts are stored in NUMERIC(..., 2) columns, but are parsed, summed and
+serialized as Money: a whole number of cents plus an ISO 4217 currency
+code. Integer sums are exact and cheap in Python, in SQL (see ``cents()``;
+SQLite would otherwise sum NUMERIC columns as binary floats) and in NumPy
+int64 arrays, so no aggregate ever passes through float.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import total_ordering
+
+from sqlalchemy import BigInteger, cast, func
+
+DEFAULT_CURRENCY = 'USD'
+
+@total_ordering
+class Money:
+    """An exact amount of cents in one currency"""
+    
+    __slots__ = ('cents', 'currency')
+    
+    def __init__(self, cents=0, currency=DEFAULT_CURRENCY):
+        self.cents = int(cents)
+        self.currency = currency or DEFAULT_CURRENCY
+    
+    @classmethod
+    def of(cls, value, currency=DEFAULT_CURRENCY):
+        """
+        Convert an amount to Money, rounding half up to whole cents
+        
+        Args:
+            value (Decimal|int|float|str|Money): Amount in major units
+            currency (str): Currency code, ignored when value is Money
+            
+        Returns:
+            Money: The amount
+            
+        Raises:
+            ValueError: If the value is not a finite number
+        """
+        if isinstance(value, Money):
+            return value
+        try:
+            amount = value if isinstance(value, Decimal) else Decimal(str(value))
+        except (InvalidOperation, TypeError, ValueError):
+            raise ValueError(f'Invalid amount: {value}')
+        if not amount.is_finite():
+            raise ValueError(f'Invalid amount: {value}')
+        return cls(int(amount.scaleb(2).to_integral_value(ROUND_HALF_UP)), currency)
+    
+    @classmethod
+    def sum(cls, values, currency=DEFAULT_CURRENCY):
+        """Exact sum of amounts accepted by of(), as Money in the given currency"""
+        total = 0
+        for value in values:
+            money = cls.of(value, currency)
+            if money.currency != currency:
+                raise ValueError(f'Cannot combine {currency} and {money.currency} amounts')
+            total += money.cents
+        return cls(total, currency)
+    
+    def to_decimal(self):
+        """The amount as a Decimal with exactly two places"""
+        return Decimal(self.cents).scaleb(-2)
+    
+    def to_json(self):
+        """The amount as a JSON number, as served by the API"""
+        return self.cents / 100
+    
+    def __float__(self):
+        return self.cents / 100
+    
+    def __str__(self):
+        return str(self.to_decimal())
+    
+    def __repr__(self):
+        return f'Money({self}, {self.currency!r})'
+    
+    def _check(self, other):
+        if other.currency != self.currency:
+            raise ValueError(f'Cannot combine {self.currency} and {other.currency} amounts')
+    
+    def __add__(self, other):
+        if isinstance(other, Money):
+            self._check(other)
+            return Money(self.cents + other.cents, self.currency)
+        # Lets sum() start from 0
+        if other == 0:
+            return self
+        return NotImplemented
+    
+    __radd__ = __add__
+    
+    def __sub__(self, other):
+        if not isinstance(other, Money):
+            return NotImplemented
+        self._check(other)
+        return Money(self.cents - other.cents, self.currency)
+    
+    def __mul__(self, factor):
+        """Multiply by a number, rounding half up to whole cents"""
+        if isinstance(factor, Money):
+            return NotImplemented
+        if isinstance(factor, int):
+            return Money(self.cents * factor, self.currency)
+        product = Decimal(self.cents) * (factor if isinstance(factor, Decimal) else Decimal(str(factor)))
+        return Money(int(product.to_integral_value(ROUND_HALF_UP)), self.currency)
+    
+    __rmul__ = __mul__
+    
+    def __neg__(self):
+        return Money(-self.cents, self.currency)
+    
+    def __abs__(self):
+        return Money(abs(self.cents), self.currency)
+    
+    def __bool__(self):
+        return self.cents != 0
+    
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return self.cents == other.cents and self.currency == other.currency
+        if isinstance(other, (int, Decimal)):
+            return self.to_decimal() == other
+        return NotImplemented
+    
+    def __lt__(self, other):
+        if isinstance(other, Money):
+            self._check(other)
+            return self.cents < other.cents
+        if isinstance(other, (int, Decimal)):
+            return self.to_decimal() < other
+        return NotImplemented
+    
+    def __hash__(self):
+        # Equal to plain numbers of the same value, so hash like them
+        return hash(self.to_decimal())
+
+def normalize_currency(code, default=DEFAULT_CURRENCY):
+    """
+    Validate an ISO 4217 currency code
+    
+    Args:
+        code (str): Currency code in any case; empty means the default
+        default (str): Code returned for an empty value
+        
+    Returns:
+        str: Upper-case three-letter code
+        
+    Raises:
+        ValueError: If the code is not three letters
+    """
+    if not code:
+        return default
+    code = str(code).strip().upper()
+    if len(code) != 3 or not code.isalpha() or not code.isascii():
+        raise ValueError(f'Invalid currency: {code}')
+    return code
+
+def money_json(value):
+    """Serialize a stored amount for to_dict(); None stays None"""
+    return None if value is None else Money.of(value).to_json()
+
+def cents(column):
+    """SQL expression for an amount column in whole cents, for exact integer SUMs"""
+    return cast(func.round(column * 100), BigInteger)
@@ -0,0 +1,112 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Instead of OFFSET scans, a page is fetched with a row-value comparison against
+the sort key of the last row of the previous page, so every page costs
+O(per_page) on an index over the sort columns regardless of its depth.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import desc, tuple_
+
+class KeysetPage:
+    """A page of results fetched by keyset pagination"""
+    
+    def __init__(self, items, next_cursor, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+    
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+def encode_cursor(values):
+    """
+    Encode sort key values into an opaque cursor string
+    
+    Args:
+        values (list): Sort key values of the last row of a page
+        
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = json.dumps([
+        v.isoformat() if isinstance(v, (date, datetime)) else v
+        for v in values
+    ], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, columns):
+    """
+    Decode a cursor produced by encode_cursor
+    
+    Args:
+        cursor (str): Cursor string
+        columns (list): Sort columns, used to restore the value types
+        
+    Returns:
+        list: Sort key values
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f'Invalid cursor: {str(e)}')
+    
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Invalid cursor')
+    
+    decoded = []
+    try:
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if value is None:
+                decoded.append(None)
+            elif python_type is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            elif python_type is date:
+                decoded.append(date.fromisoformat(value))
+            else:
+                decoded.append(python_type(value))
+    except (ValueError, TypeError, OverflowError) as e:
+        raise ValueError(f'Invalid cursor: {str(e)}')
+    return decoded
+
+def keyset_paginate(query, columns, cursor=None, per_page=20, include_total=False):
+    """
+    Fetch one page of a query ordered descending on the given columns
+    
+    Args:
+        query (Query): Filtered query to paginate
+        columns (list): Unique sort key, most significant column first
+        cursor (str, optional): Cursor returned with the previous page
+        per_page (int): Page size
+        include_total (bool): Also run a COUNT(*) over the filtered query
+        
+    Returns:
+        KeysetPage: The page with its next_cursor (None on the last page)
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    total = query.order_by(None).count() if include_total else None
+    
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        query = query.filter(tuple_(*columns) < tuple_(*values))
+    
+    rows = query.order_by(*[desc(column) for column in columns]).limit(per_page + 1).all()
+    
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+    
+    return KeysetPage(rows, next_cursor, total)
@@ -0,0 +1,35 @@
+"""
+Per-endpoint request body limits.
+
+MAX_CONTENT_LENGTH caps every request body, which keeps ordinary JSON
+endpoints cheap to reject. Bank statement uploads are spooled to disk and
+parsed as a stream, so they may be far larger: endpoints listed in
+ENDPOINT_LIMITS are capped by their own config key instead.
+"""
+from flask import Request, current_app
+
+# Endpoint name -> config key of its body limit
+ENDPOINT_LIMITS = {
+    'imports.create_import': 'IMPORT_MAX_CONTENT_LENGTH',
+}
+
+class UploadRequest(Request):
+    """Request whose body limit depends on the matched endpoint"""
+
+    @property
+    def max_content_length(self):
+        limit = super().max_content_length
+        key = ENDPOINT_LIMITS.get(self.endpoint)
+        if key and current_app:
+            return current_app.config.get(key, limit)
+        return limit
+
+def init_app(app):
+    """
+    Install the per-endpoint body limits on the app
+
+    Config:
+        MAX_CONTENT_LENGTH: Body limit of every other endpoint
+        IMPORT_MAX_CONTENT_LENGTH: Body limit of statement uploads
+    """
+    app.request_class = UploadRequest
@@ -0,0 +1,104 @@
+"""
+Benchmark the bulk transaction insert path against the single-row path.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_bulk_insert --rows 5000 --chunk-size 500
+
+Set DATABASE_URL to benchmark against PostgreSQL; by default a temporary
+SQLite file is used.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from app import create_app, db
+from app.models import User, Transaction, TransactionType, TransactionCategory
+from app.services.transaction_service import TransactionService
+
+def make_rows(count, seed=42):
+    """Generate random but valid transaction payloads"""
+    rng = random.Random(seed)
+    income = [TransactionCategory.SERVICE, TransactionCategory.PRODUCT_SALE]
+    expense = [TransactionCategory.RENT, TransactionCategory.SOFTWARE, TransactionCategory.TRAVEL]
+    start = date(2020, 1, 1)
+    rows = []
+    for i in range(count):
+        is_income = rng.random() < 0.4
+        rows.append({
+            'date': (start + timedelta(days=rng.randrange(1500))).isoformat(),
+            'amount': f'{rng.uniform(5, 5000):.2f}',
+            'type': (TransactionType.INCOME if is_income else TransactionType.EXPENSE).value,
+            'category': rng.choice(income if is_income else expense).value,
+            'description': f'Benchmark transaction {i}',
+            'reference': f'BENCH-{i:08d}'
+        })
+    return rows
+
+def reset_user(email):
+    """Create a fresh user with an empty ledger"""
+    user = User.query.filter_by(email=email).first()
+    if user:
+        Transaction.query.filter_by(user_id=user.id).delete()
+        db.session.commit()
+        return user.id
+    user = User(email=email, first_name='Bench', last_name='Mark')
+    user.set_password('benchmark')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+def run(rows, chunk_size):
+    service = TransactionService()
+    results = {}
+
+    user_id = reset_user('bench-single@example.com')
+    started = time.perf_counter()
+    for row in rows:
+        service.create_transaction(user_id=user_id, **row)
+    results['single'] = time.perf_counter() - started
+
+    user_id = reset_user('bench-bulk@example.com')
+    started = time.perf_counter()
+    for start in range(0, len(rows), 1000):
+        created, errors = service.bulk_create_transactions(
+            user_id=user_id, rows=rows[start:start + 1000], chunk_size=chunk_size
+        )
+        assert not errors, errors
+    results['bulk'] = time.perf_counter() - started
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000, help='Number of transactions per path')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Rows per INSERT in the bulk path')
+    args = parser.parse_args()
+
+    db_fd, db_path = tempfile.mkstemp(suffix='.db')
+
+    class BenchConfig:
+        SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{db_path}'
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        JWT_SECRET_KEY = 'benchmark'
+        FRONTEND_URL = '*'
+
+    app = create_app(BenchConfig)
+    rows = make_rows(args.rows)
+
+    try:
+        with app.app_context():
+            results = run(rows, args.chunk_size)
+    finally:
+        os.close(db_fd)
+        os.unlink(db_path)
+
+    print(f'{"path":<8} {"rows":>8} {"seconds":>10} {"rows/sec":>12}')
+    for path, seconds in results.items():
+        print(f'{path:<8} {args.rows:>8} {seconds:>10.3f} {args.rows / seconds:>12.0f}')
+    print(f'speedup: {results["single"] / results["bulk"]:.1f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark JSON encoding and response compression of the heaviest endpoints.
+
+Each scenario is requested once to capture the object its view hands to
+jsonify(). That object is then encoded --repeat times with the stdlib and
+orjson providers, and the orjson body is compressed with every available
+encoding. The run reports the best encode time of each provider, and the
+body size and compression time of each encoding. Streamed exports have no
+JSON object to capture, so only their bytes on the wire are reported,
+identity against gzip.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_encoding --transactions 50000 --invoices 2000
+
+Set DATABASE_URL to benchmark against PostgreSQL; by default a temporary
+SQLite file is used.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import Transaction
+from app.services.seed_service import SeedService
+from app.utils.compression import BrotliEncoder, GzipEncoder
+from app.utils.json_provider import OrjsonProvider, StdlibJSONProvider
+
+SCENARIOS = [
+    ('transactions.page_1000', '/api/transactions?per_page=1000'),
+    ('invoices.page_500', '/api/invoices?per_page=500'),
+    ('reports.income_expense.day', '/api/reports/income-expense?start_date={start}&end_date={end}&group_by=day'),
+    ('reports.pivot.week_category',
+     '/api/reports/pivot?start_date={start}&end_date={end}&group_by=week,category'),
+    ('reports.bundle', '/api/reports/bundle?start_date={start}&end_date={end}&year={year}'),
+    ('reports.ar_aging', '/api/reports/ar-aging'),
+]
+
+EXPORTS = [
+    ('transactions.export.csv', '/api/transactions/export?format=csv'),
+    ('transactions.export.ndjson', '/api/transactions/export?format=ndjson'),
+    ('invoices.export.csv', '/api/invoices/export?format=csv'),
+]
+
+class CapturingProvider(OrjsonProvider):
+    """Keeps the last object passed to jsonify()"""
+
+    captured = None
+
+    def response(self, *args, **kwargs):
+        self.captured = self._prepare_response_obj(args, kwargs)
+        return super().response(*args, **kwargs)
+
+def best_of(function, repeat):
+    """Best time of `repeat` runs in seconds, and the result of the last one"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def encoders(app):
+    available = [GzipEncoder(app.config['COMPRESS_GZIP_LEVEL'])]
+    try:
+        available.append(BrotliEncoder(app.config['COMPRESS_BROTLI_QUALITY']))
+    except ImportError:
+        pass
+    return available
+
+def run_json(app, client, headers, params, repeat):
+    capture = CapturingProvider(app)
+    app.json = capture
+    stdlib = StdlibJSONProvider(app)
+    available = encoders(app)
+
+    print(f'{"scenario":<30} {"bytes":>10} {"stdlib ms":>10} {"orjson ms":>10} {"speedup":>8}   '
+          + '   '.join(f'{encoder.name + " bytes":>12} {"ms":>7}' for encoder in available))
+    for name, path in SCENARIOS:
+        response = client.get(path.format(**params), headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f'{name} returned {response.status_code}: {response.get_data(as_text=True)}')
+        payload = capture.captured
+
+        stdlib_seconds, _ = best_of(lambda: stdlib.dumps(payload).encode('utf-8'), repeat)
+        orjson_seconds, body = best_of(lambda: capture.dumps_bytes(payload), repeat)
+
+        columns = []
+        for encoder in available:
+            seconds, compressed = best_of(lambda: encoder.compress(body), repeat)
+            columns.append(f'{len(compressed):>12} {seconds * 1000:>7.2f}')
+        print(f'{name:<30} {len(body):>10} {stdlib_seconds * 1000:>10.2f} {orjson_seconds * 1000:>10.2f} '
+              f'{stdlib_seconds / orjson_seconds:>7.1f}x   ' + '   '.join(columns))
+
+def run_exports(client, headers):
+    print(f'\n{"export":<30} {"bytes":>10} {"gzip bytes":>12} {"ratio":>7}')
+    for name, path in EXPORTS:
+        plain = len(client.get(path, headers=headers).get_data())
+        gzipped = len(client.get(path, headers={**headers, 'Accept-Encoding': 'gzip'}).get_data())
+        print(f'{name:<30} {plain:>10} {gzipped:>12} {plain / gzipped:>6.1f}x')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=50000, help='Transactions to seed')
+    parser.add_argument('--invoices', type=int, default=2000, help='Invoices to seed')
+    parser.add_argument('--years', type=int, default=3, help='Years of history to seed')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per measurement; the best is reported')
+    args = parser.parse_args()
+
+    db_fd, db_path = tempfile.mkstemp(suffix='.db')
+
+    class BenchConfig:
+        SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{db_path}'
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        JWT_SECRET_KEY = 'benchmark'
+        JWT_ACCESS_TOKEN_EXPIRES = False
+        FRONTEND_URL = '*'
+        REPORT_CACHE_BACKEND = 'null'
+        COMPRESS_GZIP_LEVEL = 6
+        COMPRESS_BROTLI_QUALITY = 4
+
+    app = create_app(BenchConfig)
+
+    try:
+        with app.app_context():
+            totals = SeedService(seed=42, chunk_size=5000).seed(
+                users=1, transactions=args.transactions, invoices=args.invoices, years=args.years
+            )
+            user_id = totals['user_ids'][0]
+            headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+            first = db.session.query(db.func.min(Transaction.date)).filter_by(user_id=user_id).scalar()
+            last = db.session.query(db.func.max(Transaction.date)).filter_by(user_id=user_id).scalar()
+            params = {'start': first.isoformat(), 'end': last.isoformat(), 'year': last.year}
+            db.session.remove()
+
+            client = app.test_client()
+            run_json(app, client, headers, params, args.repeat)
+            run_exports(client, headers)
+    finally:
+        os.close(db_fd)
+        os.unlink(db_path)
+
+if __name__ == '__main__':
+    main()
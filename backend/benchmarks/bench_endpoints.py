@@ -0,0 +1,199 @@
+"""
+Benchmark the report and listing endpoints against a seeded ledger.
+
+Every scenario is requested --iterations times after --warmup requests;
+p50/p95 latency and the number of SQL statements per request are recorded.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_endpoints --transactions 100000 --invoices 2000
+    python -m benchmarks.bench_endpoints --json results.json
+    python -m benchmarks.bench_endpoints --baseline results.json --max-regression 0.25
+
+With --baseline the run exits non-zero when a scenario's p95 grows by more
+than --max-regression (as a fraction) or it issues more queries than in the
+baseline, so it can gate a deploy. Baselines are only comparable when taken
+on the same machine, database and seed parameters.
+
+Set DATABASE_URL to benchmark against PostgreSQL; by default a temporary
+SQLite file is used. Pass --email to benchmark an already seeded user
+instead of seeding a new one.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import User, Transaction
+from app.services.seed_service import SeedService
+
+SCENARIOS = [
+    ('reports.income_expense.month', '/api/reports/income-expense?start_date={start}&end_date={end}&group_by=month'),
+    ('reports.income_expense.week', '/api/reports/income-expense?start_date={start}&end_date={end}&group_by=week'),
+    ('reports.profit_loss', '/api/reports/profit-loss?start_date={start}&end_date={end}'),
+    ('reports.cash_flow', '/api/reports/cash-flow?start_date={start}&end_date={end}'),
+    ('reports.tax_summary', '/api/reports/tax-summary?year={year}'),
+    ('reports.bundle', '/api/reports/bundle?start_date={start}&end_date={end}&year={year}'),
+    ('transactions.page_1', '/api/transactions?per_page=50'),
+    ('transactions.page_100', '/api/transactions?per_page=50&page=100'),
+    ('transactions.cursor', '/api/transactions?per_page=50&cursor='),
+    ('transactions.filtered', '/api/transactions?per_page=50&type=expense&category=software'),
+    ('transactions.search', '/api/transactions?per_page=50&search=acme'),
+    ('transactions.summary', '/api/transactions/summary'),
+    ('invoices.page_1', '/api/invoices?per_page=50'),
+    ('invoices.cursor', '/api/invoices?per_page=50&cursor='),
+    ('invoices.search', '/api/invoices?per_page=50&search=INV'),
+    ('invoices.summary', '/api/invoices/summary?aging=true'),
+]
+
+class QueryCounter:
+    """Count SQL statements executed on an engine"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._record)
+
+    def _record(self, *args):
+        self.count += 1
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+def seed(args):
+    service = SeedService(seed=args.seed, chunk_size=5000)
+    started = time.perf_counter()
+    totals = service.seed(
+        users=1, transactions=args.transactions, invoices=args.invoices, years=args.years
+    )
+    print(f'seeded {totals["transactions"]} transactions and {totals["invoices"]} invoices '
+          f'in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+    return totals['user_ids'][0]
+
+def run(app, user_id, args):
+    counter = QueryCounter(db.engine)
+    client = app.test_client()
+
+    token = create_access_token(identity=user_id)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first = db.session.query(db.func.min(Transaction.date)).filter_by(user_id=user_id).scalar()
+    last = db.session.query(db.func.max(Transaction.date)).filter_by(user_id=user_id).scalar()
+    params = {'start': first.isoformat(), 'end': last.isoformat(), 'year': last.year}
+    db.session.remove()
+
+    results = {}
+    for name, path in SCENARIOS:
+        if args.only and not any(name.startswith(prefix) for prefix in args.only):
+            continue
+
+        url = path.format(**params)
+        for _ in range(args.warmup):
+            client.get(url, headers=headers)
+
+        latencies = []
+        queries = []
+        for _ in range(args.iterations):
+            before = counter.count
+            started = time.perf_counter()
+            response = client.get(url, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(counter.count - before)
+            if response.status_code != 200:
+                raise RuntimeError(f'{name}: {url} returned {response.status_code}: {response.get_data(as_text=True)}')
+
+        results[name] = {
+            'p50_ms': round(statistics.median(latencies), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'queries': max(queries)
+        }
+
+    return results
+
+def compare(results, baseline, max_regression):
+    """Return a list of regressions of results against a baseline"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + max_regression):
+            regressions.append(f'{name}: p95 {previous["p95_ms"]:.1f}ms -> {current["p95_ms"]:.1f}ms')
+        if current['queries'] > previous['queries']:
+            regressions.append(f'{name}: queries {previous["queries"]} -> {current["queries"]}')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=50000, help='Transactions to seed')
+    parser.add_argument('--invoices', type=int, default=1000, help='Invoices to seed')
+    parser.add_argument('--years', type=int, default=3, help='Years of history to seed')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed of the data set')
+    parser.add_argument('--email', help='Benchmark this existing user instead of seeding')
+    parser.add_argument('--iterations', type=int, default=30, help='Measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per scenario')
+    parser.add_argument('--only', nargs='*', help='Only run scenarios starting with these prefixes')
+    parser.add_argument('--cache', action='store_true', help='Keep the report cache enabled')
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--baseline', help='Compare against results written by an earlier --json run')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='Allowed p95 growth against the baseline, as a fraction')
+    args = parser.parse_args()
+
+    db_fd, db_path = tempfile.mkstemp(suffix='.db')
+
+    class BenchConfig:
+        SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{db_path}'
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        JWT_SECRET_KEY = 'benchmark'
+        JWT_ACCESS_TOKEN_EXPIRES = False
+        FRONTEND_URL = '*'
+        REPORT_CACHE_BACKEND = 'memory' if args.cache else 'null'
+
+    app = create_app(BenchConfig)
+
+    try:
+        with app.app_context():
+            if args.email:
+                user_id = User.query.filter_by(email=args.email).one().id
+            else:
+                user_id = seed(args)
+            results = run(app, user_id, args)
+            database = db.engine.dialect.name
+    finally:
+        os.close(db_fd)
+        os.unlink(db_path)
+
+    print(f'{"scenario":<32} {"p50 ms":>10} {"p95 ms":>10} {"queries":>8}')
+    for name, result in results.items():
+        print(f'{name:<32} {result["p50_ms"]:>10.2f} {result["p95_ms"]:>10.2f} {result["queries"]:>8}')
+
+    report = {
+        'database': database,
+        'parameters': {
+            'transactions': args.transactions, 'invoices': args.invoices,
+            'years': args.years, 'seed': args.seed, 'cache': args.cache
+        },
+        'scenarios': results
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print('\nRegressions:\n  ' + '\n  '.join(regressions))
+            sys.exit(1)
+        print('\nNo regressions against the baseline')
+
+if __name__ == '__main__':
+    main()
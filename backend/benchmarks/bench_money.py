@@ -0,0 +1,120 @@
+"""
+Benchmark summing amounts as integer cents against the Decimal/float mix.
+
+In memory, the same random amounts are summed as floats, Decimals, Money
+values, plain int cents and a NumPy int64 array. In the database, a seeded
+ledger is summed with SUM(amount) and with SUM(cents(amount)). Every
+variant reports its time and whether its total is exact.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_money --amounts 1000000 --transactions 100000
+
+Set DATABASE_URL to benchmark the SQL sums against PostgreSQL; by default a
+temporary SQLite file is used.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import func
+
+from app import create_app, db
+from app.models import Transaction
+from app.services.seed_service import SeedService
+from app.utils.money import Money, cents
+
+def make_amounts(count, seed=42):
+    """Random amounts between 0.01 and 5000.00, as strings"""
+    rng = random.Random(seed)
+    return [f'{rng.randrange(1, 500001) / 100:.2f}' for _ in range(count)]
+
+def timed(function, repeat):
+    """Best of `repeat` runs, as (seconds, result)"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run_memory(amounts, repeat):
+    exact = sum(int(amount.replace('.', '')) for amount in amounts)
+
+    floats = [float(amount) for amount in amounts]
+    decimals = [Decimal(amount) for amount in amounts]
+    moneys = [Money.of(amount) for amount in amounts]
+    ints = [money.cents for money in moneys]
+    array = np.array(ints, dtype=np.int64)
+
+    variants = [
+        ('float', lambda: sum(floats), lambda total: total * 100 == exact),
+        ('Decimal', lambda: sum(decimals, Decimal('0')), lambda total: total * 100 == exact),
+        ('Money.sum', lambda: Money.sum(moneys), lambda total: total.cents == exact),
+        ('int cents', lambda: sum(ints), lambda total: total == exact),
+        ('int64 array', lambda: int(array.sum()), lambda total: total == exact),
+    ]
+    return [
+        (name, *timed(function, repeat), check)
+        for name, function, check in variants
+    ]
+
+def run_sql(transactions, repeat):
+    totals = SeedService(seed=42, chunk_size=5000).seed(users=1, transactions=transactions, invoices=0)
+    user_id = totals['user_ids'][0]
+
+    def total(expression):
+        return lambda: db.session.query(func.sum(expression))\
+                                 .filter(Transaction.user_id == user_id).scalar()
+
+    exact = sum(
+        Money.of(amount).cents
+        for (amount,) in db.session.query(Transaction.amount).filter(Transaction.user_id == user_id)
+    )
+    variants = [
+        ('SUM(amount)', total(Transaction.amount), lambda value: Decimal(value) * 100 == exact),
+        ('SUM(cents(amount))', total(cents(Transaction.amount)), lambda value: int(value) == exact),
+    ]
+    return [
+        (name, *timed(function, repeat), check)
+        for name, function, check in variants
+    ]
+
+def report(title, count, results):
+    print(f'{title} ({count} amounts)')
+    print(f'  {"variant":<20} {"ms":>10} {"exact":>6}')
+    for name, seconds, total, check in results:
+        print(f'  {name:<20} {seconds * 1000:>10.2f} {"yes" if check(total) else "no":>6}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--amounts', type=int, default=1000000, help='Amounts summed in memory')
+    parser.add_argument('--transactions', type=int, default=100000, help='Transactions summed in SQL')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per variant; the best is reported')
+    args = parser.parse_args()
+
+    report('memory', args.amounts, run_memory(make_amounts(args.amounts), args.repeat))
+
+    db_fd, db_path = tempfile.mkstemp(suffix='.db')
+
+    class BenchConfig:
+        SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{db_path}'
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        JWT_SECRET_KEY = 'benchmark'
+        FRONTEND_URL = '*'
+
+    app = create_app(BenchConfig)
+
+    try:
+        with app.app_context():
+            report('sql', args.transactions, run_sql(args.transactions, args.repeat))
+    finally:
+        os.close(db_fd)
+        os.unlink(db_path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark list serialization through ORM instances against read models.
+
+For each page size, a page of a seeded user's transactions and invoices is
+fetched and serialized with to_dict() twice: once by hydrating ORM
+instances (with selectinload for invoice items), once through the read
+models of app.models.read_models. Each variant reports its best time and
+its peak traced memory, both per row.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_read_models --transactions 20000 --pages 50,500,5000
+
+Set DATABASE_URL to benchmark against PostgreSQL; by default a temporary
+SQLite file is used.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import desc
+from sqlalchemy.orm import selectinload
+
+from app import create_app, db
+from app.models import Invoice, Transaction
+from app.models.read_models import InvoiceRow, TransactionRow
+from app.services.seed_service import SeedService
+
+def measure(function, repeat):
+    """Best time of `repeat` runs and the peak traced memory of one more, as (seconds, bytes)"""
+    best = None
+    for _ in range(repeat):
+        # A fresh identity map, as at the start of a request
+        db.session.expunge_all()
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+def variants(user_id, size):
+    transactions = Transaction.query.filter_by(user_id=user_id)\
+                                    .order_by(desc(Transaction.date), desc(Transaction.created_at))\
+                                    .limit(size)
+    invoices = Invoice.query.filter_by(user_id=user_id)\
+                            .order_by(desc(Invoice.issue_date), desc(Invoice.created_at))\
+                            .limit(size)
+    return [
+        ('transactions', 'orm', lambda: [t.to_dict() for t in transactions.all()]),
+        ('transactions', 'read model',
+         lambda: [t.to_dict() for t in TransactionRow.from_rows(TransactionRow.select(transactions))]),
+        ('invoices', 'orm',
+         lambda: [i.to_dict() for i in invoices.options(selectinload(Invoice.items)).all()]),
+        ('invoices', 'read model',
+         lambda: [i.to_dict() for i in InvoiceRow.from_rows(InvoiceRow.select(invoices))]),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=20000, help='Transactions to seed')
+    parser.add_argument('--invoices', type=int, default=5000, help='Invoices to seed')
+    parser.add_argument('--pages', default='50,500,5000', help='Comma-separated page sizes')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per variant; the best is reported')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.pages.split(',')]
+
+    db_fd, db_path = tempfile.mkstemp(suffix='.db')
+
+    class BenchConfig:
+        SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{db_path}'
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        JWT_SECRET_KEY = 'benchmark'
+        FRONTEND_URL = '*'
+
+    app = create_app(BenchConfig)
+
+    try:
+        with app.app_context():
+            totals = SeedService(seed=42, chunk_size=5000).seed(
+                users=1, transactions=args.transactions, invoices=args.invoices
+            )
+            user_id = totals['user_ids'][0]
+
+            print(f'  {"list":<14} {"rows":>6} {"variant":<12} {"us/row":>8} {"bytes/row":>10} {"speedup":>8}')
+            for size in sizes:
+                baseline = {}
+                for name, variant, function in variants(user_id, size):
+                    seconds, peak = measure(function, args.repeat)
+                    if variant == 'orm':
+                        baseline[name] = seconds
+                    print(f'  {name:<14} {size:>6} {variant:<12} {seconds / size * 1e6:>8.1f} '
+                          f'{peak // size:>10} {baseline[name] / seconds:>7.1f}x')
+    finally:
+        os.close(db_fd)
+        os.unlink(db_path)
+
+if __name__ == '__main__':
+    main()
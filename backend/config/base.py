@@ -24,7 +24,59 @@ class Config:
     
     # File upload settings
     UPLOAD_FOLDER = os.path.join(os.path.abspath(os.path.dirname(__file__)), '../../uploads')
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB max file size by default
+    # Bank statements are streamed to disk and parsed incrementally, so POST /api/imports takes larger files
+    IMPORT_MAX_CONTENT_LENGTH = int(os.environ.get('IMPORT_MAX_CONTENT_LENGTH', 512 * 1024 * 1024))
+    
+    # Redis settings
+    REDIS_URL = os.environ.get('REDIS_URL')
+    
+    # Report cache settings ('redis', 'memory' or 'null')
+    REPORT_CACHE_BACKEND = os.environ.get('REPORT_CACHE_BACKEND', 'redis' if REDIS_URL else 'memory')
+    REPORT_CACHE_TTL = int(os.environ.get('REPORT_CACHE_TTL', 300))
+    REPORT_CACHE_MAX_ENTRIES = int(os.environ.get('REPORT_CACHE_MAX_ENTRIES', 1024))
+    
+    # Report engine: user ledgers kept in memory as NumPy columns
+    REPORT_ENGINE_MAX_LEDGERS = int(os.environ.get('REPORT_ENGINE_MAX_LEDGERS', 32))
+    
+    # Asynchronous report jobs ('redis' queue and worker processes, or 'local' threads)
+    REPORT_JOBS_BACKEND = os.environ.get('REPORT_JOBS_BACKEND', 'redis' if REDIS_URL else 'local')
+    REPORT_JOBS_TTL = int(os.environ.get('REPORT_JOBS_TTL', 3600))
+    REPORT_JOBS_WORKERS = int(os.environ.get('REPORT_JOBS_WORKERS', 2))
+    REPORT_JOBS_MAX_WAIT = int(os.environ.get('REPORT_JOBS_MAX_WAIT', 30))
+    
+    # Currencies: rates are stored against FX_BASE_CURRENCY (load them with `flask fx load`),
+    # reports are converted to REPORTING_CURRENCY unless a request asks for another
+    FX_BASE_CURRENCY = os.environ.get('FX_BASE_CURRENCY', 'USD')
+    REPORTING_CURRENCY = os.environ.get('REPORTING_CURRENCY', 'USD')
+    
+    # Streaming exports: rows fetched from the database cursor per chunk
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 1000))
+    
+    # JSON encoding of responses ('orjson' or 'stdlib')
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson')
+    
+    # Response compression: encodings by preference ('br' needs the brotli package),
+    # applied to bodies of at least COMPRESS_MIN_SIZE bytes
+    COMPRESS_ALGORITHMS = os.environ.get('COMPRESS_ALGORITHMS', 'br,gzip')
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    
+    # Delta sync: rows per entity per response, the window resent after a sync
+    # to catch late commits, and how long tombstones (and sync tokens) last
+    SYNC_PAGE_SIZE = int(os.environ.get('SYNC_PAGE_SIZE', 500))
+    SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', 5))
+    SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+    
+    # Bulk import settings
+    BULK_TRANSACTION_LIMIT = int(os.environ.get('BULK_TRANSACTION_LIMIT', 1000))
+    BULK_INSERT_CHUNK_SIZE = int(os.environ.get('BULK_INSERT_CHUNK_SIZE', 500))
+    IMPORTS_RUN_ASYNC = True
+    
+    # Invoice numbering: format fields are year, month and seq; reset is monthly, yearly or never
+    INVOICE_NUMBER_FORMAT = os.environ.get('INVOICE_NUMBER_FORMAT', 'INV-{year}{month:02d}-{seq:04d}')
+    INVOICE_NUMBER_RESET = os.environ.get('INVOICE_NUMBER_RESET', 'monthly')
     
     # Email settings
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
@@ -12,6 +12,15 @@ class TestingConfig(Config):
     # Disable CSRF protection in tests
     WTF_CSRF_ENABLED = False
     
+    # Keep the report cache in-process during tests
+    REPORT_CACHE_BACKEND = 'memory'
+    
+    # Run report jobs on in-process threads
+    REPORT_JOBS_BACKEND = 'local'
+    
+    # Run statement imports inline so tests can assert on the result
+    IMPORTS_RUN_ASYNC = False
+    
     # Disable rate limiting in tests
     RATELIMIT_ENABLED = False
     
@@ -0,0 +1,28 @@
+"""Add users.ledger_version
+
+Revision ID: 3f1c2a9d8e01
+Revises:
+Create Date: 2026-10-16 09:12:40.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d8e01'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('users')}
+    if 'ledger_version' not in columns:
+        # Existing users start at version 0, like new ones
+        op.add_column('users', sa.Column('ledger_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('ledger_version')
@@ -0,0 +1,33 @@
+"""Add transactions.import_hash
+
+Revision ID: 8b4e6d0c2f15
+Revises: 3f1c2a9d8e01
+Create Date: 2026-10-16 09:31:07.542118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e6d0c2f15'
+down_revision = '3f1c2a9d8e01'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'import_hash' not in {column['name'] for column in inspector.get_columns('transactions')}:
+        # Transactions entered by hand have no hash
+        op.add_column('transactions', sa.Column('import_hash', sa.String(length=64), nullable=True))
+    if 'uq_transactions_user_import_hash' not in {index['name'] for index in inspector.get_indexes('transactions')}:
+        op.create_index(
+            'uq_transactions_user_import_hash', 'transactions', ['user_id', 'import_hash'], unique=True
+        )
+
+
+def downgrade():
+    op.drop_index('uq_transactions_user_import_hash', table_name='transactions')
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.drop_column('import_hash')
@@ -0,0 +1,37 @@
+"""Make invoice numbers unique per user
+
+Revision ID: c27a9f4b6e38
+Revises: 8b4e6d0c2f15
+Create Date: 2026-10-16 09:48:52.906431
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c27a9f4b6e38'
+down_revision = '8b4e6d0c2f15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    indexes = {index['name']: index for index in inspector.get_indexes('invoices')}
+    if indexes.get('ix_invoices_invoice_number', {}).get('unique'):
+        # Numbers come from per-user sequences, so two users may share one
+        op.drop_index('ix_invoices_invoice_number', table_name='invoices')
+        op.create_index('ix_invoices_invoice_number', 'invoices', ['invoice_number'])
+
+    constraints = {constraint['name'] for constraint in inspector.get_unique_constraints('invoices')}
+    if 'uq_invoices_user_invoice_number' not in constraints:
+        with op.batch_alter_table('invoices') as batch_op:
+            batch_op.create_unique_constraint('uq_invoices_user_invoice_number', ['user_id', 'invoice_number'])
+
+
+def downgrade():
+    with op.batch_alter_table('invoices') as batch_op:
+        batch_op.drop_constraint('uq_invoices_user_invoice_number', type_='unique')
+    op.drop_index('ix_invoices_invoice_number', table_name='invoices')
+    op.create_index('ix_invoices_invoice_number', 'invoices', ['invoice_number'], unique=True)
@@ -0,0 +1,33 @@
+"""Add transactions.currency
+
+Revision ID: e5d18b3a7c42
+Revises: c27a9f4b6e38
+Create Date: 2026-10-16 10:05:19.127364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5d18b3a7c42'
+down_revision = 'c27a9f4b6e38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('transactions')}
+    if 'currency' not in columns:
+        # Amounts recorded before currencies were tracked are in US dollars
+        op.add_column(
+            'transactions', sa.Column('currency', sa.String(length=3), server_default='USD', nullable=False)
+        )
+
+
+def downgrade():
+    indexes = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('transactions')}
+    if 'ix_transactions_user_date_totals' in indexes:
+        op.drop_index('ix_transactions_user_date_totals', table_name='transactions')
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.drop_column('currency')
@@ -1,29 +1,31 @@
 """Pytest configuration and shared fixtures."""
-import os
-import tempfile
 import pytest
-from app import create_app
-from app.extensions import db as _db
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db as _db
 from app.models.user import User
 
-# Set the testing configuration
-os.environ['FLASK_ENV'] = 'testing'
+@pytest.fixture
+def app_config():
+    """Config overrides for the app; test modules override this fixture to change settings."""
+    return {}
 
-@pytest.fixture(scope='session')
-def app():
+@pytest.fixture
+def app(app_config):
     """Create and configure a new app instance for each test."""
-    # Create a temporary file to isolate the database for each test
-    db_fd, db_path = tempfile.mkstemp()
-    
-    app = create_app({
-        'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
-        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
-        'SECRET_KEY': 'test-secret-key',
-        'JWT_SECRET_KEY': 'test-jwt-secret-key'
-    })
+    class TestConfig:
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        SECRET_KEY = 'test-secret-key'
+        JWT_SECRET_KEY = 'test-jwt-secret-key'
+        FRONTEND_URL = 'http://localhost:3000'
+
+    for key, value in app_config.items():
+        setattr(TestConfig, key, value)
+
+    app = create_app(TestConfig)
 
-    # Create the database and load test data
     with app.app_context():
         _db.create_all()
 
@@ -33,32 +35,6 @@ def app():
     with app.app_context():
         _db.session.remove()
         _db.drop_all()
-    
-    # Remove the temporary database
-    os.close(db_fd)
-    os.unlink(db_path)
-
-@pytest.fixture(scope='session')
-db(app):
-    """Provide the transactional fixtures with access to the database."""
-    return _db
-
-@pytest.fixture
-db_session(db):
-    """Create a new database session for a test."""
-    connection = db.engine.connect()
-    transaction = connection.begin()
-    
-    options = dict(bind=connection, binds={})
-    session = db.create_scoped_session(options=options)
-    
-    db.session = session
-    
-    yield session
-    
-    transaction.rollback()
-    connection.close()
-    session.remove()
 
 @pytest.fixture
 def client(app):
@@ -71,30 +47,30 @@ def runner(app):
     return app.test_cli_runner()
 
 @pytest.fixture
-def test_user(db_session):
-    """Create a test user."""
-    user = User(
-        username='testuser',
-        email='test@example.com',
-        password='testpass123',
-        first_name='Test',
-        last_name='User',
-        is_active=True,
-        is_admin=False
-    )
-    db_session.add(user)
-    db_session.commit()
-    return user
+def make_user(app):
+    """Return a factory that creates a user and returns ``(user_id, auth headers)``."""
+    def make(email='test@example.com'):
+        with app.app_context():
+            user = User(email=email, first_name='Test', last_name='User')
+            user.set_password('testpass123')
+            _db.session.add(user)
+            _db.session.commit()
+            token = create_access_token(identity=user.id)
+            return user.id, {'Authorization': f'Bearer {token}'}
+
+    return make
+
+@pytest.fixture
+def account(make_user):
+    """The default test user as ``(user_id, auth headers)``."""
+    return make_user()
+
+@pytest.fixture
+def user_id(account):
+    """ID of the default test user."""
+    return account[0]
 
 @pytest.fixture
-def auth_headers(test_user, client):
-    """Get authentication headers for the test user."""
-    response = client.post('/api/auth/login', json={
-        'email': test_user.email,
-        'password': 'testpass123'
-    })
-    access_token = response.json['access_token']
-    return {
-        'Authorization': f'Bearer {access_token}',
-        'Content-Type': 'application/json'
-    }
+def auth_headers(account):
+    """Authentication headers for the default test user."""
+    return account[1]
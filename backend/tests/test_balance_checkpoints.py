@@ -0,0 +1,70 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app import db
+from app.models import BalanceCheckpoint
+from app.services.checkpoint_service import CheckpointService
+from app.services.transaction_service import TransactionService
+
+@pytest.fixture
+def app_config():
+    return {
+        'REPORT_CACHE_BACKEND': 'null',
+    }
+
+def _checkpoints(app):
+    with app.app_context():
+        return [
+            (c.month.isoformat(), Decimal(c.cumulative_net))
+            for c in BalanceCheckpoint.query.order_by(BalanceCheckpoint.month)
+        ]
+
+def test_incremental_checkpoints_match_rebuild(app, client, auth_headers, user_id):
+    """Out-of-order creates, bulk inserts, updates and deletes keep the prefix sums exact."""
+    rng = random.Random(14)
+    ids = []
+    for _ in range(40):
+        response = client.post('/api/transactions', headers=auth_headers, json={
+            'date': (date(2023, 1, 1) + timedelta(days=rng.randrange(365))).isoformat(),
+            'amount': f'{rng.randrange(1, 100000) / 100:.2f}',
+            'type': rng.choice(['income', 'expense', 'transfer']),
+            'category': 'other_income'
+        })
+        assert response.status_code == 201
+        ids.append(response.json['transaction']['id'])
+
+    client.post('/api/transactions/bulk', headers=auth_headers, json={'transactions': [
+        {'date': '2022-12-31', 'amount': '500.00', 'type': 'income', 'category': 'service'},
+        {'date': '2023-06-15', 'amount': '25.50', 'type': 'expense', 'category': 'rent'},
+        {'date': '2024-02-01', 'amount': '10.00', 'type': 'expense', 'category': 'rent'},
+    ]})
+    client.put(f'/api/transactions/{ids[0]}', headers=auth_headers, json={'date': '2021-05-05', 'amount': 77})
+    client.put(f'/api/transactions/{ids[1]}', headers=auth_headers, json={'type': 'income'})
+    client.delete(f'/api/transactions/{ids[2]}', headers=auth_headers)
+
+    incremental = _checkpoints(app)
+    with app.app_context():
+        CheckpointService().rebuild(user_id)
+        db.session.commit()
+    assert incremental == _checkpoints(app)
+
+def test_cash_flow_carries_the_opening_balance(app, client, auth_headers, user_id):
+    """The window's running balance starts from all prior history."""
+    with app.app_context():
+        TransactionService().bulk_create_transactions(user_id, [
+            {'date': '2020-03-10', 'amount': '1000.00', 'type': 'income', 'category': 'service'},
+            {'date': '2022-11-05', 'amount': '250.25', 'type': 'expense', 'category': 'rent'},
+            {'date': '2023-01-20', 'amount': '300.00', 'type': 'income', 'category': 'service'},
+            {'date': '2023-02-02', 'amount': '50.00', 'type': 'expense', 'category': 'software'},
+        ])
+
+    response = client.get('/api/reports/cash-flow?end_date=2023-02-28&months=1', headers=auth_headers)
+    assert response.status_code == 200
+    report = response.json
+    assert report['start_date'] == '2023-01-01'
+    assert report['totals']['opening_balance'] == 749.75
+    assert [row['running_balance'] for row in report['data']] == [1049.75, 999.75]
+    assert report['totals']['ending_balance'] == 999.75
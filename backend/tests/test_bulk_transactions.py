@@ -0,0 +1,51 @@
+import pytest
+
+from app.models import Transaction, TransactionRollup
+
+@pytest.fixture
+def app_config():
+    return {
+        'BULK_TRANSACTION_LIMIT': 5,
+        'BULK_INSERT_CHUNK_SIZE': 2,
+    }
+
+def test_bulk_create_reports_row_errors_and_keeps_good_rows(app, client, auth_headers):
+    rows = [
+        {'date': '2024-01-01', 'amount': 10, 'type': 'income', 'category': 'service'},
+        {'date': '2024-01-01', 'amount': 'abc', 'type': 'income', 'category': 'service'},
+        {'date': '2024-01-01', 'amount': 5, 'type': 'bogus', 'category': 'service'},
+        {'date': '2024-01-02', 'amount': 7, 'type': 'expense', 'category': 'rent'},
+        {'date': '2024-01-01', 'amount': 1, 'type': 'income', 'category': 'service'},
+    ]
+
+    response = client.post('/api/transactions/bulk', headers=auth_headers, json={'transactions': rows})
+
+    assert response.status_code == 201
+    assert response.json['created'] == 3
+    assert [error['index'] for error in response.json['errors']] == [1, 2]
+
+    with app.app_context():
+        assert Transaction.query.count() == 3
+        rollups = {
+            (r.day.isoformat(), r.type.value): (float(r.total_amount), r.transaction_count)
+            for r in TransactionRollup.query.all()
+        }
+    assert rollups == {
+        ('2024-01-01', 'income'): (11.0, 2),
+        ('2024-01-02', 'expense'): (7.0, 1),
+    }
+
+def test_bulk_create_enforces_row_limit(client, auth_headers):
+    rows = [{'date': '2024-01-01', 'amount': 1, 'type': 'income', 'category': 'service'}] * 6
+
+    response = client.post('/api/transactions/bulk', headers=auth_headers, json={'transactions': rows})
+
+    assert response.status_code == 400
+
+def test_bulk_create_with_only_invalid_rows_fails(client, auth_headers):
+    response = client.post('/api/transactions/bulk', headers=auth_headers, json={
+        'transactions': [{'amount': 1}]
+    })
+
+    assert response.status_code == 400
+    assert response.json['created'] == 0
@@ -0,0 +1,93 @@
+import gzip
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+
+from app.models import TransactionType
+from app.services.transaction_service import TransactionService
+from app.utils import json_provider
+from app.utils.json_provider import OrjsonProvider, StdlibJSONProvider
+from app.utils.money import Money
+
+@pytest.fixture
+def app_config():
+    return {
+        'COMPRESS_ALGORITHMS': 'gzip',
+        'COMPRESS_MIN_SIZE': 1024,
+    }
+
+@pytest.fixture
+def auth_headers(app, user_id, auth_headers):
+    """Give the test user enough transactions for a large list; return auth headers."""
+    with app.app_context():
+        rows = [
+            {'date': f'2024-01-{day:02d}', 'amount': f'{day}.25', 'type': 'expense', 'category': 'software',
+             'description': f'Subscription {day}'}
+            for day in range(1, 29)
+        ]
+        created, errors = TransactionService().bulk_create_transactions(user_id, rows)
+        assert created == 28 and not errors
+    return auth_headers
+
+def test_providers_encode_the_same_types():
+    """Both providers write ISO dates, Decimal strings, Money numbers and enum values."""
+    app = Flask(__name__)
+    payload = {
+        'day': date(2024, 2, 29),
+        'at': datetime(2024, 2, 29, 13, 5, 7, 250),
+        'exact': Decimal('10.50'),
+        'money': Money(1999, 'EUR'),
+        'type': TransactionType.INCOME,
+        'nested': [{'none': None, 'ratio': 0.25}],
+    }
+    expected = {
+        'day': '2024-02-29',
+        'at': '2024-02-29T13:05:07.000250',
+        'exact': '10.50',
+        'money': 19.99,
+        'type': 'income',
+        'nested': [{'none': None, 'ratio': 0.25}],
+    }
+    for provider in (OrjsonProvider(app), StdlibJSONProvider(app)):
+        assert json.loads(provider.dumps(payload)) == expected
+        assert provider.loads(provider.dumps(payload)) == expected
+
+    with pytest.raises(TypeError):
+        OrjsonProvider(app).dumps({'unknown': object()})
+
+    app.config['JSON_PROVIDER'] = 'simplejson'
+    with pytest.raises(ValueError):
+        json_provider.init_app(app)
+
+def test_large_responses_are_compressed(client, auth_headers):
+    """Bodies above COMPRESS_MIN_SIZE are gzipped when the client accepts it."""
+    plain = client.get('/api/transactions?per_page=50', headers=auth_headers)
+    assert plain.headers.get('Content-Encoding') is None
+    assert 'Accept-Encoding' in plain.headers['Vary']
+    assert len(plain.get_data()) > 1024
+
+    response = client.get('/api/transactions?per_page=50', headers={**auth_headers, 'Accept-Encoding': 'br, gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert int(response.headers['Content-Length']) == len(response.get_data())
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+
+    # Refused encodings and small bodies are sent as they are
+    refused = client.get('/api/transactions?per_page=50', headers={**auth_headers, 'Accept-Encoding': 'gzip;q=0'})
+    assert refused.headers.get('Content-Encoding') is None
+    small = client.get('/api/transactions?per_page=1', headers={**auth_headers, 'Accept-Encoding': 'gzip'})
+    assert small.headers.get('Content-Encoding') is None
+    assert small.json['items'][0]['date'] == '2024-01-28'
+
+def test_streamed_exports_are_compressed(app, client, auth_headers):
+    """Exports are gzipped chunk by chunk and decompress to the plain export."""
+    app.config['EXPORT_CHUNK_SIZE'] = 5
+    plain = client.get('/api/transactions/export?format=ndjson', headers=auth_headers).get_data()
+
+    response = client.get('/api/transactions/export?format=ndjson', headers={**auth_headers, 'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(response.get_data()) == plain
+    assert len(plain.splitlines()) == 28
@@ -0,0 +1,91 @@
+import gzip
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+
+@pytest.fixture
+def app_config():
+    return {
+        'COMPRESS_ALGORITHMS': 'gzip',
+    }
+
+def _create_transaction(client, headers, day=5, amount=100):
+    response = client.post('/api/transactions', headers=headers, json={
+        'date': f'2024-01-{day:02d}', 'amount': amount, 'type': 'income', 'category': 'service'
+    })
+    assert response.status_code == 201
+    return response.json['transaction']['id']
+
+def test_matching_etag_returns_not_modified_until_ledger_changes(app, client, auth_headers):
+    """A resource revalidates with 304 from one version lookup, until a write."""
+    transaction_id = _create_transaction(client, auth_headers)
+    url = f'/api/transactions/{transaction_id}'
+
+    first = client.get(url, headers=auth_headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert not etag.startswith('W/')
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+
+    statements = []
+    record = lambda *args: statements.append(args[2])
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        revalidated = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert revalidated.status_code == 304
+    assert revalidated.get_data() == b''
+    assert revalidated.headers['ETag'] == etag
+    # Only the ledger version was read
+    assert len(statements) == 1 and 'ledger_version' in statements[0]
+
+    # Other resources and other parameters have their own tags
+    assert client.get(f'{url}0', headers={**auth_headers, 'If-None-Match': etag}).status_code == 404
+    listed = client.get('/api/transactions?per_page=5', headers={**auth_headers, 'If-None-Match': etag})
+    assert listed.status_code == 200 and listed.headers['ETag'] != etag
+
+    response = client.put(url, headers=auth_headers, json={'amount': 150})
+    assert response.status_code == 200
+    changed = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.json['amount'] == 150.0
+    assert changed.headers['ETag'] != etag
+
+def test_etags_are_per_user(client, auth_headers, make_user):
+    """The same URL never revalidates across users."""
+    url = '/api/invoices/summary'
+    etag = client.get(url, headers=auth_headers).headers['ETag']
+
+    _, other_headers = make_user('other@example.com')
+    response = client.get(url, headers={**other_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_reports_revalidate_before_the_cache_and_per_encoding(client, auth_headers):
+    """Report tags skip the report cache and carry the content coding of the body."""
+    for day in range(1, 29):
+        _create_transaction(client, auth_headers, day=day, amount=day * 10)
+    url = '/api/reports/pivot?start_date=2024-01-01&end_date=2024-01-31&group_by=day,category'
+
+    plain = client.get(url, headers=auth_headers)
+    assert plain.headers['X-Cache'] == 'MISS'
+    revalidated = client.get(url, headers={**auth_headers, 'If-None-Match': plain.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert 'X-Cache' not in revalidated.headers
+
+    encoded = client.get(url, headers={**auth_headers, 'Accept-Encoding': 'gzip'})
+    assert encoded.headers['Content-Encoding'] == 'gzip'
+    assert encoded.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+    assert gzip.decompress(encoded.get_data()) == plain.get_data()
+
+    revalidated = client.get(url, headers={
+        **auth_headers, 'Accept-Encoding': 'gzip', 'If-None-Match': encoded.headers['ETag']
+    })
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == encoded.headers['ETag']
+    assert 'Accept-Encoding' in revalidated.headers['Vary']
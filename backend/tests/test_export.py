@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app import db
+from app.models import Client, Invoice, InvoiceItem, InvoiceStatus
+from app.services.transaction_service import TransactionService
+
+@pytest.fixture
+def app_config():
+    return {
+        'EXPORT_CHUNK_SIZE': 7,
+    }
+
+@pytest.fixture
+def auth_headers(app, user_id, auth_headers):
+    """Give the test user 50 transactions and two invoices; return auth headers."""
+    with app.app_context():
+        rows = [
+            {
+                'date': (date(2024, 1, 1) + timedelta(days=i)).isoformat(),
+                'amount': f'{i + 1}.25',
+                'type': 'income' if i % 2 else 'expense',
+                'category': 'service' if i % 2 else 'rent',
+                'description': f'Row, "{i}"',
+            }
+            for i in range(50)
+        ]
+        created, errors = TransactionService().bulk_create_transactions(user_id, rows)
+        assert created == 50 and not errors
+
+        acme = Client(name='Acme', user_id=user_id)
+        db.session.add(acme)
+        db.session.flush()
+
+        itemized = Invoice(
+            invoice_number='INV-1', issue_date=date(2024, 2, 1), due_date=date(2024, 3, 1),
+            status=InvoiceStatus.SENT, total=Decimal('300.00'), amount_due=Decimal('300.00'),
+            user_id=user_id, client_id=acme.id
+        )
+        empty = Invoice(
+            invoice_number='INV-2', issue_date=date(2024, 2, 2), due_date=date(2024, 3, 2),
+            status=InvoiceStatus.DRAFT, user_id=user_id, client_id=acme.id
+        )
+        itemized.items = [
+            InvoiceItem(description='Design', quantity=2, unit_price=Decimal('100.00'), amount=Decimal('200.00')),
+            InvoiceItem(description='Build', quantity=1, unit_price=Decimal('100.00'), amount=Decimal('100.00')),
+        ]
+        db.session.add_all([itemized, empty])
+        db.session.commit()
+    return auth_headers
+
+def test_transactions_csv_export(client, auth_headers):
+    """The CSV export streams every matching row, oldest first, with exact amounts."""
+    response = client.get('/api/transactions/export', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert 'transactions.csv' in response.headers['Content-Disposition']
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 50
+    assert [row['date'] for row in rows] == sorted(row['date'] for row in rows)
+    assert rows[0]['amount'] == '1.25'
+    assert rows[0]['type'] == 'expense'
+    assert rows[0]['description'] == 'Row, "0"'
+
+def test_transactions_ndjson_export_applies_filters(client, auth_headers):
+    """The NDJSON export takes the list filters and emits one object per line."""
+    response = client.get(
+        '/api/transactions/export?format=ndjson&type=income&start_date=2024-01-11',
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+
+    lines = response.get_data(as_text=True).splitlines()
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 20
+    assert all(record['type'] == 'income' for record in records)
+    assert all(record['date'] >= '2024-01-11' for record in records)
+    assert records[0]['amount'] == 12.25
+
+def test_export_rejects_bad_arguments(client, auth_headers):
+    """Unknown formats and malformed filters are rejected before streaming."""
+    assert client.get('/api/transactions/export?format=pdf', headers=auth_headers).status_code == 400
+    assert client.get('/api/transactions/export?start_date=2024-13-01', headers=auth_headers).status_code == 400
+    assert client.get('/api/invoices/export?format=xml', headers=auth_headers).status_code == 400
+
+def test_invoices_export_flattens_items(client, auth_headers):
+    """Each invoice item is its own row; invoices without items still get one."""
+    response = client.get('/api/invoices/export', headers=auth_headers)
+    assert response.status_code == 200
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(row['invoice_number'], row['item_description']) for row in rows] == [
+        ('INV-1', 'Design'), ('INV-1', 'Build'), ('INV-2', '')
+    ]
+    assert rows[0]['client_name'] == 'Acme'
+    assert rows[0]['status'] == 'sent'
+    assert rows[0]['item_amount'] == '200.00'
+
+    response = client.get('/api/invoices/export?format=ndjson&status=draft', headers=auth_headers)
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(records) == 1
+    assert records[0]['item_id'] is None
@@ -0,0 +1,179 @@
+import io
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app import db
+from app.models import User, Client, PeriodBalance, TransactionRollup, TransactionType, TransactionCategory
+from app.services.fx_service import FxService
+from app.services.report_engine import report_engine
+from app.services.transaction_service import TransactionService
+
+@pytest.fixture
+def app_config():
+    return {
+        'REPORT_CACHE_BACKEND': 'null',
+    }
+
+@pytest.fixture
+def ledger(app, user_id, auth_headers):
+    """Give the test user two years of random transactions; return (user_id, headers)."""
+    rng = random.Random(13)
+    with app.app_context():
+        rows = [
+            {
+                'date': (date(2022, 1, 1) + timedelta(days=rng.randrange(730))).isoformat(),
+                'amount': f'{rng.randrange(1, 50000) / 100:.2f}',
+                'type': rng.choice(list(TransactionType)).value,
+                'category': rng.choice(list(TransactionCategory)).value,
+            }
+            for _ in range(600)
+        ]
+        created, errors = TransactionService().bulk_create_transactions(user_id, rows)
+        assert created == len(rows) and not errors
+    return user_id, auth_headers
+
+REPORTS = [
+    '/api/reports/income-expense?start_date=2022-01-01&end_date=2023-12-31&group_by=month',
+    '/api/reports/income-expense?start_date=2022-03-01&end_date=2023-06-30&group_by=year',
+    '/api/reports/income-expense?start_date=2022-02-10&end_date=2023-03-20&group_by=month',
+    '/api/reports/income-expense?start_date=2022-01-01&end_date=2023-12-31&group_by=week',
+    '/api/reports/profit-loss?start_date=2022-01-01&end_date=2023-12-31',
+    '/api/reports/cash-flow?end_date=2023-12-31&months=18',
+    '/api/reports/tax-summary?year=2022',
+    '/api/reports/tax-summary?year=2023',
+    '/api/reports/pivot?group_by=year,category',
+    '/api/reports/bundle?start_date=2022-01-01&end_date=2023-12-31&year=2022',
+]
+
+def test_reports_are_unchanged_by_closing(app, client, ledger):
+    """Reports read snapshots for closed months and match the raw ledger."""
+    user_id, headers = ledger
+    before = [client.get(url, headers=headers).json for url in REPORTS]
+
+    response = client.post('/api/periods', headers=headers, json={
+        'start_date': '2022-01-01', 'end_date': '2022-12-31'
+    })
+    assert response.status_code == 201
+    assert response.json['period']['balances']
+
+    with app.app_context():
+        # 2022 is held as monthly snapshots rather than its daily rollups
+        frame = report_engine.frame(user_id)
+        snapshots = PeriodBalance.query.filter_by(user_id=user_id).count()
+        open_rows = TransactionRollup.query.filter(
+            TransactionRollup.user_id == user_id, TransactionRollup.day >= date(2023, 1, 1)
+        ).count()
+        assert frame.closed is not None
+        assert len(frame) == snapshots + open_rows
+
+    after = [client.get(url, headers=headers).json for url in REPORTS]
+    for url, expected, actual in zip(REPORTS, before, after):
+        assert actual == expected, url
+
+def test_foreign_currency_reports_are_unchanged_by_closing(app, client, user_id, auth_headers):
+    """Closed months in another currency still convert at each transaction's own day."""
+    with app.app_context():
+        rows = [
+            {'date': '2023-01-20', 'amount': '100.00', 'currency': 'EUR', 'type': 'income', 'category': 'service'},
+            {'date': '2023-01-25', 'amount': '30.00', 'type': 'expense', 'category': 'rent'},
+        ]
+        created, errors = TransactionService().bulk_create_transactions(user_id, rows)
+        assert created == 2 and not errors
+        FxService().load_csv(io.StringIO('date,currency,rate\n2023-01-01,EUR,0.5\n2023-01-15,EUR,1.0\n'))
+
+    urls = [
+        '/api/reports/profit-loss?start_date=2023-01-01&end_date=2023-01-31',
+        '/api/reports/profit-loss?start_date=2023-01-01&end_date=2023-01-31&reporting_currency=EUR',
+        '/api/reports/income-expense?start_date=2023-01-01&end_date=2023-12-31&group_by=month',
+        '/api/reports/bundle?start_date=2023-01-01&end_date=2023-12-31&year=2023',
+    ]
+    before = [client.get(url, headers=auth_headers).json for url in urls]
+    assert before[0]['totals']['total_income'] == 100.0
+
+    response = client.post('/api/periods', headers=auth_headers, json={
+        'start_date': '2023-01-01', 'end_date': '2023-01-31'
+    })
+    assert response.status_code == 201
+
+    after = [client.get(url, headers=auth_headers).json for url in urls]
+    for url, expected, actual in zip(urls, before, after):
+        assert actual == expected, url
+
+def test_closed_period_is_locked(app, client, ledger):
+    """Writes inside a closed period are rejected; the open tail stays writable."""
+    user_id, headers = ledger
+    response = client.post('/api/periods', headers=headers, json={
+        'start_date': '2022-01-01', 'end_date': '2022-06-30'
+    })
+    assert response.status_code == 201
+
+    response = client.post('/api/transactions', headers=headers, json={
+        'date': '2022-03-01', 'amount': 10, 'type': 'income', 'category': 'service'
+    })
+    assert response.status_code == 400
+    assert 'closed' in response.json['message']
+
+    response = client.post('/api/transactions', headers=headers, json={
+        'date': '2022-07-01', 'amount': 10, 'type': 'income', 'category': 'service'
+    })
+    assert response.status_code == 201
+    open_id = response.json['transaction']['id']
+
+    # Moving an open transaction into the closed period is a write to it too
+    response = client.put(f'/api/transactions/{open_id}', headers=headers, json={'date': '2022-06-30'})
+    assert response.status_code == 400
+
+    with app.app_context():
+        closed_id = next(
+            t.id for t in db.session.get(User, user_id).transactions if t.date <= date(2022, 6, 30)
+        )
+    assert client.delete(f'/api/transactions/{closed_id}', headers=headers).status_code == 400
+    assert client.put(f'/api/transactions/{closed_id}', headers=headers, json={'amount': 1}).status_code == 400
+
+    response = client.post('/api/transactions/bulk', headers=headers, json={'transactions': [
+        {'date': '2022-01-15', 'amount': 5, 'type': 'expense', 'category': 'rent'},
+        {'date': '2022-08-15', 'amount': 5, 'type': 'expense', 'category': 'rent'},
+    ]})
+    assert response.json['created'] == 1
+    assert response.json['errors'][0]['index'] == 0
+
+    with app.app_context():
+        customer = Client(name='Acme', user_id=user_id)
+        db.session.add(customer)
+        db.session.commit()
+        customer_id = customer.id
+    response = client.post('/api/invoices', headers=headers, json={
+        'client_id': customer_id, 'issue_date': '2022-05-01', 'due_date': '2022-05-31',
+        'items': [{'description': 'Work', 'quantity': 1, 'unit_price': 100}]
+    })
+    assert response.status_code == 400
+
+def test_close_and_reopen_rules(client, ledger):
+    """Periods are whole months, contiguous, over, and reopen newest first."""
+    _, headers = ledger
+
+    for start, end in [('2022-01-15', '2022-03-31'), ('2022-01-01', '2022-03-30'), ('2022-01-01', '2099-12-31')]:
+        response = client.post('/api/periods', headers=headers, json={'start_date': start, 'end_date': end})
+        assert response.status_code == 400, (start, end)
+
+    first = client.post('/api/periods', headers=headers, json={'start_date': '2022-01-01', 'end_date': '2022-03-31'})
+    assert first.status_code == 201
+
+    gap = client.post('/api/periods', headers=headers, json={'start_date': '2022-05-01', 'end_date': '2022-05-31'})
+    assert gap.status_code == 400
+
+    second = client.post('/api/periods', headers=headers, json={'start_date': '2022-04-01', 'end_date': '2022-06-30'})
+    assert second.status_code == 201
+    assert [p['end_date'] for p in client.get('/api/periods', headers=headers).json['items']] == [
+        '2022-03-31', '2022-06-30'
+    ]
+
+    assert client.delete(f'/api/periods/{first.json["period"]["id"]}', headers=headers).status_code == 400
+    assert client.delete(f'/api/periods/{second.json["period"]["id"]}', headers=headers).status_code == 200
+
+    response = client.post('/api/transactions', headers=headers, json={
+        'date': '2022-05-01', 'amount': 10, 'type': 'income', 'category': 'service'
+    })
+    assert response.status_code == 201
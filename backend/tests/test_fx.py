@@ -0,0 +1,153 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app import db
+from app.models import Client, FxRate
+from app.services.fx_service import FxService, fx_rates
+from app.services.invoice_service import InvoiceService
+from app.services.transaction_service import TransactionService
+
+ECB_CSV = """Date,USD,JPY,GBP,
+2024-01-12,1.25,160.5,N/A,
+2024-01-01,1.1111111111,155.0,0.86,
+"""
+
+@pytest.fixture
+def app_config():
+    return {
+        'FX_BASE_CURRENCY': 'USD',
+        'REPORTING_CURRENCY': 'USD',
+    }
+
+@pytest.fixture
+def auth_headers(app, user_id, auth_headers):
+    """Give the test user USD and EUR transactions and load EUR rates; return auth headers."""
+    with app.app_context():
+        rows = [
+            {'date': '2024-01-10', 'amount': '100.00', 'type': 'income', 'category': 'service'},
+            {'date': '2024-01-15', 'amount': '50.00', 'currency': 'eur', 'type': 'expense', 'category': 'rent'},
+            {'date': '2024-02-01', 'amount': '10.00', 'currency': 'EUR', 'type': 'income', 'category': 'service'},
+        ]
+        created, errors = TransactionService().bulk_create_transactions(user_id, rows)
+        assert created == 3 and not errors
+
+        FxService().load_csv(io.StringIO(ECB_CSV), base='EUR')
+    return auth_headers
+
+def test_load_csv_rebases_wide_files(app):
+    """An ECB-style file quoted in EUR is stored against FX_BASE_CURRENCY, skipping N/A cells."""
+    with app.app_context():
+        count = FxService().load_csv(io.StringIO(ECB_CSV), base='EUR')
+        assert count == 5
+
+        rates = {(rate.day, rate.currency): rate.rate for rate in FxRate.query.all()}
+        assert rates[(date(2024, 1, 12), 'EUR')] == Decimal('0.8')
+        assert rates[(date(2024, 1, 12), 'JPY')] == Decimal('128.4')
+        assert rates[(date(2024, 1, 1), 'EUR')] == Decimal('0.9')
+        assert (date(2024, 1, 12), 'GBP') not in rates
+        assert all(currency != 'USD' for _, currency in rates)
+
+        # Reloading replaces rates of the same days
+        count = FxService().load_csv(io.StringIO('date,currency,rate\n2024-01-12,EUR,0.75\n'))
+        assert count == 1
+        assert FxRate.query.filter_by(day=date(2024, 1, 12), currency='EUR').one().rate == Decimal('0.75')
+        assert FxRate.query.count() == 5
+
+        with pytest.raises(ValueError):
+            FxService().load_csv(io.StringIO('date,currency,rate\n2024-01-12,EUR,-1\n'))
+        with pytest.raises(ValueError):
+            FxService().load_csv(io.StringIO('date,currency,rate\n2024-01-12,JPY,160\n'), base='EUR')
+
+def test_cli_loads_rates(app, tmp_path):
+    """`flask fx load` reads a file from disk."""
+    path = tmp_path / 'rates.csv'
+    path.write_text('date,currency,rate\n2024-01-01,EUR,0.9\n2024-01-02,EUR,0.91\n')
+
+    result = app.test_cli_runner().invoke(args=['fx', 'load', str(path)])
+    assert result.exit_code == 0, result.output
+    assert 'Loaded 2 exchange rates' in result.output
+
+    with app.app_context():
+        assert fx_rates.convert_cents(1000, 'EUR', 'USD', date(2024, 3, 1)) == 1099
+
+def test_reports_convert_to_reporting_currency(client, auth_headers):
+    """Each amount is converted at the latest rate on or before its own day."""
+    report = client.get(
+        '/api/reports/profit-loss?start_date=2024-01-01&end_date=2024-01-31', headers=auth_headers
+    ).json
+    assert report['currency'] == 'USD'
+    assert report['totals'] == {'total_income': 100.0, 'total_expenses': 62.5, 'net_profit': 37.5}
+
+    report = client.get(
+        '/api/reports/profit-loss?start_date=2024-01-01&end_date=2024-01-31&reporting_currency=eur',
+        headers=auth_headers
+    ).json
+    assert report['currency'] == 'EUR'
+    assert report['totals'] == {'total_income': 90.0, 'total_expenses': 50.0, 'net_profit': 40.0}
+
+    summary = client.get('/api/transactions/summary?reporting_currency=EUR', headers=auth_headers).json
+    assert summary['currency'] == 'EUR'
+    assert summary['by_type'] == {'income': 100.0, 'expense': 50.0}
+
+    bundle = client.get(
+        '/api/reports/bundle?reports=income_expense,transaction_summary'
+        '&start_date=2024-01-01&end_date=2024-02-29&reporting_currency=EUR',
+        headers=auth_headers
+    ).json
+    assert [row['net'] for row in bundle['income_expense']['data']] == [40.0, 10.0]
+    assert bundle['transaction_summary']['net_income'] == 50.0
+
+    # Balances carried into February are converted at the rate of January 31st
+    report = client.get(
+        '/api/reports/cash-flow?end_date=2024-03-05&months=1&reporting_currency=EUR', headers=auth_headers
+    ).json
+    assert report['start_date'] == '2024-02-01'
+    assert report['totals']['opening_balance'] == 30.0
+    assert report['totals']['ending_balance'] == 40.0
+
+def test_reports_reject_missing_rates_and_bad_currencies(app, client, auth_headers, user_id):
+    """Amounts without a rate on or before their day fail the report instead of being dropped."""
+    with app.app_context():
+        TransactionService().create_transaction(
+            user_id, date='2024-01-20', amount='5.00', currency='CHF', type='expense', category='meals'
+        )
+
+    response = client.get(
+        '/api/reports/income-expense?start_date=2024-01-01&end_date=2024-01-31', headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert 'CHF' in response.json['message']
+
+    # Ranges without the CHF transaction still convert
+    response = client.get(
+        '/api/reports/income-expense?start_date=2024-02-01&end_date=2024-02-29', headers=auth_headers
+    )
+    assert response.status_code == 200
+
+    assert client.get('/api/reports/tax-summary?reporting_currency=EURO', headers=auth_headers).status_code == 400
+    assert client.get('/api/transactions/summary?reporting_currency=1', headers=auth_headers).status_code == 400
+
+def test_invoice_summary_converts_at_reference_date(app, client, auth_headers, user_id):
+    """Invoice totals in other currencies are converted at the rates of as_of."""
+    with app.app_context():
+        customer = Client(name='Acme', user_id=user_id)
+        db.session.add(customer)
+        db.session.commit()
+        for currency in ('USD', 'EUR'):
+            InvoiceService().create_invoice(user_id, **{
+                'client_id': customer.id, 'issue_date': '2024-01-05', 'due_date': '2024-02-05',
+                'currency': currency, 'items': [{'description': 'Work', 'quantity': 1, 'unit_price': 80}]
+            })
+
+    summary = client.get('/api/invoices/summary?as_of=2024-01-20', headers=auth_headers).json
+    assert summary['currency'] == 'USD'
+    assert summary['total_amount'] == 180.0
+    assert summary['by_client']['Acme']['count'] == 2
+
+    summary = client.get(
+        '/api/invoices/summary?as_of=2024-01-05&reporting_currency=EUR', headers=auth_headers
+    ).json
+    assert summary['total_amount'] == 152.0
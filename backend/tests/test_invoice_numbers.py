@@ -0,0 +1,97 @@
+import threading
+from datetime import date
+
+import pytest
+
+from app import db
+from app.models import Client, Invoice, InvoiceSequence
+from app.services.invoice_number_service import InvoiceNumberService
+from app.services.invoice_service import InvoiceService
+
+@pytest.fixture
+def app_config(tmp_path):
+    """Back the app by a file database so threads get their own connections."""
+    return {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "invoices.db"}',
+        'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': 30}},
+    }
+
+@pytest.fixture
+def owner(app, user_id):
+    """Give the test user one client; return (user_id, client_id)."""
+    with app.app_context():
+        customer = Client(name='Acme', user_id=user_id)
+        db.session.add(customer)
+        db.session.commit()
+        return user_id, customer.id
+
+def _invoice_data(client_id):
+    today = date.today().isoformat()
+    return {
+        'client_id': client_id,
+        'issue_date': today,
+        'due_date': today,
+        'items': [{'description': 'Work', 'quantity': 1, 'unit_price': 10}]
+    }
+
+def test_concurrent_creates_get_unique_numbers(app, owner):
+    """Many threads creating invoices at once never collide or fail."""
+    user_id, client_id = owner
+    threads_count, per_thread = 8, 10
+    errors = []
+    start = threading.Barrier(threads_count)
+
+    def worker():
+        service = InvoiceService()
+        start.wait()
+        for _ in range(per_thread):
+            with app.app_context():
+                try:
+                    service.create_invoice(user_id, **_invoice_data(client_id))
+                except Exception as e:
+                    errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with app.app_context():
+        numbers = [number for (number,) in db.session.query(Invoice.invoice_number)]
+        sequence = InvoiceSequence.query.filter_by(user_id=user_id).one()
+
+    total = threads_count * per_thread
+    prefix = f'INV-{date.today():%Y%m}-'
+    assert sorted(numbers) == [f'{prefix}{n:04d}' for n in range(1, total + 1)]
+    assert sequence.last_value == total
+
+def test_number_format_and_reset_policy(app, owner):
+    """Formats are configurable and yearly sequences span months."""
+    user_id, _ = owner
+    service = InvoiceNumberService(number_format='{year}/{seq:05d}', reset='yearly')
+
+    with app.app_context():
+        assert service.next_number(user_id, date(2024, 1, 31)) == '2024/00001'
+        assert service.next_number(user_id, date(2024, 2, 1)) == '2024/00002'
+        assert service.next_number(user_id, date(2025, 1, 1)) == '2025/00001'
+        db.session.commit()
+
+    with pytest.raises(ValueError):
+        InvoiceNumberService(reset='weekly')
+
+def test_seed_sequences_from_existing_invoices(app, owner):
+    """Seeding continues numbering after the highest existing number."""
+    user_id, client_id = owner
+    with app.app_context():
+        for number in ('INV-202403-0007', 'INV-202403-0012', 'legacy-1'):
+            db.session.add(Invoice(
+                invoice_number=number, issue_date=date(2024, 3, 1), due_date=date(2024, 3, 1),
+                user_id=user_id, client_id=client_id
+            ))
+        db.session.commit()
+
+        service = InvoiceNumberService()
+        assert service.seed_from_invoices() == 1
+        assert service.next_number(user_id, date(2024, 3, 15)) == 'INV-202403-0013'
@@ -0,0 +1,110 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app import db
+from app.models import Client, Invoice, InvoiceStatus
+
+@pytest.fixture
+def auth_headers(app, user_id, auth_headers):
+    """Give the test user invoices for two clients and return auth headers."""
+    with app.app_context():
+        acme = Client(name='Acme', user_id=user_id)
+        globex = Client(name='Globex', user_id=user_id)
+        db.session.add_all([acme, globex])
+        db.session.flush()
+
+        for number, client_, status, total, paid, due_date in [
+            ('INV-1', acme, InvoiceStatus.PAID, '100.10', '100.10', date(2024, 1, 31)),
+            ('INV-2', acme, InvoiceStatus.SENT, '200.20', '0', date(2024, 3, 20)),
+            ('INV-3', globex, InvoiceStatus.PARTIALLY_PAID, '0.30', '0.10', date(2024, 2, 15)),
+            ('INV-4', globex, InvoiceStatus.OVERDUE, '50.00', '0', date(2023, 11, 1)),
+        ]:
+            total, paid = Decimal(total), Decimal(paid)
+            db.session.add(Invoice(
+                invoice_number=number, issue_date=date(2024, 1, 1), due_date=due_date,
+                status=status, total=total, amount_paid=paid, amount_due=total - paid,
+                user_id=user_id, client_id=client_.id
+            ))
+        db.session.commit()
+    return auth_headers
+
+def test_summary_totals_are_exact(client, auth_headers):
+    """Totals are summed in SQL in whole cents, per status and per client."""
+    response = client.get('/api/invoices/summary', headers=auth_headers)
+    assert response.status_code == 200
+    summary = response.json
+
+    assert summary['total_invoices'] == 4
+    assert summary['total_amount'] == 350.6
+    assert summary['total_paid'] == 100.2
+    assert summary['total_due'] == 250.4
+    assert summary['by_status']['paid'] == {'count': 1, 'amount': 100.1}
+    assert summary['by_client'] == {
+        'Acme': {'count': 2, 'amount': 300.3},
+        'Globex': {'count': 2, 'amount': 50.3},
+    }
+    assert 'aging' not in summary
+
+def test_summary_aging_buckets(client, auth_headers):
+    """Open invoices are bucketed by days past due as of the given date."""
+    response = client.get('/api/invoices/summary?aging=true&as_of=2024-03-01', headers=auth_headers)
+    aging = response.json['aging']
+
+    assert set(aging) == {'current', '1_30', '31_60', '61_90', 'over_90'}
+    assert aging['current'] == {'count': 1, 'amount': 200.2}
+    assert aging['1_30'] == {'count': 1, 'amount': 0.2}
+    assert aging['over_90'] == {'count': 1, 'amount': 50.0}
+    assert aging['31_60']['count'] == 0
+
+def test_ar_aging_per_client(client, auth_headers):
+    """The aging report buckets each client's open invoices and drills down into one client."""
+    response = client.get('/api/reports/ar-aging?as_of=2024-03-01', headers=auth_headers)
+    assert response.status_code == 200
+    report = response.json
+
+    assert report['as_of'] == '2024-03-01'
+    assert report['buckets'] == ['current', '1_30', '31_60', '61_90', 'over_90']
+    assert report['totals']['total'] == {'count': 3, 'amount': 250.4}
+    assert [entry['client_name'] for entry in report['clients']] == ['Acme', 'Globex']
+
+    globex = report['clients'][1]
+    assert globex['buckets']['1_30'] == {'count': 1, 'amount': 0.2}
+    assert globex['buckets']['over_90'] == {'count': 1, 'amount': 50.0}
+    assert globex['buckets']['current'] == {'count': 0, 'amount': 0.0}
+    assert 'invoices' not in report
+
+    response = client.get(
+        f'/api/reports/ar-aging?as_of=2024-03-01&client_id={globex["client_id"]}', headers=auth_headers
+    )
+    report = response.json
+    assert [entry['client_name'] for entry in report['clients']] == ['Globex']
+    assert [
+        (invoice['invoice_number'], invoice['days_overdue'], invoice['bucket'], invoice['amount_due'])
+        for invoice in report['invoices']
+    ] == [('INV-4', 121, 'over_90', 50.0), ('INV-3', 15, '1_30', 0.2)]
+
+    assert client.get('/api/reports/ar-aging?as_of=03-01-2024', headers=auth_headers).status_code == 400
+    assert client.get('/api/reports/ar-aging?client_id=acme', headers=auth_headers).status_code == 400
+
+def test_ar_aging_uses_due_date_index(app, auth_headers, user_id):
+    """The grouped aging query reads open invoices through the (user_id, status, due_date) index."""
+    from sqlalchemy import event
+    from app.services.invoice_service import InvoiceService
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            InvoiceService().get_ar_aging(user_id, as_of=date(2024, 3, 1))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+        statement, parameters = next(s for s in statements if 'GROUP BY' in s[0])
+        plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+        assert any('ix_invoices_user_status_due_date' in row[-1] for row in plan), plan
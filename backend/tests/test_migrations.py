@@ -0,0 +1,107 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Transaction, User
+
+MIGRATIONS = str(Path(__file__).resolve().parents[1] / 'migrations')
+
+# The tables the migrations alter, as databases created before them have them
+OLD_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL, email VARCHAR(120) NOT NULL, password_hash VARCHAR(256) NOT NULL,
+    first_name VARCHAR(64) NOT NULL, last_name VARCHAR(64) NOT NULL, role VARCHAR(10) NOT NULL,
+    is_active BOOLEAN NOT NULL, created_at DATETIME, updated_at DATETIME, last_login DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE TABLE invoices (
+    id INTEGER NOT NULL, invoice_number VARCHAR(50) NOT NULL, issue_date DATE NOT NULL,
+    due_date DATE NOT NULL, status VARCHAR(14) NOT NULL, notes TEXT, terms TEXT, tax_rate NUMERIC(5, 2),
+    subtotal NUMERIC(12, 2), tax_amount NUMERIC(12, 2), total NUMERIC(12, 2), amount_paid NUMERIC(12, 2),
+    amount_due NUMERIC(12, 2), currency VARCHAR(3), created_at DATETIME, updated_at DATETIME,
+    user_id INTEGER NOT NULL, client_id INTEGER NOT NULL, project_id INTEGER,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE UNIQUE INDEX ix_invoices_invoice_number ON invoices (invoice_number);
+CREATE TABLE transactions (
+    id INTEGER NOT NULL, date DATE NOT NULL, amount NUMERIC(12, 2) NOT NULL, description TEXT,
+    reference VARCHAR(100), is_reconciled BOOLEAN, receipt_url VARCHAR(255), created_at DATETIME,
+    updated_at DATETIME, type VARCHAR(8) NOT NULL, category VARCHAR(21) NOT NULL, user_id INTEGER NOT NULL,
+    project_id INTEGER, invoice_id INTEGER,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE INDEX ix_transactions_date ON transactions (date);
+INSERT INTO users (id, email, password_hash, first_name, last_name, role, is_active)
+VALUES (1, 'old@example.com', 'x', 'Old', 'User', 'STAFF', 1);
+INSERT INTO transactions (id, date, amount, type, category, user_id)
+VALUES (1, '2023-05-01', 12.50, 'EXPENSE', 'RENT', 1);
+INSERT INTO invoices (id, invoice_number, issue_date, due_date, status, user_id, client_id)
+VALUES (1, 'INV-202403-0001', '2024-03-01', '2024-03-31', 'SENT', 1, 1);
+"""
+
+@pytest.fixture
+def schema():
+    """SQL run on the database before the app creates its missing tables."""
+    return OLD_SCHEMA
+
+@pytest.fixture
+def app_config(tmp_path, schema):
+    path = tmp_path / 'app.db'
+    connection = sqlite3.connect(path)
+    connection.executescript(schema)
+    connection.close()
+    return {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+    }
+
+def _columns(table):
+    return {column['name'] for column in inspect(db.engine).get_columns(table)}
+
+def _indexes(table):
+    return {index['name']: index for index in inspect(db.engine).get_indexes(table)}
+
+def test_upgrade_migrates_an_older_database(app):
+    """`flask db upgrade` adds the new columns to existing tables and backfills them."""
+    with app.app_context():
+        assert 'ledger_version' not in _columns('users')
+
+        upgrade(directory=MIGRATIONS)
+
+        user = db.session.get(User, 1)
+        assert user.ledger_version == 0
+
+        transaction = db.session.get(Transaction, 1)
+        assert (transaction.currency, transaction.import_hash) == ('USD', None)
+        assert _indexes('transactions')['uq_transactions_user_import_hash']['unique']
+
+        assert not _indexes('invoices')['ix_invoices_invoice_number']['unique']
+        # Another user may be issued the same invoice number, the same user may not
+        insert = text(
+            "INSERT INTO invoices (invoice_number, issue_date, due_date, status, user_id, client_id) "
+            "VALUES ('INV-202403-0001', '2024-03-01', '2024-03-31', 'DRAFT', :user_id, 1)"
+        )
+        db.session.execute(insert, {'user_id': 2})
+        db.session.commit()
+        with pytest.raises(IntegrityError):
+            db.session.execute(insert, {'user_id': 1})
+        db.session.rollback()
+
+    # Indexes over the new columns can be created once they exist
+    result = app.test_cli_runner().invoke(args=['indexes', 'sync'])
+    assert result.exit_code == 0, result.output
+    assert 'Created ix_transactions_user_date_totals' in result.output
+
+@pytest.mark.parametrize('schema', [''])
+def test_upgrade_is_a_no_op_on_a_new_database(app):
+    """Tables created by create_app() already have the current schema."""
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        assert 'ledger_version' in _columns('users')
+        assert {'import_hash', 'currency'} <= _columns('transactions')
+        assert not _indexes('invoices')['ix_invoices_invoice_number']['unique']
@@ -0,0 +1,114 @@
+from decimal import Decimal
+
+import pytest
+
+from app import db
+from app.models import Client
+from app.services.transaction_service import TransactionService
+from app.utils.money import Money
+
+@pytest.fixture
+def user(app, user_id, auth_headers):
+    """Give the test user a client; return (user_id, client_id, headers)."""
+    with app.app_context():
+        customer = Client(name='Acme', user_id=user_id)
+        db.session.add(customer)
+        db.session.commit()
+        return user_id, customer.id, auth_headers
+
+def test_money_arithmetic_is_exact():
+    """Amounts are whole cents: parsing rounds half up and sums never drift."""
+    assert Money.of('10.005').cents == 1001
+    assert Money.of(Decimal('-0.005')).cents == -1
+    assert Money.of(0.1).cents == 10
+    assert str(Money.of('3')) == '3.00'
+    assert Money.of('19.99') * Decimal('0.075') == Money.of('1.50')
+
+    total = Money.sum(['0.10'] * 1000)
+    assert total == Money(10000)
+    assert total.to_json() == 100.0
+    assert sum([Money.of('0.10')] * 3) == Money.of('0.30')
+
+    with pytest.raises(ValueError):
+        Money.of('abc')
+    with pytest.raises(ValueError):
+        Money.of('NaN')
+    with pytest.raises(ValueError):
+        Money.of('1', 'USD') + Money.of('1', 'EUR')
+
+    # Equal values hash alike, so Money and numbers mix in sets and dict keys
+    assert Money(500) == Decimal('5') and hash(Money(500)) == hash(Decimal('5'))
+    assert {Money(500), Decimal('5.00'), 5} == {5}
+    assert len({Money(500, 'USD'), Money(500, 'EUR')}) == 2
+
+def test_transaction_summary_sums_cents(app, client, user):
+    """The summary endpoint sums integer cents, so many small amounts add up exactly."""
+    user_id, _, headers = user
+    with app.app_context():
+        rows = [
+            {'date': '2024-01-01', 'amount': '0.10', 'type': 'income', 'category': 'service'}
+            for _ in range(999)
+        ] + [{'date': '2024-01-02', 'amount': '0.20', 'type': 'expense', 'category': 'software'}]
+        created, errors = TransactionService().bulk_create_transactions(user_id, rows)
+        assert created == 1000 and not errors
+
+    summary = client.get('/api/transactions/summary', headers=headers).json
+    assert summary['total_income'] == 99.9
+    assert summary['total_expenses'] == 0.2
+    assert summary['net_income'] == 99.7
+    assert summary['by_type'] == {'income': 99.9, 'expense': 0.2}
+    assert summary['by_category'] == {'service': 99.9, 'software': 0.2}
+
+    summary = client.get('/api/transactions/summary?start_date=2024-01-02', headers=headers).json
+    assert summary['total_income'] == 0
+
+def test_tax_summary_rounds_to_cents(app, client, user):
+    """Net profit and estimated tax are computed in cents, not from rounded floats."""
+    user_id, _, headers = user
+    with app.app_context():
+        rows = [
+            {'date': '2024-03-01', 'amount': '1.45', 'type': 'income', 'category': 'service'},
+            {'date': '2024-03-02', 'amount': '0.10', 'type': 'expense', 'category': 'software'},
+        ]
+        created, errors = TransactionService().bulk_create_transactions(user_id, rows)
+        assert created == 2 and not errors
+
+    tax = client.get('/api/reports/tax-summary?year=2024', headers=headers).json['tax_categories']
+    assert tax['net_profit'] == 1.35
+    assert tax['estimated_tax'] == 0.41
+
+def test_invoice_amounts_round_to_cents(client, user):
+    """Item amounts and invoice totals are rounded half up to whole cents."""
+    _, client_id, headers = user
+    response = client.post('/api/invoices', headers=headers, json={
+        'client_id': client_id, 'issue_date': '2024-01-01', 'due_date': '2024-01-31',
+        'tax_rate': 7.5,
+        'items': [
+            {'description': 'Thirds', 'quantity': 3, 'unit_price': 0.333},
+            {'description': 'Taxed', 'quantity': 1, 'unit_price': 10, 'tax_rate': 0.05},
+        ]
+    })
+    assert response.status_code == 201
+    invoice = response.json['invoice']
+
+    assert [item['amount'] for item in invoice['items']] == [0.99, 10.01]
+    assert invoice['subtotal'] == 11.0
+    assert invoice['tax_amount'] == 0.83
+    assert invoice['total'] == 11.83
+    assert invoice['amount_due'] == 11.83
+
+def test_transaction_updates_parse_amounts_like_creates(client, user):
+    """Updated amounts are rounded to cents, and non-finite ones are rejected up front."""
+    _, _, headers = user
+    response = client.post('/api/transactions', headers=headers, json={
+        'date': '2024-01-01', 'amount': '10.00', 'type': 'income', 'category': 'service'
+    })
+    transaction_id = response.json['transaction']['id']
+
+    response = client.put(f'/api/transactions/{transaction_id}', headers=headers, json={'amount': '12.345'})
+    assert response.status_code == 200
+    assert response.json['transaction']['amount'] == 12.35
+
+    for amount in ('NaN', 'Infinity', 'abc'):
+        response = client.put(f'/api/transactions/{transaction_id}', headers=headers, json={'amount': amount})
+        assert response.status_code == 400, amount
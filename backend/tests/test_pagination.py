@@ -0,0 +1,45 @@
+from app.utils.pagination import encode_cursor
+
+def test_cursor_pagination_walks_every_row_once(client, auth_headers):
+    """Following next_cursor visits all rows in (date, created_at, id) order."""
+    for i in range(7):
+        client.post('/api/transactions', headers=auth_headers, json={
+            'date': f'2024-01-0{1 + i % 3}', 'amount': i + 1,
+            'type': 'income', 'category': 'service'
+        })
+
+    seen = []
+    cursor = ''
+    while True:
+        response = client.get(
+            f'/api/transactions?per_page=3&include_total=true&cursor={cursor}',
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json['total'] == 7
+        seen.extend((item['date'], item['id']) for item in response.json['items'])
+        cursor = response.json['next_cursor']
+        if cursor is None:
+            assert response.json['has_more'] is False
+            break
+
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+    assert seen == sorted(seen, reverse=True)
+
+def test_cursor_mode_omits_total_by_default(client, auth_headers):
+    response = client.get('/api/invoices?cursor=', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json == {'items': [], 'next_cursor': None, 'has_more': False, 'total': None}
+
+def test_invalid_cursor_is_rejected(client, auth_headers):
+    response = client.get('/api/transactions?cursor=not-a-cursor', headers=auth_headers)
+    assert response.status_code == 400
+
+    response = client.get(f'/api/transactions?cursor={encode_cursor([1])}', headers=auth_headers)
+    assert response.status_code == 400
+
+    # Well-formed cursors whose values have the wrong types
+    for values in ([[2024], 1, 1], ['2024-01-01', {'id': 1}, 1], ['2024-01-01', '2024-01-01T00:00:00', [1]]):
+        response = client.get(f'/api/transactions?cursor={encode_cursor(values)}', headers=auth_headers)
+        assert response.status_code == 400, values
@@ -0,0 +1,113 @@
+from decimal import Decimal
+
+import pytest
+
+from app import db
+from app.models import Client, Project, ProjectRollup, Transaction
+from app.services.rollup_service import RollupService
+from app.services.transaction_service import TransactionService
+
+@pytest.fixture
+def ledger(app, user_id, auth_headers):
+    """Give the test user two projects and their transactions; return (user_id, project IDs, headers)."""
+    with app.app_context():
+        customer = Client(name='Acme', user_id=user_id)
+        db.session.add(customer)
+        db.session.flush()
+
+        alpha = Project(name='Alpha', budget=Decimal('1000.00'), hourly_rate=Decimal('80.00'),
+                        client_id=customer.id, user_id=user_id)
+        beta = Project(name='Beta', is_active=False, client_id=customer.id, user_id=user_id)
+        db.session.add_all([alpha, beta])
+        db.session.commit()
+
+        service = TransactionService()
+        for day, amount, txn_type, project in [
+            ('2024-01-15', '600.00', 'income', alpha),
+            ('2024-01-20', '200.00', 'expense', alpha),
+            ('2024-02-03', '100.00', 'expense', alpha),
+            ('2024-03-01', '100.00', 'income', beta),
+            ('2024-03-02', '999.00', 'expense', None),
+        ]:
+            service.create_transaction(
+                user_id, date=day, amount=amount, type=txn_type,
+                category='service' if txn_type == 'income' else 'contractor',
+                project_id=project.id if project else None
+            )
+        created, errors = service.bulk_create_transactions(user_id, [
+            {'date': '2024-02-10', 'amount': '50.00', 'type': 'expense', 'category': 'software',
+             'project_id': alpha.id},
+        ])
+        assert created == 1 and not errors
+        return user_id, (alpha.id, beta.id), auth_headers
+
+def _project_rollups(app):
+    with app.app_context():
+        return sorted(
+            (r.project_id, r.month.isoformat(), r.type.value, r.currency, Decimal(r.total_amount), r.transaction_count)
+            for r in ProjectRollup.query.all()
+        )
+
+def test_project_rollups_follow_writes(app, ledger):
+    """Creates, bulk inserts, updates and deletes keep the monthly project rollups in sync."""
+    user_id, (alpha_id, beta_id), _ = ledger
+    alpha_february = [
+        row for row in _project_rollups(app) if row[0] == alpha_id and row[1] == '2024-02-01'
+    ]
+    assert alpha_february == [(alpha_id, '2024-02-01', 'expense', 'USD', Decimal('150.00'), 2)]
+
+    with app.app_context():
+        service = TransactionService()
+        moved = Transaction.query.filter_by(user_id=user_id, amount=Decimal('100.00'), project_id=alpha_id).one()
+        service.update_transaction(moved, project_id=beta_id, date='2024-03-05')
+        removed = Transaction.query.filter_by(user_id=user_id, amount=Decimal('600.00')).one()
+        service.delete_transaction(removed.id, user_id)
+
+    incremental = _project_rollups(app)
+    assert (alpha_id, '2024-01-01', 'income', 'USD', Decimal('600.00'), 1) not in incremental
+    assert (beta_id, '2024-03-01', 'expense', 'USD', Decimal('100.00'), 1) in incremental
+
+    with app.app_context():
+        RollupService().rebuild(user_id=user_id)
+    assert _project_rollups(app) == incremental
+
+def test_project_report_margin_and_burn(client, ledger):
+    """Each project gets income, expense, margin and a running budget burn per month."""
+    _, (alpha_id, beta_id), headers = ledger
+
+    response = client.get('/api/reports/projects', headers=headers)
+    assert response.status_code == 200
+    report = response.json
+    assert [project['name'] for project in report['projects']] == ['Alpha', 'Beta']
+
+    alpha = report['projects'][0]
+    assert alpha['income'] == 600.0
+    assert alpha['expense'] == 350.0
+    assert alpha['margin'] == 250.0
+    assert alpha['margin_percent'] == 41.67
+    assert alpha['budget'] == 1000.0
+    assert alpha['budget_remaining'] == 650.0
+    assert alpha['budget_burn'] == 0.35
+    assert [(p['period'], p['expense'], p['budget_burn']) for p in alpha['periods']] == [
+        ('2024-01', 200.0, 0.2), ('2024-02', 150.0, 0.35)
+    ]
+
+    beta = report['projects'][1]
+    assert beta['budget'] is None and beta['budget_burn'] is None
+    assert report['totals'] == {'total_income': 700.0, 'total_expense': 350.0, 'margin': 350.0}
+
+    # Burn counts spending before the range; totals only cover the range
+    report = client.get('/api/reports/projects?start_date=2024-02-14&active=true', headers=headers).json
+    assert report['start_date'] == '2024-02-01'
+    assert [project['name'] for project in report['projects']] == ['Alpha']
+    alpha = report['projects'][0]
+    assert alpha['income'] == 0.0
+    assert alpha['expense'] == 150.0
+    assert alpha['budget_burn'] == 0.35
+    assert [p['period'] for p in alpha['periods']] == ['2024-02']
+
+    report = client.get(f'/api/reports/projects?project_id={beta_id}', headers=headers).json
+    assert [project['id'] for project in report['projects']] == [beta_id]
+
+    assert client.get('/api/reports/projects?project_id=x', headers=headers).status_code == 400
+    assert client.get('/api/reports/projects?end_date=2024-02', headers=headers).status_code == 400
@@ -0,0 +1,82 @@
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Client, Invoice, InvoiceItem
+
+@pytest.fixture
+def query_budget(app):
+    """Fail when the statements executed inside the block exceed a budget.
+
+    Usage: ``with query_budget(3): client.get(...)``
+    """
+    @contextmanager
+    def guard(budget):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+
+        assert len(statements) <= budget, (
+            f'{len(statements)} queries executed, budget is {budget}:\n' + '\n'.join(statements)
+        )
+
+    return guard
+
+def _seed(app, user_id, invoice_count):
+    with app.app_context():
+        customer = Client(name='Acme', user_id=user_id)
+        db.session.add(customer)
+        db.session.flush()
+
+        for number in range(invoice_count):
+            invoice = Invoice(
+                invoice_number=f'INV-{number:04d}', issue_date=date(2024, 1, 1),
+                due_date=date(2024, 1, 31), total=Decimal('30'), amount_due=Decimal('30'),
+                user_id=user_id, client_id=customer.id
+            )
+            for _ in range(3):
+                invoice.items.append(InvoiceItem(
+                    description='Work', quantity=1, unit_price=Decimal('10'), amount=Decimal('10')
+                ))
+            db.session.add(invoice)
+        db.session.commit()
+        return Invoice.query.order_by(Invoice.id).first().id
+
+@pytest.mark.parametrize('invoice_count', [5, 40])
+def test_invoice_list_query_count_is_constant(app, client, user_id, auth_headers, query_budget, invoice_count):
+    """Listing a page of invoices does not lazy-load items per invoice."""
+    _seed(app, user_id, invoice_count)
+
+    # ledger version (ETag) + count + page + items
+    with query_budget(4):
+        response = client.get('/api/invoices?per_page=50', headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json['items']) == invoice_count
+    assert all(len(invoice['items']) == 3 for invoice in response.json['items'])
+
+    # ledger version (ETag) + page + items
+    with query_budget(3):
+        response = client.get('/api/invoices?cursor=&per_page=50', headers=auth_headers)
+    assert len(response.json['items']) == invoice_count
+
+def test_invoice_detail_query_budget(app, client, user_id, auth_headers, query_budget):
+    """A single invoice is served with its items, client and project in two queries, plus its ETag's."""
+    invoice_id = _seed(app, user_id, 1)
+
+    with query_budget(3):
+        response = client.get(f'/api/invoices/{invoice_id}', headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json['items']) == 3
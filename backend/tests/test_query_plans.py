@@ -0,0 +1,138 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, select
+
+from app import db
+from app.models import Client, Project, Transaction
+from app.services.seed_service import SeedService
+from app.services.sync_service import SyncService
+
+# Every list, export and report endpoint, with each filter that picks its own index
+ENDPOINTS = [
+    '/api/transactions',
+    '/api/transactions?type=expense',
+    '/api/transactions?category=rent',
+    '/api/transactions?project_id={project_id}',
+    '/api/transactions?start_date=2024-01-01&end_date=2024-03-31',
+    '/api/transactions?cursor=',
+    '/api/transactions?cursor=&type=income',
+    '/api/transactions/export',
+    '/api/transactions/summary',
+    '/api/transactions/summary?start_date=2024-01-01',
+    '/api/invoices',
+    '/api/invoices?status=paid',
+    '/api/invoices?client_id={client_id}',
+    '/api/invoices?cursor=',
+    '/api/invoices/export',
+    '/api/invoices/summary?aging=true',
+    '/api/clients',
+    '/api/clients?active=true',
+    '/api/reports/income-expense',
+    '/api/reports/profit-loss',
+    '/api/reports/cash-flow',
+    '/api/reports/tax-summary',
+    '/api/reports/pivot?group_by=month,project',
+    '/api/reports/bundle',
+    '/api/reports/ar-aging',
+    '/api/reports/ar-aging?client_id={client_id}',
+    '/api/reports/projects',
+    '/api/sync',
+    '/api/sync?since={sync_token}',
+]
+
+@pytest.fixture
+def app_config():
+    return {
+        'REPORT_CACHE_BACKEND': 'null',
+    }
+
+@pytest.fixture
+def ledger(app):
+    """Seed several users' ledgers and analyze them; return (URL parameters, auth headers) of one user."""
+    with app.app_context():
+        totals = SeedService(seed=7, chunk_size=2000).seed(users=3, transactions=1000, invoices=80, years=2)
+        user_id = totals['user_ids'][1]
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+
+        params = {
+            'project_id': Project.query.filter_by(user_id=user_id).first().id,
+            'client_id': Client.query.filter_by(user_id=user_id).first().id,
+            'sync_token': SyncService().changes(user_id, limit=1)['next_token'],
+        }
+        token = create_access_token(identity=user_id)
+    return params, {'Authorization': f'Bearer {token}'}
+
+def _full_scans(app, run):
+    """Run a callable and return (statement, plan detail) for each SELECT that scans a whole table."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        tables = set(db.metadata.tables)
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            run()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+        scans = []
+        for statement, parameters in statements:
+            plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+            scans.extend(
+                (statement, row[-1]) for row in plan
+                # Subqueries show up as SCAN of their alias, which is not a table
+                if row[-1].startswith('SCAN ') and row[-1].split()[1] in tables
+            )
+        return scans
+
+def test_endpoints_use_indexes(app, client, ledger):
+    """No list, export or report query falls back to a full table scan."""
+    params, headers = ledger
+    failures = []
+    for endpoint in ENDPOINTS:
+        url = endpoint.format(**params)
+
+        def fetch():
+            response = client.get(url, headers=headers)
+            response.get_data()
+            assert response.status_code == 200, (url, response.json)
+
+        failures.extend(
+            f'{url}: {detail}\n    {" ".join(statement.split())}'
+            for statement, detail in _full_scans(app, fetch)
+        )
+
+    assert not failures, 'Full table scans:\n' + '\n'.join(failures)
+
+def test_full_scans_are_detected(app, ledger):
+    """The check flags a query that no index serves."""
+    def unindexed():
+        db.session.execute(select(Transaction.id).where(Transaction.description == 'Coffee')).all()
+
+    scans = _full_scans(app, unindexed)
+    assert [detail for _, detail in scans] == ['SCAN transactions']
+
+def test_cli_syncs_indexes(app):
+    """`flask indexes sync` adds declared indexes to an older database and prunes dropped ones."""
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('DROP INDEX ix_transactions_user_type_date_created_id')
+            connection.exec_driver_sql('CREATE INDEX ix_transactions_date ON transactions (date)')
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['indexes', 'sync'])
+    assert result.exit_code == 0, result.output
+    assert 'Created ix_transactions_user_type_date_created_id' in result.output
+    assert 'Unused index ix_transactions_date' in result.output
+
+    result = runner.invoke(args=['indexes', 'sync', '--prune'])
+    assert 'Dropped ix_transactions_date' in result.output
+
+    with app.app_context():
+        names = {index['name'] for index in db.inspect(db.engine).get_indexes('transactions')}
+    assert 'ix_transactions_user_type_date_created_id' in names
+    assert 'ix_transactions_date' not in names
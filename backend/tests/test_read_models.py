@@ -0,0 +1,91 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app import db
+from app.models import Client, Invoice, Transaction
+from app.models.read_models import ClientRow, InvoiceRow, TransactionRow
+from app.services.invoice_service import InvoiceService
+from app.services.transaction_service import TransactionService
+
+@pytest.fixture
+def auth_headers(app, user_id, auth_headers):
+    """Give the test user clients, invoices and transactions; return auth headers."""
+    with app.app_context():
+        acme = Client(name='Acme', email='billing@acme.test', user_id=user_id)
+        dormant = Client(name='Dormant', is_active=False, user_id=user_id)
+        db.session.add_all([acme, dormant])
+        db.session.commit()
+
+        transactions = TransactionService()
+        transactions.create_transaction(
+            user_id, date='2024-01-05', amount='19.99', type='expense', category='software',
+            description='Editor licence'
+        )
+        transactions.create_transaction(
+            user_id, date='2024-01-06', amount='1200', currency='EUR', type='income', category='service'
+        )
+
+        invoices = InvoiceService()
+        invoices.create_invoice(user_id, **{
+            'client_id': acme.id, 'issue_date': '2024-01-10', 'due_date': '2024-02-10', 'tax_rate': 7.5,
+            'items': [
+                {'description': 'Design', 'quantity': 1.5, 'unit_price': 80, 'tax_rate': 0},
+                {'description': 'Hosting', 'quantity': 1, 'unit_price': '12.34'},
+            ]
+        })
+        # Invoices created by the service always have items; an empty one lists with none
+        db.session.add(Invoice(
+            invoice_number='INV-EMPTY', issue_date=date(2024, 1, 11), due_date=date(2024, 2, 11),
+            user_id=user_id, client_id=dormant.id
+        ))
+        db.session.commit()
+    return auth_headers
+
+def test_read_models_serialize_like_orm_models(app, auth_headers):
+    """Each read model's to_dict() matches its ORM model's, value types included."""
+    with app.app_context():
+        for model, read_model in ((Transaction, TransactionRow), (Invoice, InvoiceRow), (Client, ClientRow)):
+            expected = [instance.to_dict() for instance in model.query.order_by(model.id)]
+            rows = read_model.from_rows(read_model.select(model.query.order_by(model.id)))
+            actual = [row.to_dict() for row in rows]
+            assert actual == expected
+            for expected_row, actual_row in zip(expected, actual):
+                assert {key: type(value) for key, value in actual_row.items() if key != 'items'} == \
+                       {key: type(value) for key, value in expected_row.items() if key != 'items'}
+
+def test_list_endpoints_use_read_models(app, client, auth_headers):
+    """Lists are served from read models, with invoice items loaded per page."""
+    transactions = client.get('/api/transactions', headers=auth_headers).json
+    assert [t['amount'] for t in transactions['items']] == [1200.0, 19.99]
+    assert transactions['items'][1]['type'] == 'expense'
+
+    page = client.get('/api/transactions?cursor=&per_page=1', headers=auth_headers).json
+    assert [t['currency'] for t in page['items']] == ['EUR']
+    page = client.get(f'/api/transactions?cursor={page["next_cursor"]}&per_page=1', headers=auth_headers).json
+    assert [t['description'] for t in page['items']] == ['Editor licence']
+    assert page['has_more'] is False
+
+    invoices = client.get('/api/invoices', headers=auth_headers).json
+    assert [len(i['items']) for i in invoices['items']] == [0, 2]
+    design, hosting = invoices['items'][1]['items']
+    assert (design['quantity'], design['amount'], hosting['unit_price']) == (1.5, 120.0, 12.34)
+    assert invoices['items'][1]['tax_rate'] == 7.5
+    with app.app_context():
+        total = Invoice.query.filter_by(issue_date=date(2024, 1, 10)).one().total
+    assert invoices['items'][1]['total'] == float(Decimal(total))
+
+def test_clients_list(client, auth_headers):
+    """Clients are listed by name and can be filtered on is_active."""
+    clients = client.get('/api/clients', headers=auth_headers).json
+    assert [c['name'] for c in clients['items']] == ['Acme', 'Dormant']
+    assert clients['total'] == 2
+    assert clients['items'][0]['email'] == 'billing@acme.test'
+
+    active = client.get('/api/clients?active=true', headers=auth_headers).json
+    assert [c['name'] for c in active['items']] == ['Acme']
+    inactive = client.get('/api/clients?active=false&per_page=1', headers=auth_headers).json
+    assert [c['name'] for c in inactive['items']] == ['Dormant']
+
+    assert client.get('/api/clients').status_code == 401
@@ -0,0 +1,44 @@
+from app.services.report_cache import LRUCacheBackend
+
+REPORT_URL = '/api/reports/profit-loss?start_date=2024-01-01&end_date=2024-12-31'
+
+def test_report_is_served_from_cache_until_ledger_changes(client, auth_headers):
+    """A ledger write bumps the version so the next report is recomputed."""
+    client.post('/api/transactions', headers=auth_headers, json={
+        'date': '2024-01-05', 'amount': 100, 'type': 'income', 'category': 'service'
+    })
+
+    first = client.get(REPORT_URL, headers=auth_headers)
+    assert first.headers['X-Cache'] == 'MISS'
+
+    # Parameter order does not matter for the cache key
+    second = client.get(
+        '/api/reports/profit-loss?end_date=2024-12-31&start_date=2024-01-01',
+        headers=auth_headers
+    )
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.json == first.json
+
+    client.post('/api/transactions', headers=auth_headers, json={
+        'date': '2024-01-06', 'amount': 50, 'type': 'income', 'category': 'service'
+    })
+
+    third = client.get(REPORT_URL, headers=auth_headers)
+    assert third.headers['X-Cache'] == 'MISS'
+    assert third.json['totals']['total_income'] == 150.0
+
+    stats = client.get('/api/reports/cache-stats', headers=auth_headers).json
+    assert stats['backend'] == 'memory'
+    assert (stats['hits'], stats['misses']) == (1, 2)
+
+def test_lru_backend_evicts_least_recently_used():
+    """The in-process backend is bounded by max_entries."""
+    backend = LRUCacheBackend(max_entries=2)
+    backend.set('a', b'1')
+    backend.set('b', b'2')
+    backend.get('a')
+    backend.set('c', b'3')
+
+    assert backend.get('a') == b'1'
+    assert backend.get('b') is None
+    assert backend.get('c') == b'3'
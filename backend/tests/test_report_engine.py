@@ -0,0 +1,157 @@
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Client, Project, TransactionRollup, TransactionType, TransactionCategory
+from app.services.report_engine import report_engine
+from app.services.report_service import ReportService
+from app.services.transaction_service import TransactionService
+
+@pytest.fixture
+def app_config():
+    return {
+        'REPORT_CACHE_BACKEND': 'null',
+    }
+
+@pytest.fixture
+def ledger(app, user_id):
+    """Give the test user random transactions; return (user_id, project_id, rows)."""
+    rng = random.Random(3)
+    with app.app_context():
+        customer = Client(name='Acme', user_id=user_id)
+        db.session.add(customer)
+        db.session.flush()
+        project = Project(name='Website', client_id=customer.id, user_id=user_id)
+        db.session.add(project)
+        db.session.commit()
+
+        rows = []
+        for _ in range(400):
+            rows.append({
+                'date': (date(2023, 11, 1) + timedelta(days=rng.randrange(120))).isoformat(),
+                'amount': f'{rng.randrange(1, 100000) / 100:.2f}',
+                'type': rng.choice(list(TransactionType)).value,
+                'category': rng.choice(list(TransactionCategory)).value,
+                'project_id': project.id if rng.random() < 0.3 else None
+            })
+        created, errors = TransactionService().bulk_create_transactions(user_id, rows)
+        assert created == len(rows) and not errors
+        return user_id, project.id, rows
+
+def _expected(rows, key):
+    totals = defaultdict(lambda: [Decimal('0'), 0])
+    for row in rows:
+        group = key(row)
+        totals[group][0] += Decimal(row['amount'])
+        totals[group][1] += 1
+    return {group: (int(amount * 100), count) for group, (amount, count) in totals.items()}
+
+def _rounded(value):
+    if isinstance(value, float):
+        return round(value, 2)
+    if isinstance(value, dict):
+        return {key: _rounded(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_rounded(item) for item in value]
+    return value
+
+def test_aggregate_matches_ledger(app, ledger):
+    """Vectorized groupings equal exact per-row sums for every dimension."""
+    user_id, project_id, rows = ledger
+    day = lambda row: date.fromisoformat(row['date'])
+
+    with app.app_context():
+        cases = {
+            ('month', 'type'): lambda r: (r['date'][:7], TransactionType(r['type'])),
+            ('week',): lambda r: (ReportService.period_key(day(r), 'week'),),
+            ('year', 'category'): lambda r: (day(r).year, TransactionCategory(r['category'])),
+            ('day',): lambda r: (r['date'],),
+            ('project', 'type'): lambda r: (r['project_id'], TransactionType(r['type'])),
+        }
+        for group_by, key in cases.items():
+            result = report_engine.aggregate(user_id, group_by)
+            assert {k: (cents, count) for k, cents, count in result} == _expected(rows, key), group_by
+            # Enum dimensions sort in declaration order
+            assert [k for k, _, _ in result] == sorted(
+                (k for k, _, _ in result),
+                key=lambda k: tuple(list(type(v)).index(v) if hasattr(v, 'value') else (v or 0) for v in k)
+            )
+
+        start, end = date(2023, 12, 1), date(2023, 12, 31)
+        in_december = [r for r in rows if start <= day(r) <= end]
+        result = report_engine.aggregate(user_id, ('type',), start, end, types=['income'])
+        assert result == [
+            ((TransactionType.INCOME,), cents, count)
+            for (_,), (cents, count) in _expected(
+                [r for r in in_december if r['type'] == 'income'], lambda r: (r['type'],)
+            ).items()
+        ]
+
+def test_frame_is_cached_per_ledger_version(app, ledger):
+    """The rollups are read once per version and reloaded after a write."""
+    user_id, _, rows = ledger
+    with app.app_context():
+        first = report_engine.frame(user_id)
+        assert report_engine.frame(user_id) is first
+        assert len(first) == TransactionRollup.query.filter_by(user_id=user_id).count()
+        assert first.counts.sum() == len(rows)
+
+        TransactionService().create_transaction(
+            user_id, date='2024-01-01', amount='1.00', type='income', category='service'
+        )
+        second = report_engine.frame(user_id)
+        assert second is not first
+        assert second.counts.sum() == first.counts.sum() + 1
+
+def test_pivot_endpoint(client, auth_headers, ledger):
+    """The pivot endpoint groups by any dimensions, including project."""
+    _, _, rows = ledger
+
+    response = client.get('/api/reports/pivot?group_by=project&type=expense', headers=auth_headers)
+    assert response.status_code == 200
+    by_project = {row['project']: row for row in response.json['data']}
+    expected = _expected([r for r in rows if r['type'] == 'expense'], lambda r: r['project_id'])
+    assert {k: (round(v['amount'] * 100), v['count']) for k, v in by_project.items()} == expected
+
+    response = client.get('/api/reports/pivot?group_by=month,flavour', headers=auth_headers)
+    assert response.status_code == 400
+
+def test_bundle_matches_individual_reports(app, client, auth_headers, ledger):
+    """One bundle request equals the separate endpoints and reads the ledger once."""
+    with app.app_context():
+        engine = db.engine
+
+    query = 'start_date=2023-11-15&end_date=2024-02-10&group_by=week&months=3&year=2023'
+    endpoints = {
+        'income_expense': f'/api/reports/income-expense?{query}',
+        'profit_loss': f'/api/reports/profit-loss?{query}',
+        'cash_flow': '/api/reports/cash-flow?end_date=2024-02-10&months=3',
+        'tax_summary': '/api/reports/tax-summary?year=2023',
+        'transaction_summary': f'/api/transactions/summary?{query}',
+    }
+    expected = {name: client.get(url, headers=auth_headers).json for name, url in endpoints.items()}
+
+    statements = []
+    record = lambda *args: statements.append(args[2])
+    report_engine.clear()
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(f'/api/reports/bundle?{query}', headers=auth_headers)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 200
+    assert set(response.json) == set(expected)
+    for name, payload in expected.items():
+        # The transaction summary endpoint sums floats, the bundle exact cents
+        assert _rounded(response.json[name]) == _rounded(payload), name
+    # The ledger version, closed period and opening balance lookups, and one read of the ledger
+    assert len(statements) <= 4
+
+    response = client.get('/api/reports/bundle?reports=profit-loss,balance_sheet', headers=auth_headers)
+    assert response.status_code == 400
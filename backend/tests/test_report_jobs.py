@@ -0,0 +1,66 @@
+import pytest
+
+from app.services.transaction_service import TransactionService
+
+@pytest.fixture
+def app_config():
+    return {
+        'REPORT_CACHE_BACKEND': 'null',
+        'REPORT_JOBS_BACKEND': 'local',
+        'REPORT_JOBS_WORKERS': 1,
+        'REPORT_JOBS_MAX_WAIT': 10,
+    }
+
+def _headers(app, make_user, email):
+    user_id, headers = make_user(email)
+    with app.app_context():
+        TransactionService().bulk_create_transactions(user_id, [
+            {'date': '2023-01-10', 'amount': '1200.00', 'type': 'income', 'category': 'service'},
+            {'date': '2023-02-03', 'amount': '80.25', 'type': 'expense', 'category': 'software'},
+            {'date': '2023-02-17', 'amount': '300.00', 'type': 'expense', 'category': 'rent'},
+        ])
+    return headers
+
+def test_job_result_matches_report_endpoint(app, client, make_user):
+    """A queued report long-polls to the same payload as the synchronous endpoint."""
+    headers = _headers(app, make_user, 'jobs@example.com')
+    params = {'start_date': '2023-01-01', 'end_date': '2023-03-31', 'group_by': 'day'}
+
+    response = client.post('/api/reports/jobs', headers=headers, json={
+        'report': 'income-expense', 'params': params
+    })
+    assert response.status_code == 202
+    job = response.json['job']
+    assert job['status'] == 'queued'
+
+    response = client.get(response.json['wait_url'], headers=headers)
+    assert response.status_code == 200
+    assert response.json['status'] == 'completed'
+    assert response.json['finished_at']
+
+    expected = client.get('/api/reports/income-expense', headers=headers, query_string=params).json
+    assert response.json['result'] == expected
+
+    polled = client.get(f'/api/reports/jobs/{job["id"]}', headers=headers)
+    assert polled.json['result'] == expected
+
+def test_jobs_are_validated_and_private(app, client, make_user):
+    """Bad requests are rejected up front and jobs are only visible to their owner."""
+    headers = _headers(app, make_user, 'owner@example.com')
+    other = _headers(app, make_user, 'other@example.com')
+
+    assert client.post('/api/reports/jobs', headers=headers, json={}).status_code == 400
+    assert client.post('/api/reports/jobs', headers=headers, json={'report': 'balance_sheet'}).status_code == 400
+    response = client.post('/api/reports/jobs', headers=headers, json={
+        'report': 'profit_loss', 'params': {'start_date': '2023-13-01', 'end_date': '2023-12-31'}
+    })
+    assert response.status_code == 400
+
+    response = client.post('/api/reports/jobs', headers=headers, json={
+        'report': 'tax_summary', 'params': {'year': 2023}
+    })
+    job_id = response.json['job']['id']
+    assert client.get(f'/api/reports/jobs/{job_id}/wait', headers=headers).json['status'] == 'completed'
+    assert client.get(f'/api/reports/jobs/{job_id}', headers=other).status_code == 404
+    assert client.get(f'/api/reports/jobs/{job_id}/wait', headers=other).status_code == 404
+    assert client.get('/api/reports/jobs/unknown', headers=headers).status_code == 404
@@ -0,0 +1,91 @@
+from sqlalchemy import event
+
+from app import db
+from app.models import TransactionRollup
+from app.services.rollup_service import RollupService
+
+def _rollups(app):
+    with app.app_context():
+        return sorted(
+            (r.day.isoformat(), r.type.value, r.category.value, float(r.total_amount), r.transaction_count)
+            for r in TransactionRollup.query.all()
+        )
+
+def test_rollups_follow_transaction_writes(app, client, auth_headers):
+    """Creates, updates and deletes keep the daily rollups in sync."""
+    for amount in (100, 50):
+        response = client.post('/api/transactions', headers=auth_headers, json={
+            'date': '2024-01-05', 'amount': amount, 'type': 'income', 'category': 'service'
+        })
+        assert response.status_code == 201
+
+    response = client.post('/api/transactions', headers=auth_headers, json={
+        'date': '2024-01-06', 'amount': 40, 'type': 'expense', 'category': 'rent'
+    })
+    expense_id = response.json['transaction']['id']
+
+    assert _rollups(app) == [
+        ('2024-01-05', 'income', 'service', 150.0, 2),
+        ('2024-01-06', 'expense', 'rent', 40.0, 1),
+    ]
+
+    client.put(f'/api/transactions/{expense_id}', headers=auth_headers, json={
+        'date': '2024-02-01', 'amount': 45
+    })
+    assert _rollups(app)[-1] == ('2024-02-01', 'expense', 'rent', 45.0, 1)
+    assert len(_rollups(app)) == 2
+
+    client.delete(f'/api/transactions/{expense_id}', headers=auth_headers)
+    assert _rollups(app) == [('2024-01-05', 'income', 'service', 150.0, 2)]
+
+def test_rebuild_matches_incremental_rollups(app, client, auth_headers):
+    """Rebuilding from the ledger yields the incrementally maintained rows."""
+    for day, amount, type_, category in [
+        ('2024-03-01', 10, 'expense', 'software'),
+        ('2024-03-01', 15, 'expense', 'software'),
+        ('2024-03-02', 200, 'income', 'product_sale'),
+    ]:
+        client.post('/api/transactions', headers=auth_headers, json={
+            'date': day, 'amount': amount, 'type': type_, 'category': category
+        })
+
+    incremental = _rollups(app)
+    with app.app_context():
+        assert RollupService().rebuild() == 2
+    assert _rollups(app) == incremental
+
+def test_reports_aggregate_rollups_not_transactions(app, client, auth_headers):
+    """Reports aggregate the rollups per requested period without reading the transactions."""
+    for day, amount, type_, category in [
+        ('2024-01-15', 300, 'income', 'service'),
+        ('2024-01-20', 120, 'expense', 'rent'),
+        ('2024-02-10', 80, 'expense', 'software'),
+    ]:
+        client.post('/api/transactions', headers=auth_headers, json={
+            'date': day, 'amount': amount, 'type': type_, 'category': category
+        })
+
+    statements = []
+    record = lambda *args: statements.append(args[2])
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(
+            '/api/reports/income-expense?start_date=2024-01-01&end_date=2024-12-31',
+            headers=auth_headers
+        )
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    assert any('FROM transaction_rollups' in statement for statement in statements)
+    assert not any('FROM transactions' in statement for statement in statements)
+    assert [(p['period'], p['income'], p['expense']) for p in response.json['data']] == [
+        ('2024-01', 300.0, 120.0),
+        ('2024-02', 0.0, 80.0),
+    ]
+
+    response = client.get('/api/reports/tax-summary?year=2024', headers=auth_headers)
+    tax = response.json['tax_categories']
+    assert tax['income']['service'] == 300.0
+    assert tax['expenses']['total'] == 200.0
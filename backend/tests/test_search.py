@@ -0,0 +1,72 @@
+from datetime import date
+
+from app import db
+from app.models import User, Client, Invoice
+
+def _search(client, auth_headers, term, **params):
+    response = client.get('/api/transactions', headers=auth_headers,
+                          query_string={'search': term, **params})
+    assert response.status_code == 200
+    return [t['description'] for t in response.json['items']]
+
+def test_transaction_search_matches_word_prefixes(client, auth_headers):
+    """Every word must match a column by prefix; the index follows writes."""
+    for description, reference in [
+        ('Payment from Acme Corporation', 'WIRE-0042'),
+        ('Acme hosting renewal', None),
+        ('Office rent', None),
+    ]:
+        client.post('/api/transactions', headers=auth_headers, json={
+            'date': '2024-01-01', 'amount': 10, 'type': 'expense', 'category': 'rent',
+            'description': description, 'reference': reference
+        })
+
+    assert sorted(_search(client, auth_headers, 'acme')) == [
+        'Acme hosting renewal', 'Payment from Acme Corporation'
+    ]
+    assert _search(client, auth_headers, 'acme corp') == ['Payment from Acme Corporation']
+    assert _search(client, auth_headers, 'wire 0042') == ['Payment from Acme Corporation']
+    assert _search(client, auth_headers, 'acme', cursor='') != []
+    assert _search(client, auth_headers, '100%') == []
+
+    office = client.get('/api/transactions?search=office', headers=auth_headers).json['items'][0]
+    client.put(f'/api/transactions/{office["id"]}', headers=auth_headers,
+               json={'description': 'Coworking desk'})
+    assert _search(client, auth_headers, 'office') == []
+    assert _search(client, auth_headers, 'cowork') == ['Coworking desk']
+
+    client.delete(f'/api/transactions/{office["id"]}', headers=auth_headers)
+    assert _search(client, auth_headers, 'cowork') == []
+
+def test_search_ranks_by_relevance(client, auth_headers):
+    """sort=relevance puts the best match first."""
+    for day, description in [
+        ('2024-03-01', 'Travel to conference'),
+        ('2024-01-01', 'Conference ticket, conference hotel, conference dinner'),
+    ]:
+        client.post('/api/transactions', headers=auth_headers, json={
+            'date': day, 'amount': 10, 'type': 'expense', 'category': 'travel',
+            'description': description
+        })
+
+    assert _search(client, auth_headers, 'conference')[0] == 'Travel to conference'
+    assert _search(client, auth_headers, 'conference', sort='relevance')[0].startswith('Conference ticket')
+
+def test_invoice_search(app, client, auth_headers):
+    """Invoices are searchable by number, notes and terms."""
+    with app.app_context():
+        user = User.query.first()
+        customer = Client(name='Acme', user_id=user.id)
+        db.session.add(customer)
+        db.session.flush()
+        for number, notes in [('INV-202401-0001', 'Website redesign'), ('INV-202401-0002', 'Retainer')]:
+            db.session.add(Invoice(
+                invoice_number=number, notes=notes, issue_date=date(2024, 1, 1),
+                due_date=date(2024, 1, 31), user_id=user.id, client_id=customer.id
+            ))
+        db.session.commit()
+
+    response = client.get('/api/invoices?search=redesign', headers=auth_headers)
+    assert [i['invoice_number'] for i in response.json['items']] == ['INV-202401-0001']
+    response = client.get('/api/invoices?search=0002', headers=auth_headers)
+    assert [i['notes'] for i in response.json['items']] == ['Retainer']
@@ -0,0 +1,36 @@
+from app import db
+from app.models import Transaction, TransactionRollup, Invoice, InvoiceItem
+from app.services.invoice_number_service import InvoiceNumberService
+from app.services.seed_service import SeedService
+
+def _amounts(user_id):
+    query = db.session.query(Transaction.amount).filter_by(user_id=user_id).order_by(Transaction.id)
+    return [str(amount) for (amount,) in query]
+
+def test_seed_is_consistent_and_repeatable(app):
+    """Seeded ledgers are deterministic and keep derived tables in sync."""
+    with app.app_context():
+        first = SeedService(seed=7, chunk_size=100).seed(users=2, transactions=300, invoices=20, years=1)
+        second = SeedService(seed=7, chunk_size=100).seed(users=1, transactions=300, invoices=20, years=1)
+
+        assert first['users'] == 2
+        assert Invoice.query.count() == 60
+        assert InvoiceItem.query.count() == first['invoice_items'] + second['invoice_items']
+        # Invoice payments come on top of the requested transactions
+        assert Transaction.query.count() == first['transactions'] + second['transactions']
+        assert first['transactions'] >= 600
+
+        # Same seed, same data
+        user_a, user_c = first['user_ids'][0], second['user_ids'][0]
+        assert _amounts(user_a) == _amounts(user_c)
+
+        # Rollups match the ledger
+        total = db.session.query(db.func.sum(Transaction.amount)).filter_by(user_id=user_a).scalar()
+        rollup_total = db.session.query(db.func.sum(TransactionRollup.total_amount))\
+                                 .filter_by(user_id=user_a).scalar()
+        assert rollup_total == total
+
+        # Numbering continues after the seeded invoices
+        latest = Invoice.query.filter_by(user_id=user_a).order_by(Invoice.issue_date.desc(), Invoice.id.desc()).first()
+        number = InvoiceNumberService().next_number(user_a, latest.issue_date)
+        assert number > latest.invoice_number
@@ -0,0 +1,128 @@
+import io
+
+import pytest
+
+from app.models import Transaction, TransactionRollup
+from app.services.fx_service import FxService
+from app.services.statement_parsers import parse_statement, StatementParseError
+
+CSV_STATEMENT = b"""Date,Amount,Description,Reference
+2024-01-05,"1.250,00",Client payment,INV-1
+2024-01-06,-40.50,Office rent,
+2024-01-06,-40.50,Office rent,
+not-a-date,10,Broken row,
+"""
+
+OFX_STATEMENT = b"""OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>CAD<BANKTRANLIST>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240105120000<TRNAMT>500.00<FITID>A1<NAME>Client
+</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240107<TRNAMT>-12.34<FITID>A2<NAME>Coffee
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+CAMT_STATEMENT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02"><BkToCstmrStmt><Stmt>
+<Ntry><NtryRef>R1</NtryRef><Amt Ccy="EUR">99.90</Amt><CdtDbtInd>DBIT</CdtDbtInd>
+<BookgDt><Dt>2024-02-01</Dt></BookgDt><AcctSvcrRef>BANK-1</AcctSvcrRef>
+<NtryDtls><TxDtls><RmtInf><Ustrd>Hosting</Ustrd></RmtInf></TxDtls></NtryDtls></Ntry>
+<Ntry><Amt Ccy="EUR">250</Amt><CdtDbtInd>CRDT</CdtDbtInd>
+<BookgDt><Dt>2024-02-02</Dt></BookgDt><AcctSvcrRef>BANK-2</AcctSvcrRef></Ntry>
+</Stmt></BkToCstmrStmt></Document>
+"""
+
+@pytest.fixture
+def app_config(tmp_path):
+    return {
+        'UPLOAD_FOLDER': str(tmp_path),
+        'IMPORTS_RUN_ASYNC': False,
+        'MAX_CONTENT_LENGTH': 16 * 1024 * 1024,
+        'IMPORT_MAX_CONTENT_LENGTH': 64 * 1024 * 1024,
+    }
+
+def _upload(client, auth_headers, content, filename, **form):
+    data = {'file': (io.BytesIO(content), filename), **form}
+    return client.post('/api/imports', headers=auth_headers, data=data,
+                       content_type='multipart/form-data')
+
+def test_csv_import_is_idempotent(app, client, auth_headers):
+    """Re-importing the same statement skips every row already imported."""
+    response = _upload(client, auth_headers, CSV_STATEMENT, 'january.csv')
+    assert response.status_code == 202
+    result = response.json['import']
+    assert result['status'] == 'completed'
+    assert (result['rows_read'], result['rows_imported'], result['rows_failed']) == (4, 3, 1)
+    assert result['errors'][0]['line'] == 5
+
+    response = client.get(response.json['status_url'], headers=auth_headers)
+    assert response.json['progress'] == 1.0
+
+    response = _upload(client, auth_headers, CSV_STATEMENT, 'january.csv')
+    result = response.json['import']
+    assert (result['rows_imported'], result['rows_duplicate']) == (0, 3)
+
+    with app.app_context():
+        assert Transaction.query.count() == 3
+        rollups = {(r.type.value, float(r.total_amount), r.transaction_count)
+                   for r in TransactionRollup.query.all()}
+    assert rollups == {('income', 1250.0, 1), ('expense', 81.0, 2)}
+
+def test_import_accepts_statements_above_the_request_limit(client, auth_headers):
+    """Statement uploads are capped by IMPORT_MAX_CONTENT_LENGTH, other requests by MAX_CONTENT_LENGTH."""
+    # Blank lines are skipped by the parser, so the padding adds size but no rows
+    padding = (b' ' * 1023 + b'\n') * (17 * 1024)
+    response = _upload(client, auth_headers, CSV_STATEMENT + padding, 'large.csv')
+    assert response.status_code == 202
+    assert response.json['import']['status'] == 'completed'
+    assert response.json['import']['rows_imported'] == 3
+
+    response = client.post('/api/transactions', headers=auth_headers,
+                           data=padding, content_type='application/json')
+    assert response.status_code == 413
+
+def test_failed_import_removes_the_stored_file(tmp_path, client, auth_headers):
+    """A statement that fails to parse is not left behind in the upload folder."""
+    response = _upload(client, auth_headers, b'Date,Description\n2024-01-01,Coffee\n', 'broken.csv')
+    assert response.status_code == 202
+    assert response.json['import']['status'] == 'failed'
+    assert list((tmp_path / 'imports').iterdir()) == []
+
+def test_rejects_unknown_format(client, auth_headers):
+    """Files of an unknown format are rejected before they are stored."""
+    response = _upload(client, auth_headers, b'%PDF-1.4', 'statement.pdf')
+    assert response.status_code == 400
+
+def test_ofx_and_camt_parsers_stream_entries():
+    """OFX and CAMT.053 entries are parsed with signed amounts and bank IDs."""
+    ofx = list(parse_statement(io.BytesIO(OFX_STATEMENT), 'ofx'))
+    assert [(r.date.isoformat(), str(r.amount), r.currency, r.external_id) for r in ofx] == [
+        ('2024-01-05', '500.00', 'CAD', 'A1'),
+        ('2024-01-07', '-12.34', 'CAD', 'A2'),
+    ]
+
+    camt = list(parse_statement(io.BytesIO(CAMT_STATEMENT), 'camt053'))
+    assert not any(isinstance(r, StatementParseError) for r in camt)
+    assert [(r.date.isoformat(), str(r.amount), r.currency, r.description, r.external_id) for r in camt] == [
+        ('2024-02-01', '-99.90', 'EUR', 'Hosting', 'BANK-1'),
+        ('2024-02-02', '250', 'EUR', None, 'BANK-2'),
+    ]
+
+def test_camt_import_books_the_statement_currency(app, client, auth_headers):
+    """Entries of a EUR statement are booked, rolled up and converted as EUR."""
+    response = _upload(client, auth_headers, CAMT_STATEMENT, 'camt053_february.xml')
+    assert response.status_code == 202
+    assert response.json['import']['rows_imported'] == 2
+
+    with app.app_context():
+        assert {(t.currency, str(t.amount)) for t in Transaction.query.all()} == {('EUR', '99.90'), ('EUR', '250.00')}
+        assert {r.currency for r in TransactionRollup.query.all()} == {'EUR'}
+        FxService().load_csv(io.StringIO('Date,USD\n2024-01-31,1.25\n'), base='EUR')
+
+    response = client.get(
+        '/api/reports/profit-loss?start_date=2024-02-01&end_date=2024-02-29&reporting_currency=USD',
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json['totals']['total_income'] == 312.5
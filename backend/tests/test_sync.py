@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Client, SyncEntity, Tombstone
+from app.services.sync_service import SyncService
+from app.utils.pagination import encode_cursor
+
+@pytest.fixture
+def app_config():
+    return {
+        # Exact deltas: nothing synced is sent again
+        'SYNC_OVERLAP_SECONDS': 0,
+    }
+
+@pytest.fixture
+def user(app, user_id, auth_headers):
+    """Give the test user one client; return (auth headers, client id)."""
+    with app.app_context():
+        acme = Client(name='Acme', user_id=user_id)
+        db.session.add(acme)
+        db.session.commit()
+        return auth_headers, acme.id
+
+def _create_transaction(client, headers, day):
+    response = client.post('/api/transactions', headers=headers, json={
+        'date': f'2024-01-{day:02d}', 'amount': 10 * day, 'type': 'expense', 'category': 'software'
+    })
+    assert response.status_code == 201
+    return response.json['transaction']['id']
+
+def _sync(client, headers, since=None, **params):
+    if since:
+        params['since'] = since
+    response = client.get('/api/sync', headers=headers, query_string=params)
+    assert response.status_code == 200, response.json
+    return response.json
+
+def _ids(rows):
+    return sorted(row['id'] for row in rows)
+
+def test_sync_returns_only_changes_since_the_token(client, user):
+    """A full sync, then deltas of creates, updates and deletes only."""
+    headers, client_id = user
+    first, second = _create_transaction(client, headers, 3), _create_transaction(client, headers, 4)
+    response = client.post('/api/invoices', headers=headers, json={
+        'client_id': client_id, 'issue_date': '2024-01-05', 'due_date': '2024-02-04',
+        'items': [{'description': 'Design', 'quantity': 2, 'unit_price': 150}]
+    })
+    assert response.status_code == 201
+    invoice_id = response.json['invoice']['id']
+
+    full = _sync(client, headers)
+    assert _ids(full['transactions']) == sorted([first, second])
+    assert _ids(full['invoices']) == [invoice_id]
+    assert full['invoices'][0]['items'][0]['description'] == 'Design'
+    assert _ids(full['clients']) == [client_id]
+    assert full['has_more'] is False
+
+    # Nothing changed
+    idle = _sync(client, headers, full['next_token'])
+    assert idle['transactions'] == idle['invoices'] == idle['clients'] == []
+    assert idle['deleted'] == {'transactions': [], 'invoices': [], 'clients': []}
+
+    third = _create_transaction(client, headers, 6)
+    assert client.put(f'/api/transactions/{first}', headers=headers, json={'amount': 99}).status_code == 200
+    assert client.delete(f'/api/transactions/{second}', headers=headers).status_code == 200
+    # Changing only an item still marks the invoice changed
+    response = client.put(f'/api/invoices/{invoice_id}', headers=headers, json={
+        'items': [{'description': 'Design and build', 'quantity': 2, 'unit_price': 150}]
+    })
+    assert response.status_code == 200
+
+    delta = _sync(client, headers, idle['next_token'])
+    assert _ids(delta['transactions']) == sorted([first, third])
+    assert {row['id']: row['amount'] for row in delta['transactions']}[first] == 99.0
+    assert [row['items'][0]['description'] for row in delta['invoices']] == ['Design and build']
+    assert delta['clients'] == []
+    assert delta['deleted']['transactions'] == [second]
+
+    assert client.delete(f'/api/invoices/{invoice_id}', headers=headers).status_code == 200
+    delta = _sync(client, headers, delta['next_token'])
+    assert delta['invoices'] == [] and delta['deleted']['invoices'] == [invoice_id]
+
+def test_sync_pages_through_large_changes(client, user):
+    """Each entity returns at most `limit` rows; has_more continues with the token."""
+    headers, client_id = user
+    created = [_create_transaction(client, headers, day) for day in range(1, 8)]
+
+    seen, pages, token = [], 0, None
+    while True:
+        page = _sync(client, headers, token, limit=3)
+        assert len(page['transactions']) <= 3
+        seen += [row['id'] for row in page['transactions']]
+        pages += 1
+        token = page['next_token']
+        if not page['has_more']:
+            break
+    assert pages == 3
+    assert sorted(seen) == sorted(created)
+
+def test_invalid_and_expired_tokens(app, client, user):
+    """Malformed tokens are rejected; tokens older than the tombstones kept expire."""
+    headers, _ = user
+    response = client.get('/api/sync?since=not-a-token', headers=headers)
+    assert response.status_code == 400
+    response = client.get(f'/api/sync?since={encode_cursor([[1]] * 8)}', headers=headers)
+    assert response.status_code == 400
+
+    service = SyncService(retention_days=90)
+    long_ago = (datetime.utcnow() - timedelta(days=91), 0)
+    stale = service.encode_token({'transactions': long_ago, 'invoices': long_ago, 'clients': long_ago,
+                                  'deleted': long_ago})
+    response = client.get(f'/api/sync?since={stale}', headers=headers)
+    assert response.status_code == 410
+
+def test_cli_prunes_old_tombstones(app, user_id):
+    """`flask sync prune` deletes tombstones past the retention period."""
+    with app.app_context():
+        now = datetime.utcnow()
+        db.session.add_all([
+            Tombstone(user_id=user_id, entity=SyncEntity.TRANSACTION, entity_id=1,
+                      deleted_at=now - timedelta(days=120)),
+            Tombstone(user_id=user_id, entity=SyncEntity.INVOICE, entity_id=2, deleted_at=now - timedelta(days=10)),
+        ])
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['sync', 'prune', '--days', '30'])
+    assert result.exit_code == 0, result.output
+    assert 'Pruned 1 tombstones' in result.output
+
+    with app.app_context():
+        assert [t.entity_id for t in Tombstone.query.all()] == [2]